@@ -16,9 +16,26 @@ def create_app(config_name="default"):
     """Application factory function"""
     app = Flask(__name__)
 
+    # Keep uploads up to MAX_SPOOLED_SIZE in memory instead of a temp file
+    from app.utils.io import UploadRequest
+    app.request_class = UploadRequest
+
     # Load configuration
     app.config.from_object(config[config_name])
 
+    # Serialize JSON responses compactly and without sorting keys
+    app.json.sort_keys = False
+    app.json.compact = True
+
+    # Use orjson for JSON when it is installed
+    from app.utils.json_provider import init_json_provider
+    if init_json_provider(app):
+        logger.info("Using orjson JSON provider")
+
+    # Gzip large JSON/text responses for clients that accept it
+    from app.utils.compress import init_compression
+    init_compression(app)
+
     # Ensure model directory exists
     os.makedirs(app.config["MODEL_FOLDER"], exist_ok=True)
 
@@ -58,6 +75,10 @@ def create_app(config_name="default"):
     # Preload models
     preload_models(app)
 
+    # Warm up wrappers so the first requests do not pay construction cost
+    if app.config.get("PRELOAD_MODELS", False) and not app.config.get("WARM_UP_AFTER_FORK", False):
+        warm_up_wrappers()
+
     # Register main page route
     @app.route("/")
     def index():
@@ -70,6 +91,48 @@ def create_app(config_name="default"):
     return app
 
 
+def warm_up_wrappers():
+    """
+    Construct wrapper instances and prime cached model info before serving.
+
+    Under gunicorn this runs in each worker's ``post_fork`` hook rather than in
+    the master, so no CUDA/torch state is inherited across ``fork``.
+    """
+    from app.api.bpfold_routes import get_bpfold_wrapper
+    from app.api.ufold_routes import get_ufold_wrapper
+    from app.api.mxfold2_routes import get_mxfold2_wrapper, _cached_model_info as mxfold2_model_info
+    from app.api.rnamigos2_routes import get_rnamigos2_wrapper
+    from app.api.rnampnn_routes import get_rnampnn_wrapper
+    from app.api.reformer_routes import _cached_model_info as reformer_model_info
+    from app.api.ribodiffusion_routes import get_ribodiffusion_wrapper
+    from app.api.rnaflow_routes import get_rnaflow_wrapper
+    from app.api.rnaformer_routes import get_rnaformer_wrapper
+    from app.api.rnaframeflow_routes import get_wrapper as get_rnaframeflow_wrapper
+
+    warm_up_steps = [
+        get_bpfold_wrapper,
+        get_ufold_wrapper,
+        get_mxfold2_wrapper,
+        mxfold2_model_info,
+        get_rnamigos2_wrapper,
+        get_rnampnn_wrapper,
+        reformer_model_info,
+        get_ribodiffusion_wrapper,
+        get_rnaflow_wrapper,
+        get_rnaformer_wrapper,
+        get_rnaframeflow_wrapper,
+    ]
+
+    # A missing model environment must not keep the others from warming up
+    for step in warm_up_steps:
+        try:
+            step()
+        except Exception as e:
+            logger.error(f"Model wrapper warm-up failed ({step.__module__}.{step.__name__}): {e}")
+
+    logger.info("Model wrappers warmed up")
+
+
 def preload_models(app):
     """Preload models in background"""
     try:
@@ -10,21 +10,17 @@ import os
 from pathlib import Path
 
 from app.utils.wrappers import BPFoldWrapper
+from app.utils.wrappers._singleton import get_or_create
+from app.utils.io import save_upload_fast
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 bpfold_bp = Blueprint('bpfold', __name__, url_prefix='/api/bpfold')
 
-# Global BPFold wrapper instance
-bpfold_wrapper = None
-
 def get_bpfold_wrapper():
     """Get or initialize BPFold wrapper"""
-    global bpfold_wrapper
-    if bpfold_wrapper is None:
-        bpfold_wrapper = BPFoldWrapper()
-    return bpfold_wrapper
+    return get_or_create("bpfold", BPFoldWrapper)
 
 @bpfold_bp.route('/info', methods=['GET'])
 def get_model_info():
@@ -146,9 +142,7 @@ def predict_from_file():
             }), 400
         
         # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.fasta', delete=False) as temp_file:
-            file.save(temp_file.name)
-            temp_file_path = temp_file.name
+        temp_file_path = save_upload_fast(file, '.fasta')
         
         try:
             # Read sequences from file
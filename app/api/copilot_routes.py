@@ -5,7 +5,7 @@ import logging
 from pathlib import Path
 from datetime import datetime
 
-from app.copilot import RNADesignAssistant
+from app.utils.wrappers._singleton import get_or_create
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,22 +17,27 @@ copilot_bp = Blueprint("copilot", __name__)
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY", "")
 DEEPSEEK_API_BASE = os.getenv("DEEPSEEK_API_BASE", "https://api.deepseek.com")
 
-# Initialize RNA Design Assistant
-assistant = None
+# Run the RAG encoders on CUDA when available
+COPILOT_USE_GPU = os.getenv("COPILOT_USE_GPU", "").lower() in ("1", "true", "yes")
+
+
+def _create_assistant():
+    """Build the RNA Design Assistant, importing the copilot stack on first use"""
+    from app.copilot import RNADesignAssistant
+
+    return RNADesignAssistant(
+        api_key=DEEPSEEK_API_KEY,
+        api_base=DEEPSEEK_API_BASE,
+        multimodal=True,
+        use_gpu=COPILOT_USE_GPU
+    )
 
 
 def get_assistant():
     """Get or initialize the RNA Design Assistant"""
-    global assistant
-    if assistant is None:
-        if not DEEPSEEK_API_KEY:
-            raise ValueError("DeepSeek API key not configured")
-        assistant = RNADesignAssistant(
-            api_key=DEEPSEEK_API_KEY,
-            api_base=DEEPSEEK_API_BASE,
-            multimodal=True
-        )
-    return assistant
+    if not DEEPSEEK_API_KEY:
+        raise ValueError("DeepSeek API key not configured")
+    return get_or_create("copilot", _create_assistant)
 
 
 @copilot_bp.route("/status", methods=["GET"])
@@ -434,7 +439,7 @@ def get_memory():
     """Get conversation memory"""
     try:
         assistant = get_assistant()
-        memory = assistant.conversation_memory
+        memory = list(assistant.conversation_memory)
         return jsonify({
             "success": True,
             "memory": memory,
@@ -6,23 +6,27 @@ from flask import Blueprint, request, jsonify, send_file
 import tempfile
 import logging
 import os
+import io
+import struct
+import zipfile
 from app.utils.wrappers.mxfold2_wrapper import MXFold2Wrapper
+from app.utils.wrappers._singleton import get_or_create
 from app.utils.input import validate_rna_sequence
+from app.utils.cache import ttl_cache, with_etag, conditional_json
 from app.utils.output import generate_ct_content, generate_multiple_ct_files, create_ct_zip_file, cleanup_temp_files
 
 logger = logging.getLogger(__name__)
 
 mxfold2_bp = Blueprint("mxfold2", __name__, url_prefix='/api/mxfold2')
 
-# Global wrapper instance
-_mxfold2_wrapper = None
-
 def get_mxfold2_wrapper():
     """Get or create MXFold2 wrapper instance"""
-    global _mxfold2_wrapper
-    if _mxfold2_wrapper is None:
-        _mxfold2_wrapper = MXFold2Wrapper()
-    return _mxfold2_wrapper
+    return get_or_create("mxfold2", MXFold2Wrapper)
+
+@ttl_cache(ttl=30.0)
+def _cached_model_info():
+    """Get cached MXFold2 model information and its ETag"""
+    return with_etag(get_mxfold2_wrapper().get_model_info())
 
 @mxfold2_bp.route('/predict', methods=['POST'])
 def predict_sequences():
@@ -232,13 +236,12 @@ def download_results(format):
 def get_model_info():
     """Get MXFold2 model information"""
     try:
-        wrapper = get_mxfold2_wrapper()
-        info = wrapper.get_model_info()
+        info, etag = _cached_model_info()
         
-        return jsonify({
+        return conditional_json({
             "success": True,
             "model_info": info
-        })
+        }, etag)
         
     except Exception as e:
         logger.error(f"Failed to get MXFold2 info: {e}")
@@ -251,14 +254,13 @@ def get_model_info():
 def get_status():
     """Get MXFold2 service status"""
     try:
-        wrapper = get_mxfold2_wrapper()
-        info = wrapper.get_model_info()
+        info, etag = _cached_model_info()
         
-        return jsonify({
+        return conditional_json({
             "success": True,
             "status": "available",
             "model_info": info
-        })
+        }, etag)
         
     except Exception as e:
         logger.error(f"Failed to get MXFold2 status: {e}")
@@ -267,10 +269,83 @@ def get_status():
             "error": str(e)
         }), 500
 
+def _iter_binary_results(payload):
+    """
+    Iterate raw (sequence, dot_bracket) byte pairs from a compact binary payload
+
+    Layout: len(seq):u32 | seq | len(db):u32 | db | ... (little-endian, ASCII)
+    """
+    view = memoryview(payload)
+    offset = 0
+    total = len(view)
+    while offset < total:
+        fields = []
+        for _ in range(2):
+            if offset + 4 > total:
+                raise ValueError("Truncated binary payload")
+            (length,) = struct.unpack_from('<I', view, offset)
+            offset += 4
+            if offset + length > total:
+                raise ValueError("Truncated binary payload")
+            fields.append(bytes(view[offset:offset + length]))
+            offset += length
+        yield fields[0], fields[1]
+
+
+def _send_binary_ct_files(payload):
+    """Build CT files in memory from a binary payload and send them"""
+    try:
+        entries = []
+        for i, (sequence, dot_bracket) in enumerate(_iter_binary_results(payload)):
+            if not sequence or not dot_bracket:
+                logger.warning(f"Skipping result {i+1}: missing sequence or dot_bracket data")
+                continue
+            # A bad record is skipped, as generate_ct_entries does for JSON results
+            try:
+                sequence = sequence.decode('ascii')
+                ct_content = generate_ct_content(sequence, dot_bracket.decode('ascii'), f"sequence {i+1}")
+            except Exception as e:
+                logger.error(f"Error generating CT content for sequence {i+1}: {str(e)}")
+                continue
+            entries.append((f"mxfold2_structures_sequence_{i+1}_{len(sequence)}bp.ct", ct_content))
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Invalid binary payload: {str(e)}"}), 400
+
+    if not entries:
+        return jsonify({"success": False, "error": "No valid sequences found for CT generation"}), 400
+
+    if len(entries) == 1:
+        filename, ct_content = entries[0]
+        return send_file(
+            io.BytesIO(ct_content.encode('ascii')),
+            as_attachment=True,
+            download_name=filename,
+            mimetype="text/plain"
+        )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for filename, ct_content in entries:
+            zipf.writestr(filename, ct_content)
+    buffer.seek(0)
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name="mxfold2_structures.zip",
+        mimetype="application/zip"
+    )
+
 @mxfold2_bp.route('/download_ct', methods=['POST'])
 def download_ct_files():
     """Download CT files for MXFold2 results"""
     try:
+        # Compact binary layout skips JSON decoding and the intermediate result dicts
+        if request.mimetype == 'application/octet-stream':
+            payload = request.get_data(cache=False)
+            if not payload:
+                return jsonify({"success": False, "error": "No results data provided"}), 400
+            return _send_binary_ct_files(payload)
+
         data = request.get_json()
         if not data or 'results' not in data:
             return jsonify({"success": False, "error": "No results data provided"}), 400
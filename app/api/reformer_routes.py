@@ -5,6 +5,7 @@ Reformer模型API路由
 
 from flask import Blueprint, request, jsonify
 from app.utils.wrappers.reformer_wrapper import reformer_wrapper
+from app.utils.cache import ttl_cache, with_etag, conditional_json
 import logging
 
 # 创建蓝图
@@ -13,15 +14,20 @@ reformer_bp = Blueprint('reformer', __name__)
 # 设置日志
 logger = logging.getLogger(__name__)
 
+@ttl_cache(ttl=30.0)
+def _cached_model_info():
+    """获取缓存的Reformer模型信息及其ETag"""
+    return with_etag(reformer_wrapper.get_model_info())
+
 @reformer_bp.route('/info', methods=['GET'])
 def get_model_info():
     """获取Reformer模型信息"""
     try:
-        info = reformer_wrapper.get_model_info()
-        return jsonify({
+        info, etag = _cached_model_info()
+        return conditional_json({
             "success": True,
             "info": info
-        })
+        }, etag)
     except Exception as e:
         logger.error(f"获取Reformer模型信息失败: {str(e)}")
         return jsonify({
@@ -55,7 +61,7 @@ def predict_binding_affinity():
             }), 400
         
         # 验证RBP名称
-        supported_rbps = reformer_wrapper.get_model_info().get('supported_rbps', [])
+        supported_rbps = _cached_model_info()[0].get('supported_rbps', [])
         if rbp_name not in supported_rbps:
             return jsonify({
                 "success": False,
@@ -104,7 +110,7 @@ def get_model_status():
 def get_supported_rbps():
     """获取支持的RBP列表"""
     try:
-        info = reformer_wrapper.get_model_info()
+        info, _ = _cached_model_info()
         return jsonify({
             "success": True,
             "rbps": info.get('supported_rbps', []),
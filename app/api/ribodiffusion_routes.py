@@ -3,31 +3,89 @@ RiboDiffusion API Routes
 """
 
 from flask import Blueprint, request, jsonify
+from werkzeug.utils import secure_filename
 import logging
 import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from app.utils.wrappers.ribodiffusion_wrapper import RiboDiffusionWrapper
-from app.utils.input import validate_pdb_file
+from app.utils.wrappers._singleton import get_or_create
+from app.utils.input import validate_numeric_params
+from app.utils.cache import ttl_cache, with_etag, conditional_json
 
 logger = logging.getLogger(__name__)
 
 ribodiffusion_bp = Blueprint("ribodiffusion", __name__, url_prefix='/api/ribodiffusion')
 
-# Global wrapper instance
-_ribodiffusion_wrapper = None
+# Parameter schema: (name, types, min, max, error message)
+_INVERSE_FOLD_SCHEMA = (
+    ("num_samples", int, 1, 10, "num_samples must be an integer between 1 and 10"),
+    ("sampling_steps", int, 10, 1000, "sampling_steps must be an integer between 10 and 1000"),
+    ("cond_scale", (int, float), -1.0, 2.0, "cond_scale must be a number between -1.0 and 2.0"),
+)
+
+# Model info keys returned unless ?verbose is set
+_SUMMARY_KEYS = ('name', 'type', 'input_type', 'output_type', 'checkpoint_exists')
+
+# Background executor for temporary directory cleanup
+_cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ribodiff-cleanup')
 
 def get_ribodiffusion_wrapper():
     """Get or create RiboDiffusion wrapper instance"""
-    global _ribodiffusion_wrapper
-    if _ribodiffusion_wrapper is None:
-        _ribodiffusion_wrapper = RiboDiffusionWrapper()
-    return _ribodiffusion_wrapper
+    return get_or_create("ribodiffusion", RiboDiffusionWrapper)
+
+@ttl_cache(ttl=30.0)
+def _cached_env_ready():
+    """Get cached RiboDiffusion environment readiness"""
+    return get_ribodiffusion_wrapper().setup_environment()
+
+@ttl_cache(ttl=30.0)
+def _cached_info():
+    """Get cached RiboDiffusion model information, full and summarized, each with its ETag"""
+    info = get_ribodiffusion_wrapper().get_model_info()
+    summary = {k: info[k] for k in _SUMMARY_KEYS if k in info}
+    return {"verbose": with_etag(info), "summary": with_etag(summary)}
+
+def _new_work_dir():
+    """Create a unique per-request working directory"""
+    return tempfile.mkdtemp(prefix='ribodiff_', dir=os.environ.get('RIBODIFF_TMP'))
+
+def _save_pdb_stream(stream, pdb_file):
+    """Write an uploaded PDB stream into the request's work directory in 1 MiB chunks"""
+    with open(pdb_file, 'wb') as f:
+        shutil.copyfileobj(stream, f, length=1 << 20)
+
+def _schedule_cleanup(temp_dir):
+    """Remove a temporary directory in the background"""
+    _cleanup_executor.submit(shutil.rmtree, temp_dir, ignore_errors=True)
 
 @ribodiffusion_bp.route('/inverse_fold', methods=['POST'])
 def inverse_fold():
     """Perform RNA inverse folding from PDB structure"""
+    # Per-request working directory for the uploaded PDB and wrapper outputs
+    work_dir = None
     try:
+        # Raw PDB body: stream straight to disk without multipart parsing
+        if request.mimetype == 'application/octet-stream':
+            work_dir = _new_work_dir()
+            filename = secure_filename(request.args.get('filename', '')) or 'structure.pdb'
+            pdb_file = os.path.join(work_dir, filename)
+            _save_pdb_stream(request.stream, pdb_file)
+            
+            if os.path.getsize(pdb_file) == 0:
+                return jsonify({
+                    "success": False,
+                    "error": "No PDB file provided"
+                }), 400
+            
+            # Get parameters from query string
+            num_samples = int(request.args.get('num_samples', 1))
+            sampling_steps = int(request.args.get('sampling_steps', 50))
+            cond_scale = float(request.args.get('cond_scale', -1.0))
+            dynamic_threshold = True  # Always set to True
         # Check if request contains file upload
-        if 'pdb_file' in request.files:
+        elif 'pdb_file' in request.files:
             # Handle file upload
             pdb_file_obj = request.files['pdb_file']
             if not pdb_file_obj or pdb_file_obj.filename == '':
@@ -37,10 +95,10 @@ def inverse_fold():
                 }), 400
             
             # Save uploaded file temporarily
-            import tempfile
-            temp_dir = tempfile.mkdtemp()
-            pdb_file = os.path.join(temp_dir, pdb_file_obj.filename)
-            pdb_file_obj.save(pdb_file)
+            work_dir = _new_work_dir()
+            filename = secure_filename(pdb_file_obj.filename) or 'structure.pdb'
+            pdb_file = os.path.join(work_dir, filename)
+            _save_pdb_stream(pdb_file_obj.stream, pdb_file)
             
             # Get parameters from form data
             num_samples = int(request.form.get('num_samples', 1))
@@ -78,32 +136,27 @@ def inverse_fold():
                 }), 400
         
         # Validate parameters
-        if not isinstance(num_samples, int) or num_samples < 1 or num_samples > 10:
-            return jsonify({
-                "success": False,
-                "error": "num_samples must be an integer between 1 and 10"
-            }), 400
-        
-        if not isinstance(sampling_steps, int) or sampling_steps < 10 or sampling_steps > 1000:
-            return jsonify({
-                "success": False,
-                "error": "sampling_steps must be an integer between 10 and 1000"
-            }), 400
-        
-        if not isinstance(cond_scale, (int, float)) or cond_scale < -1.0 or cond_scale > 2.0:
+        error = validate_numeric_params({
+            "num_samples": num_samples,
+            "sampling_steps": sampling_steps,
+            "cond_scale": cond_scale
+        }, _INVERSE_FOLD_SCHEMA)
+        if error:
             return jsonify({
                 "success": False,
-                "error": "cond_scale must be a number between -1.0 and 2.0"
+                "error": error
             }), 400
         
-        # Get wrapper and run inference
+        # Get wrapper and run inference; outputs go under the upload's work directory,
+        # or the wrapper's own temporary directory for an existing PDB path
         wrapper = get_ribodiffusion_wrapper()
         result = wrapper.inverse_fold(
             pdb_file=pdb_file,
             num_samples=num_samples,
             sampling_steps=sampling_steps,
             cond_scale=cond_scale,
-            dynamic_threshold=dynamic_threshold
+            dynamic_threshold=dynamic_threshold,
+            work_dir=work_dir
         )
         
         if result["success"]:
@@ -118,59 +171,39 @@ def inverse_fold():
                     "dynamic_threshold": result["dynamic_threshold"]
                 }
             }
-            
-            # Clean up temporary file if it was uploaded
-            if 'pdb_file' in request.files and 'temp_dir' in locals():
-                try:
-                    import shutil
-                    shutil.rmtree(temp_dir)
-                except Exception as cleanup_error:
-                    logger.warning(f"Failed to cleanup temporary directory: {cleanup_error}")
-            
             return jsonify(response_data)
         else:
-            # Clean up temporary file if it was uploaded
-            if 'pdb_file' in request.files and 'temp_dir' in locals():
-                try:
-                    import shutil
-                    shutil.rmtree(temp_dir)
-                except Exception as cleanup_error:
-                    logger.warning(f"Failed to cleanup temporary directory: {cleanup_error}")
-            
             return jsonify({
                 "success": False,
                 "error": result["error"]
             }), 500
             
     except Exception as e:
-        # Clean up temporary file if it was uploaded
-        if 'pdb_file' in request.files and 'temp_dir' in locals():
-            try:
-                import shutil
-                shutil.rmtree(temp_dir)
-            except Exception as cleanup_error:
-                logger.warning(f"Failed to cleanup temporary directory: {cleanup_error}")
-        
-        logger.error(f"RiboDiffusion inverse fold error: {e}")
+        logger.error("RiboDiffusion inverse fold error: %s", e)
         return jsonify({
             "success": False,
             "error": f"Internal server error: {str(e)}"
         }), 500
+    finally:
+        # Clean up temporary file if it was uploaded
+        if work_dir:
+            _schedule_cleanup(work_dir)
 
 @ribodiffusion_bp.route('/info', methods=['GET'])
 def get_model_info():
     """Get RiboDiffusion model information"""
     try:
-        wrapper = get_ribodiffusion_wrapper()
-        info = wrapper.get_model_info()
+        if request.args.get('refresh'):
+            _cached_info.cache_clear()
+        info, etag = _cached_info()["verbose" if request.args.get('verbose') else "summary"]
         
-        return jsonify({
+        return conditional_json({
             "success": True,
             "data": info
-        })
+        }, etag)
         
     except Exception as e:
-        logger.error(f"RiboDiffusion info error: {e}")
+        logger.error("RiboDiffusion info error: %s", e)
         return jsonify({
             "success": False,
             "error": f"Internal server error: {str(e)}"
@@ -180,8 +213,9 @@ def get_model_info():
 def health_check():
     """Health check for RiboDiffusion service"""
     try:
-        wrapper = get_ribodiffusion_wrapper()
-        is_ready = wrapper.setup_environment()
+        if request.args.get('refresh'):
+            _cached_env_ready.cache_clear()
+        is_ready = _cached_env_ready()
         
         return jsonify({
             "success": True,
@@ -192,7 +226,7 @@ def health_check():
         })
         
     except Exception as e:
-        logger.error(f"RiboDiffusion health check error: {e}")
+        logger.error("RiboDiffusion health check error: %s", e)
         return jsonify({
             "success": False,
             "error": f"Health check failed: {str(e)}"
@@ -5,21 +5,38 @@ RNAFlow API Routes
 from flask import Blueprint, request, jsonify
 import logging
 from app.utils.wrappers.rnaflow_wrapper import RNAFlowWrapper
-from app.utils.input import validate_protein_sequence
+from app.utils.wrappers._singleton import get_or_create
+from app.utils.input import validate_protein_sequence, validate_numeric_params
+from app.utils.cache import ttl_cache, with_etag, conditional_json
 
 logger = logging.getLogger(__name__)
 
 rnaflow_bp = Blueprint("rnaflow", __name__, url_prefix='/api/rnaflow')
 
-# Global wrapper instance
-_rnaflow_wrapper = None
+# Parameter schema: (name, types, min, max, error message)
+_DESIGN_SCHEMA = (
+    ("rna_length", int, 5, 200, "RNA length must be an integer between 5 and 200"),
+    ("num_samples", int, 1, 10, "Number of samples must be an integer between 1 and 10"),
+)
+
+# Model info keys returned unless ?verbose is set
+_SUMMARY_KEYS = ('name', 'version', 'input_types', 'output_types')
 
 def get_rnaflow_wrapper():
     """Get or create RNAFlow wrapper instance"""
-    global _rnaflow_wrapper
-    if _rnaflow_wrapper is None:
-        _rnaflow_wrapper = RNAFlowWrapper()
-    return _rnaflow_wrapper
+    return get_or_create("rnaflow", RNAFlowWrapper)
+
+@ttl_cache(ttl=30.0)
+def _cached_env_ready():
+    """Get cached RNAFlow environment readiness"""
+    return get_rnaflow_wrapper().setup_environment()
+
+@ttl_cache(ttl=30.0)
+def _cached_info():
+    """Get cached RNAFlow model information, full and summarized, each with its ETag"""
+    info = get_rnaflow_wrapper().get_model_info()
+    summary = {k: info[k] for k in _SUMMARY_KEYS if k in info}
+    return {"verbose": with_etag(info), "summary": with_etag(summary)}
 
 @rnaflow_bp.route('/design', methods=['POST'])
 def design_rna():
@@ -54,21 +71,18 @@ def design_rna():
                 "error": "Invalid protein sequence. Only standard amino acid letters (A-Z) are allowed."
             }), 400
         
-        # Validate RNA length
-        if not isinstance(rna_length, int) or rna_length < 5 or rna_length > 200:
+        # Validate RNA length and number of samples
+        error = validate_numeric_params({
+            "rna_length": rna_length,
+            "num_samples": num_samples
+        }, _DESIGN_SCHEMA)
+        if error:
             return jsonify({
                 "success": False,
-                "error": "RNA length must be an integer between 5 and 200"
+                "error": error
             }), 400
         
-        # Validate number of samples
-        if not isinstance(num_samples, int) or num_samples < 1 or num_samples > 10:
-            return jsonify({
-                "success": False,
-                "error": "Number of samples must be an integer between 1 and 10"
-            }), 400
-        
-        logger.info(f"RNAFlow design request: protein_length={len(protein_sequence)}, rna_length={rna_length}, num_samples={num_samples}")
+        logger.info("RNAFlow design request: protein_length=%d, rna_length=%d, num_samples=%d", len(protein_sequence), rna_length, num_samples)
         
         # Run design
         wrapper = get_rnaflow_wrapper()
@@ -88,7 +102,7 @@ def design_rna():
             }), 500
             
     except Exception as e:
-        logger.error(f"RNAFlow design error: {e}")
+        logger.error("RNAFlow design error: %s", e)
         return jsonify({
             "success": False,
             "error": f"Internal server error: {str(e)}"
@@ -98,11 +112,13 @@ def design_rna():
 def get_status():
     """Get RNAFlow model status"""
     try:
-        wrapper = get_rnaflow_wrapper()
-        info = wrapper.get_model_info()
+        if request.args.get('refresh'):
+            _cached_info.cache_clear()
+            _cached_env_ready.cache_clear()
+        info, _ = _cached_info()["verbose" if request.args.get('verbose') else "summary"]
         
         # Check if environment is properly set up
-        env_status = wrapper.setup_environment()
+        env_status = _cached_env_ready()
         
         return jsonify({
             "success": True,
@@ -112,7 +128,7 @@ def get_status():
         })
         
     except Exception as e:
-        logger.error(f"Failed to get RNAFlow status: {e}")
+        logger.error("Failed to get RNAFlow status: %s", e)
         return jsonify({
             "success": False,
             "error": f"Failed to get status: {str(e)}"
@@ -122,16 +138,17 @@ def get_status():
 def get_model_info():
     """Get RNAFlow model information"""
     try:
-        wrapper = get_rnaflow_wrapper()
-        info = wrapper.get_model_info()
+        if request.args.get('refresh'):
+            _cached_info.cache_clear()
+        info, etag = _cached_info()["verbose" if request.args.get('verbose') else "summary"]
         
-        return jsonify({
+        return conditional_json({
             "success": True,
             "model_info": info
-        })
+        }, etag)
         
     except Exception as e:
-        logger.error(f"Failed to get RNAFlow model info: {e}")
+        logger.error("Failed to get RNAFlow model info: %s", e)
         return jsonify({
             "success": False,
             "error": f"Failed to get model info: {str(e)}"
@@ -3,31 +3,26 @@ RNAformer API Routes
 Handles RNA secondary structure prediction requests
 """
 
-from flask import Blueprint, request, jsonify, current_app, send_file, send_from_directory
-import os
+from flask import Blueprint, request, jsonify, current_app, send_from_directory, Response
+import io
 import tempfile
 import logging
 from werkzeug.utils import secure_filename
 import json
 
 from app.utils.wrappers.rnaformer_wrapper import RNAformerWrapper
-from app.utils.input import validate_rna_sequence
-from app.utils.output import generate_ct_content, generate_multiple_ct_files, create_ct_zip_file, cleanup_temp_files
+from app.utils.wrappers._singleton import get_or_create
+from app.utils.input import normalize_rna_sequence
+from app.utils.output import generate_ct_content, generate_ct_entries, iter_ct_zip
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 rnaformer_bp = Blueprint("rnaformer", __name__, url_prefix='/api/rnaformer')
 
-# Global wrapper instance
-_rnaformer_wrapper = None
-
 def get_rnaformer_wrapper():
     """Get or create RNAformer wrapper instance"""
-    global _rnaformer_wrapper
-    if _rnaformer_wrapper is None:
-        _rnaformer_wrapper = RNAformerWrapper()
-    return _rnaformer_wrapper
+    return get_or_create("rnaformer", RNAformerWrapper)
 
 @rnaformer_bp.route('/predict', methods=['POST'])
 def predict_structure():
@@ -49,10 +44,13 @@ def predict_structure():
         if 'file' in request.files:
             file = request.files['file']
             if file.filename != '':
-                # Read and parse file content
-                content = file.read().decode('utf-8')
-                file_sequences = parse_fasta_file(content)
-                sequences.extend(file_sequences)
+                # Stream-parse file content line by line; records with non-ASCII
+                # characters are rejected by validation rather than silently altered
+                try:
+                    with io.TextIOWrapper(file.stream, encoding='utf-8') as text_stream:
+                        sequences.extend(iter_fasta(text_stream))
+                except UnicodeDecodeError:
+                    return jsonify({"success": False, "error": "File is not valid UTF-8 text"}), 400
         
         if not sequences:
             return jsonify({"success": False, "error": "No sequences provided"}), 400
@@ -60,9 +58,9 @@ def predict_structure():
         # Validate sequences
         validated_sequences = []
         for seq in sequences:
-            if validate_rna_sequence(seq):
-                # Convert to uppercase and add to validated sequences
-                validated_sequences.append(seq.upper())
+            normalized = normalize_rna_sequence(seq)
+            if normalized:
+                validated_sequences.append(normalized)
         
         if not validated_sequences:
             return jsonify({"success": False, "error": "No valid RNA sequences found"}), 400
@@ -77,7 +75,7 @@ def predict_structure():
             return jsonify(result), 500
             
     except Exception as e:
-        logger.error(f"RNAformer prediction error: {str(e)}")
+        logger.error("RNAformer prediction error: %s", e)
         return jsonify({
             "success": False,
             "error": f"Prediction failed: {str(e)}"
@@ -97,33 +95,30 @@ def health_check():
         }), 200 if is_healthy else 503
         
     except Exception as e:
-        logger.error(f"RNAformer health check failed: {str(e)}")
+        logger.error("RNAformer health check failed: %s", e)
         return jsonify({
             "status": "unhealthy",
             "error": str(e)
         }), 503
 
-def parse_fasta_file(content):
-    """Parse FASTA file content and extract sequences"""
-    sequences = []
-    current_sequence = ""
+def iter_fasta(lines):
+    """Yield sequences from an iterable of FASTA lines, one record at a time"""
+    current_parts = []
     
-    for line in content.split('\n'):
+    for line in lines:
         line = line.strip()
         if line.startswith('>'):
             # Header line
-            if current_sequence:
-                sequences.append(current_sequence)
-                current_sequence = ""
+            if current_parts:
+                yield ''.join(current_parts)
+                current_parts = []
         elif line:
             # Sequence line
-            current_sequence += line
-    
-    # Add last sequence
-    if current_sequence:
-        sequences.append(current_sequence)
+            current_parts.append(line)
     
-    return sequences
+    # Yield last sequence
+    if current_parts:
+        yield ''.join(current_parts)
 
 @rnaformer_bp.route('/download_ct', methods=['POST'])
 def download_ct_files():
@@ -137,36 +132,30 @@ def download_ct_files():
         if not results:
             return jsonify({"success": False, "error": "No results to download"}), 400
         
-        # Generate CT files
-        ct_files = generate_multiple_ct_files(results, "rnaformer_structures")
+        # Generate CT content in memory
+        ct_entries = generate_ct_entries(results, "rnaformer_structures")
         
-        if not ct_files:
+        if not ct_entries:
             return jsonify({"success": False, "error": "Failed to generate CT files"}), 500
         
-        try:
-            # Create ZIP file if multiple sequences
-            if len(ct_files) > 1:
-                zip_path = create_ct_zip_file(ct_files, "rnaformer_structures.zip")
-                return send_file(
-                    zip_path,
-                    as_attachment=True,
-                    download_name="rnaformer_structures.zip",
-                    mimetype="application/zip"
-                )
-            else:
-                # Send single CT file
-                return send_file(
-                    ct_files[0],
-                    as_attachment=True,
-                    download_name=os.path.basename(ct_files[0]),
-                    mimetype="text/plain"
-                )
-        finally:
-            # Clean up temporary files after sending
-            cleanup_temp_files(ct_files)
+        # Stream a ZIP if multiple sequences; bytes reach the client entry by entry
+        if len(ct_entries) > 1:
+            return Response(
+                iter_ct_zip(ct_entries),
+                mimetype="application/zip",
+                headers={"Content-Disposition": "attachment; filename=rnaformer_structures.zip"}
+            )
+        
+        # Send single CT file
+        filename, ct_content = ct_entries[0]
+        return Response(
+            ct_content,
+            mimetype="text/plain",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
             
     except Exception as e:
-        logger.error(f"CT file download error: {str(e)}")
+        logger.error("CT file download error: %s", e)
         return jsonify({
             "success": False,
             "error": f"Download failed: {str(e)}"
@@ -199,7 +188,7 @@ def generate_single_ct():
         })
         
     except Exception as e:
-        logger.error(f"CT generation error: {str(e)}")
+        logger.error("CT generation error: %s", e)
         return jsonify({
             "success": False,
             "error": f"CT generation failed: {str(e)}"
@@ -2,10 +2,13 @@
 RNA-FrameFlow API Routes
 """
 
-from flask import Blueprint, request, jsonify, send_file, abort
+from flask import Blueprint, request, jsonify, send_file, abort, current_app, Response
 import logging
 import os
+import shutil
 import sys
+import threading
+import uuid
 from pathlib import Path
 
 # Add the app directory to Python path
@@ -13,25 +16,51 @@ app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, app_dir)
 
 from utils.wrappers.rnaframeflow_wrapper import RNAFrameFlowWrapper
+from app.utils.wrappers._singleton import get_or_create
+from app.utils.cache import ttl_cache, with_etag, conditional_json
+from app.utils.input import validate_numeric_params
 
 logger = logging.getLogger(__name__)
 
 rnaframeflow_bp = Blueprint("rnaframeflow", __name__)
 
-# Global wrapper instance
-rnaframeflow_wrapper = None
+# Parameter schema: (name, types, min, max, error message)
+_DESIGN_SCHEMA = (
+    ("sequence_length", int, 10, 200, "Sequence length must be an integer between 10 and 200"),
+    ("num_sequences", int, 1, 20, "Number of sequences must be an integer between 1 and 20"),
+    ("temperature", (int, float), 0.1, 2.0, "Temperature must be a number between 0.1 and 2.0"),
+    ("num_timesteps", int, 10, 200, "Sampling timesteps must be an integer between 10 and 200"),
+    ("min_t", (int, float), 0.001, 0.1, "Minimum time must be a number between 0.001 and 0.1"),
+    ("exp_rate", int, 1, 50, "Exponential rate must be an integer between 1 and 50"),
+)
+
+# Model info keys returned unless ?verbose is set
+_SUMMARY_KEYS = ('name', 'type', 'environment_ready')
+
+# 项目根目录下的temp文件夹（导入时计算一次）
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_TEMP_DIR = os.path.join(_PROJECT_ROOT, 'temp')
+_TEMP_SAMPLES_DIR = os.path.join(_TEMP_DIR, 'samples')
+
+# Basename -> absolute path index of generated PDB files under temp/samples,
+# and the mtimes of temp/samples and its length_* directories when it was built
+_pdb_index = {}
+_pdb_index_mtimes = {}
 
 def get_wrapper():
     """Get or create RNA-FrameFlow wrapper instance"""
-    global rnaframeflow_wrapper
-    if rnaframeflow_wrapper is None:
-        try:
-            rnaframeflow_wrapper = RNAFrameFlowWrapper()
-            logger.info("RNA-FrameFlow wrapper created successfully")
-        except Exception as e:
-            logger.error(f"Failed to create RNA-FrameFlow wrapper: {e}")
-            return None
-    return rnaframeflow_wrapper
+    try:
+        return get_or_create("rnaframeflow", RNAFrameFlowWrapper)
+    except Exception as e:
+        logger.error("Failed to create RNA-FrameFlow wrapper: %s", e)
+        return None
+
+@ttl_cache(ttl=30.0)
+def _cached_info():
+    """Get cached RNA-FrameFlow model information, full and summarized, each with its ETag"""
+    info = get_wrapper().get_model_info()
+    summary = {k: info[k] for k in _SUMMARY_KEYS if k in info}
+    return {"verbose": with_etag(info), "summary": with_etag(summary)}
 
 @rnaframeflow_bp.route('/design', methods=['POST'])
 def design_rna_backbone():
@@ -57,40 +86,18 @@ def design_rna_backbone():
         overwrite = data.get('overwrite', False)
         
         # Validate parameters
-        if not isinstance(sequence_length, int) or sequence_length < 10 or sequence_length > 200:
-            return jsonify({
-                "success": False,
-                "error": "Sequence length must be an integer between 10 and 200"
-            }), 400
-        
-        if not isinstance(num_sequences, int) or num_sequences < 1 or num_sequences > 20:
-            return jsonify({
-                "success": False,
-                "error": "Number of sequences must be an integer between 1 and 20"
-            }), 400
-        
-        if not isinstance(temperature, (int, float)) or temperature < 0.1 or temperature > 2.0:
+        error = validate_numeric_params({
+            "sequence_length": sequence_length,
+            "num_sequences": num_sequences,
+            "temperature": temperature,
+            "num_timesteps": num_timesteps,
+            "min_t": min_t,
+            "exp_rate": exp_rate
+        }, _DESIGN_SCHEMA)
+        if error:
             return jsonify({
                 "success": False,
-                "error": "Temperature must be a number between 0.1 and 2.0"
-            }), 400
-        
-        if not isinstance(num_timesteps, int) or num_timesteps < 10 or num_timesteps > 200:
-            return jsonify({
-                "success": False,
-                "error": "Sampling timesteps must be an integer between 10 and 200"
-            }), 400
-        
-        if not isinstance(min_t, (int, float)) or min_t < 0.001 or min_t > 0.1:
-            return jsonify({
-                "success": False,
-                "error": "Minimum time must be a number between 0.001 and 0.1"
-            }), 400
-        
-        if not isinstance(exp_rate, int) or exp_rate < 1 or exp_rate > 50:
-            return jsonify({
-                "success": False,
-                "error": "Exponential rate must be an integer between 1 and 50"
+                "error": error
             }), 400
         
         # Get wrapper
@@ -126,7 +133,7 @@ def design_rna_backbone():
             }), 500
             
     except Exception as e:
-        logger.error(f"Error in design_rna_backbone: {e}")
+        logger.error("Error in design_rna_backbone: %s", e)
         return jsonify({
             "success": False,
             "error": str(e)
@@ -143,14 +150,16 @@ def get_model_info():
                 "error": "Failed to initialize RNA-FrameFlow wrapper"
             }), 500
         
-        info = wrapper.get_model_info()
-        return jsonify({
+        if request.args.get('refresh'):
+            _cached_info.cache_clear()
+        info, etag = _cached_info()["verbose" if request.args.get('verbose') else "summary"]
+        return conditional_json({
             "success": True,
             "info": info
-        })
+        }, etag)
         
     except Exception as e:
-        logger.error(f"Error in get_model_info: {e}")
+        logger.error("Error in get_model_info: %s", e)
         return jsonify({
             "success": False,
             "error": str(e)
@@ -176,56 +185,89 @@ def get_model_status():
         })
         
     except Exception as e:
-        logger.error(f"Error in get_model_status: {e}")
+        logger.error("Error in get_model_status: %s", e)
         return jsonify({
             "success": False,
             "status": "error",
             "error": str(e)
         }), 500
 
+def _rebuild_pdb_index(temp_samples_dir):
+    """Rebuild the PDB index with one scandir per length_* directory, recording each directory's mtime"""
+    global _pdb_index, _pdb_index_mtimes
+    index = {}
+    mtimes = {temp_samples_dir: os.stat(temp_samples_dir).st_mtime}
+    with os.scandir(temp_samples_dir) as entries:
+        for entry in entries:
+            if not entry.name.startswith('length_') or not entry.is_dir():
+                continue
+            mtimes[entry.path] = entry.stat().st_mtime
+            with os.scandir(entry.path) as files:
+                for file_entry in files:
+                    if file_entry.is_file():
+                        index.setdefault(file_entry.name, file_entry.path)
+    _pdb_index = index
+    _pdb_index_mtimes = mtimes
+
+def _pdb_index_stale():
+    """Check whether any indexed directory changed since the index was built"""
+    for path, mtime in _pdb_index_mtimes.items():
+        try:
+            if os.stat(path).st_mtime != mtime:
+                return True
+        except FileNotFoundError:
+            return True
+    return False
+
+def _lookup_pdb_file(temp_samples_dir, filename):
+    """Find a generated PDB file by basename, refreshing the index only when a directory changed"""
+    try:
+        mtime = os.stat(temp_samples_dir).st_mtime
+    except FileNotFoundError:
+        return None
+    
+    if mtime != _pdb_index_mtimes.get(temp_samples_dir):
+        _rebuild_pdb_index(temp_samples_dir)
+        return _pdb_index.get(filename)
+    
+    file_path = _pdb_index.get(filename)
+    if file_path is None and _pdb_index_stale():
+        # New files inside an existing length_* directory only touch that directory's mtime,
+        # so misses for files that really do not exist never rescan the tree
+        _rebuild_pdb_index(temp_samples_dir)
+        file_path = _pdb_index.get(filename)
+    return file_path
+
 @rnaframeflow_bp.route('/download/<path:filename>', methods=['GET'])
 def download_pdb_file(filename):
     """Download PDB file"""
     try:
-        # 构建文件路径（使用根目录下的temp文件夹）
-        # 从API文件路径: /home/zhangliqin/RNA-Factory/app/api/rnaframeflow_routes.py
-        # 回到项目根目录: /home/zhangliqin/RNA-Factory
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        temp_samples_dir = os.path.join(project_root, 'temp', 'samples')
-        
         # 支持两种路径格式：
         # 1. 直接文件名: na_sample_0.pdb
         # 2. 完整路径: length_25/na_sample_0.pdb
         if '/' in filename:
             # 完整路径
-            file_path = os.path.join(temp_samples_dir, filename)
+            file_path = os.path.join(_TEMP_SAMPLES_DIR, filename)
         else:
-            # 直接文件名，需要查找对应的目录
-            if os.path.exists(temp_samples_dir):
-                # 查找包含该文件的子目录
-                for subdir in os.listdir(temp_samples_dir):
-                    if subdir.startswith('length_'):
-                        potential_file = os.path.join(temp_samples_dir, subdir, filename)
-                        if os.path.exists(potential_file):
-                            file_path = potential_file
-                            break
-                else:
-                    # 如果没找到，尝试直接路径
-                    file_path = os.path.join(temp_samples_dir, filename)
-            else:
-                file_path = os.path.join(temp_samples_dir, filename)
+            # 直接文件名，通过索引查找对应的目录
+            file_path = _lookup_pdb_file(_TEMP_SAMPLES_DIR, filename) or os.path.join(_TEMP_SAMPLES_DIR, filename)
         
         # 检查文件是否存在
         if not os.path.exists(file_path):
-            logger.error(f"PDB file not found: {file_path}")
-            logger.error(f"Available files in temp/samples:")
-            if os.path.exists(temp_samples_dir):
-                for root, dirs, files in os.walk(temp_samples_dir):
-                    for file in files:
-                        logger.error(f"  - {os.path.join(root, file)}")
+            logger.error("PDB file not found: %s (index has %d entries)", file_path, len(_pdb_index))
             abort(404)
         
-        # 发送文件
+        # 由nginx通过X-Accel-Redirect直接发送文件
+        accel_prefix = current_app.config.get('X_ACCEL_REDIRECT_PREFIX')
+        if accel_prefix:
+            relpath = os.path.relpath(file_path, _TEMP_DIR).replace(os.sep, '/')
+            return Response(headers={
+                'X-Accel-Redirect': accel_prefix.rstrip('/') + '/' + relpath,
+                'Content-Type': 'text/plain',
+                'Content-Disposition': f'attachment; filename={os.path.basename(filename)}'
+            })
+        
+        # 发送文件（启用USE_X_SENDFILE时由前端服务器发送）
         return send_file(
             file_path,
             as_attachment=True,
@@ -234,29 +276,26 @@ def download_pdb_file(filename):
         )
         
     except Exception as e:
-        logger.error(f"Error downloading PDB file: {e}")
+        logger.error("Error downloading PDB file: %s", e)
         abort(500)
 
 @rnaframeflow_bp.route('/clear-temp', methods=['POST'])
 def clear_temp_folder():
     """Clear temp folder contents"""
     try:
-        import shutil
-        
-        # 构建temp目录路径
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        temp_dir = os.path.join(project_root, 'temp')
-        
-        if os.path.exists(temp_dir):
-            # 删除temp目录下的所有内容
-            for item in os.listdir(temp_dir):
-                item_path = os.path.join(temp_dir, item)
-                if os.path.isdir(item_path):
-                    shutil.rmtree(item_path)
-                else:
-                    os.remove(item_path)
+        if os.path.exists(_TEMP_DIR):
+            # 将temp目录整体重命名后在后台删除，请求无需等待逐个删除文件
+            garbage_dir = f"{_TEMP_DIR}.gc.{uuid.uuid4().hex}"
+            os.rename(_TEMP_DIR, garbage_dir)
+            os.makedirs(_TEMP_DIR, exist_ok=True)
+            threading.Thread(
+                target=shutil.rmtree,
+                args=(garbage_dir,),
+                kwargs={'ignore_errors': True},
+                daemon=True
+            ).start()
             
-            logger.info(f"Cleared temp folder: {temp_dir}")
+            logger.info("Cleared temp folder: %s", _TEMP_DIR)
             return jsonify({
                 "success": True,
                 "message": "Temp folder cleared successfully"
@@ -269,7 +308,7 @@ def clear_temp_folder():
             })
         
     except Exception as e:
-        logger.error(f"Error clearing temp folder: {e}")
+        logger.error("Error clearing temp folder: %s", e)
         return jsonify({
             "success": False,
             "error": str(e)
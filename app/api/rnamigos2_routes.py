@@ -3,41 +3,97 @@ RNAmigos2 API Routes
 Handles RNA-ligand interaction prediction requests
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 import os
-import tempfile
+import re
+import time
+import uuid
+import shutil
 import logging
 from werkzeug.utils import secure_filename
 import json
 
 from app.utils.wrappers.rnamigos2_wrapper import RNAmigos2Wrapper
+from app.utils.wrappers._singleton import get_or_create
 from app.utils.input import validate_rnamigos2_input
+from app.utils.scratch import new_path, shared_dir
+from app.utils.predict_cache import cached_predict, file_digest
+from app.utils.cache import ttl_cache, with_etag, conditional_json
+from app.utils.gpu_pool import run_gpu, GPUQueueFullError, RETRY_AFTER
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 rnamigos2_bp = Blueprint("rnamigos2", __name__, url_prefix='/api/rnamigos2')
 
-# Global wrapper instance
-_rnamigos2_wrapper = None
+# Uploaded structures live in shared (tmpfs when available) scratch under a random token,
+# so any worker can claim them and claiming is a rename rather than a copy
+_CIF_TOKEN_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+_CIF_UPLOAD_MAX_AGE = 3600  # seconds
+_CIF_HEAD_SIZE = 64 * 1024  # bytes searched for the data_ block
 
 def get_rnamigos2_wrapper():
     """Get or create RNAmigos2 wrapper instance"""
-    global _rnamigos2_wrapper
-    if _rnamigos2_wrapper is None:
-        _rnamigos2_wrapper = RNAmigos2Wrapper()
-    return _rnamigos2_wrapper
+    return get_or_create("rnamigos2", RNAmigos2Wrapper)
+
+def _cif_upload_dir():
+    """Get the directory holding uploaded mmCIF files, creating it if needed"""
+    return shared_dir('rnamigos2-uploads')
+
+def _prune_cif_uploads(upload_dir):
+    """Delete uploaded mmCIF files older than the maximum age"""
+    cutoff = time.time() - _CIF_UPLOAD_MAX_AGE
+    with os.scandir(upload_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # Claimed or pruned concurrently
+                continue
+
+def _store_cif_upload(file):
+    """Stream an uploaded mmCIF file to disk and return its token, or None if it is not mmCIF"""
+    upload_dir = _cif_upload_dir()
+    _prune_cif_uploads(upload_dir)
+    
+    token = uuid.uuid4().hex
+    path = os.path.join(upload_dir, f"{token}.cif")
+    with open(path, 'wb') as out:
+        shutil.copyfileobj(file.stream, out, length=1 << 20)
+    
+    # mmCIF files open with their data_ block
+    with open(path, 'rb') as f:
+        head = f.read(_CIF_HEAD_SIZE)
+    if b'data_' not in head.lower():
+        os.remove(path)
+        return None
+    return token
+
+def _claim_cif_upload(token, dest_path):
+    """Move an uploaded mmCIF file to dest_path; returns False for unknown or expired tokens"""
+    if not _CIF_TOKEN_PATTERN.match(token):
+        return False
+    try:
+        shutil.move(os.path.join(_cif_upload_dir(), f"{token}.cif"), dest_path)
+    except FileNotFoundError:
+        return False
+    return True
+
+@ttl_cache(ttl=30.0)
+def _cached_model_info():
+    """Get cached RNAmigos2 model information and its ETag"""
+    return with_etag(get_rnamigos2_wrapper().get_model_info())
 
 @rnamigos2_bp.route('/info', methods=['GET'])
 def get_model_info():
     """Get RNAmigos2 model information"""
     try:
-        wrapper = get_rnamigos2_wrapper()
-        info = wrapper.get_model_info()
-        return jsonify({
+        info, etag = _cached_model_info()
+        return conditional_json({
             "success": True,
             "model_info": info
-        })
+        }, etag)
     except Exception as e:
         logger.error(f"Failed to get RNAmigos2 model info: {e}")
         return jsonify({
@@ -66,25 +122,37 @@ def predict_interactions():
             }), 400
         
         # Extract parameters
-        cif_content = data.get("cif_content", "")
+        cif_content = data.get("cif_content")
+        cif_token = data.get("cif_token")
         residue_list = data.get("residue_list", [])
         smiles_list = data.get("smiles_list", [])
         
-        # Create temporary CIF file
-        temp_dir = tempfile.mkdtemp()
-        cif_path = os.path.join(temp_dir, "structure.cif")
+        # Temporary CIF file in this worker's scratch directory
+        cif_path = new_path(".cif")
         
         try:
-            with open(cif_path, 'w') as f:
-                f.write(cif_content)
+            if cif_content is not None:
+                with open(cif_path, 'w') as f:
+                    f.write(cif_content)
+            elif not _claim_cif_upload(cif_token, cif_path):
+                return jsonify({
+                    "success": False,
+                    "error": "Unknown or expired cif_token"
+                }), 400
             
-            # Get wrapper and run prediction
+            # Get wrapper and run prediction, keyed by the structure digest rather than its contents
             wrapper = get_rnamigos2_wrapper()
-            result = wrapper.predict_interactions(
+            payload = {
+                "cif_digest": file_digest(cif_path),
+                "residue_list": residue_list,
+                "smiles_list": smiles_list
+            }
+            result = cached_predict("rnamigos2", payload, lambda: run_gpu(
+                wrapper.predict_interactions,
                 cif_path=cif_path,
                 residue_list=residue_list,
                 smiles_list=smiles_list
-            )
+            ))
             
             if result["success"]:
                 return jsonify({
@@ -99,11 +167,17 @@ def predict_interactions():
                 }), 500
                 
         finally:
-            # Cleanup temporary files
-            if os.path.exists(temp_dir):
-                import shutil
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            # Cleanup temporary file
+            try:
+                os.unlink(cif_path)
+            except FileNotFoundError:
+                pass
         
+    except GPUQueueFullError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 503, {"Retry-After": str(RETRY_AFTER)}
     except Exception as e:
         logger.error(f"RNAmigos2 prediction failed: {e}")
         return jsonify({
@@ -129,12 +203,17 @@ def upload_structure():
             }), 400
         
         if file and file.filename.lower().endswith(('.cif', '.mmcif')):
-            # Read file content
-            content = file.read().decode('utf-8')
+            # Keep the file server-side; /predict takes the token as cif_token
+            token = _store_cif_upload(file)
+            if token is None:
+                return jsonify({
+                    "success": False,
+                    "error": "Invalid mmCIF format: missing data_ block"
+                }), 400
             
             return jsonify({
                 "success": True,
-                "content": content,
+                "token": token,
                 "filename": secure_filename(file.filename)
             })
         else:
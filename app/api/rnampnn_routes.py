@@ -3,39 +3,59 @@ RNAMPNN API Routes
 API endpoints for RNAMPNN RNA sequence prediction from 3D structure
 """
 
+import base64
 import logging
+import numpy as np
 from flask import Blueprint, request, jsonify, send_file
-import tempfile
 import os
 from pathlib import Path
 
 from app.utils.wrappers import RNAMPNNWrapper
+from app.utils.wrappers._singleton import get_or_create
+from app.utils.io import save_upload_fast
+from app.utils.predict_cache import cached_predict, data_digest, file_digest
+from app.utils.cache import ttl_cache, with_etag, conditional_json
+from app.utils.gpu_pool import run_gpu, GPUQueueFullError, RETRY_AFTER
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 rnampnn_bp = Blueprint('rnampnn', __name__, url_prefix='/api/rnampnn')
 
-# Global RNAMPNN wrapper instance
-rnampnn_wrapper = None
-
 def get_rnampnn_wrapper():
     """Get or initialize RNAMPNN wrapper"""
-    global rnampnn_wrapper
-    if rnampnn_wrapper is None:
-        rnampnn_wrapper = RNAMPNNWrapper()
-    return rnampnn_wrapper
+    return get_or_create("rnampnn", RNAMPNNWrapper)
+
+def _decode_coordinates(data):
+    """
+    Decode a coordinate payload into a contiguous float32 array
+    
+    Accepts either {"coordinates_b64": <base64 little-endian float32>, "shape": [L, A, 3]}
+    or the legacy nested-list {"coordinates": [...]}. Raises ValueError on malformed input.
+    """
+    if 'coordinates_b64' in data:
+        shape = data.get('shape')
+        if not isinstance(shape, list) or not all(isinstance(dim, int) and dim > 0 for dim in shape):
+            raise ValueError("shape must be a list of positive integers")
+        buffer = base64.b64decode(data['coordinates_b64'], validate=True)
+        return np.frombuffer(buffer, dtype='<f4').reshape(shape)
+    
+    return np.ascontiguousarray(np.asarray(data['coordinates'], dtype=np.float32))
+
+@ttl_cache(ttl=30.0)
+def _cached_model_info():
+    """Get cached RNAMPNN model information and its ETag"""
+    return with_etag(get_rnampnn_wrapper().get_model_info())
 
 @rnampnn_bp.route('/info', methods=['GET'])
 def get_model_info():
     """Get RNAMPNN model information"""
     try:
-        wrapper = get_rnampnn_wrapper()
-        info = wrapper.get_model_info()
-        return jsonify({
+        info, etag = _cached_model_info()
+        return conditional_json({
             "success": True,
             "model_info": info
-        })
+        }, etag)
     except Exception as e:
         logger.error(f"Failed to get RNAMPNN model info: {e}")
         return jsonify({
@@ -68,9 +88,7 @@ def predict_sequence():
             }), 400
         
         # Save uploaded file to temporary location
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, file.filename)
-        file.save(temp_file_path)
+        temp_file_path = save_upload_fast(file, '.pdb')
         
         try:
             # Get wrapper and validate file
@@ -85,7 +103,11 @@ def predict_sequence():
                 }), 400
             
             # Perform prediction
-            result = wrapper.predict_sequence(temp_file_path)
+            result = cached_predict(
+                "rnampnn",
+                {"pdb_digest": file_digest(temp_file_path)},
+                lambda: run_gpu(wrapper.predict_sequence, temp_file_path)
+            )
             
             if result.get("success", False):
                 return jsonify({
@@ -94,7 +116,7 @@ def predict_sequence():
                         "predicted_sequence": result["predicted_sequence"],
                         "confidence_scores": result["confidence_scores"],
                         "sequence_length": result["sequence_length"],
-                        "input_file": result["input_file"],
+                        "input_file": file.filename,
                         "model_info": result["model_info"]
                     },
                     "validation": validation_result
@@ -109,10 +131,16 @@ def predict_sequence():
             # Clean up temporary file
             try:
                 os.remove(temp_file_path)
-                os.rmdir(temp_dir)
-            except:
+            except FileNotFoundError:
                 pass
+            except OSError as e:
+                logger.warning(f"Failed to remove temporary file {temp_file_path}: {e}")
         
+    except GPUQueueFullError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 503, {"Retry-After": str(RETRY_AFTER)}
     except Exception as e:
         logger.error(f"RNAMPNN prediction failed: {e}")
         return jsonify({
@@ -145,9 +173,7 @@ def validate_pdb():
             }), 400
         
         # Save uploaded file to temporary location
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, file.filename)
-        file.save(temp_file_path)
+        temp_file_path = save_upload_fast(file, '.pdb')
         
         try:
             # Get wrapper and validate file
@@ -163,9 +189,10 @@ def validate_pdb():
             # Clean up temporary file
             try:
                 os.remove(temp_file_path)
-                os.rmdir(temp_dir)
-            except:
+            except FileNotFoundError:
                 pass
+            except OSError as e:
+                logger.warning(f"Failed to remove temporary file {temp_file_path}: {e}")
         
     except Exception as e:
         logger.error(f"PDB validation failed: {e}")
@@ -180,24 +207,21 @@ def predict_from_coordinates():
     try:
         data = request.get_json()
         
-        if not data or 'coordinates' not in data:
+        if not data or ('coordinates' not in data and 'coordinates_b64' not in data):
             return jsonify({
                 "success": False,
                 "error": "No coordinates provided"
             }), 400
         
-        coordinates = data['coordinates']
-        
         # Validate coordinates format
-        if not isinstance(coordinates, list):
+        if 'coordinates_b64' not in data and not isinstance(data['coordinates'], list):
             return jsonify({
                 "success": False,
                 "error": "Coordinates must be a list"
             }), 400
         
         try:
-            import numpy as np
-            coords_array = np.array(coordinates, dtype=np.float32)
+            coords_array = _decode_coordinates(data)
             
             # Check dimensions
             if coords_array.ndim != 3:
@@ -214,7 +238,11 @@ def predict_from_coordinates():
             
             # Get wrapper and perform prediction
             wrapper = get_rnampnn_wrapper()
-            result = wrapper.predict_sequence_from_coords(coords_array)
+            payload = {
+                "coords_digest": data_digest(coords_array),
+                "shape": list(coords_array.shape)
+            }
+            result = cached_predict("rnampnn", payload, lambda: run_gpu(wrapper.predict_sequence_from_coords, coords_array))
             
             if result.get("success", False):
                 return jsonify({
@@ -238,6 +266,11 @@ def predict_from_coordinates():
                 "error": f"Invalid coordinates format: {str(e)}"
             }), 400
         
+    except GPUQueueFullError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 503, {"Retry-After": str(RETRY_AFTER)}
     except Exception as e:
         logger.error(f"Coordinate prediction failed: {e}")
         return jsonify({
@@ -249,14 +282,13 @@ def predict_from_coordinates():
 def get_status():
     """Get RNAMPNN service status"""
     try:
-        wrapper = get_rnampnn_wrapper()
-        info = wrapper.get_model_info()
+        info, etag = _cached_model_info()
         
-        return jsonify({
+        return conditional_json({
             "success": True,
             "status": "ready" if info.get("model_loaded", False) else "not_loaded",
             "model_info": info
-        })
+        }, etag)
         
     except Exception as e:
         logger.error(f"Failed to get RNAMPNN status: {e}")
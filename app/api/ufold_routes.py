@@ -3,42 +3,69 @@ UFold API Routes
 Fast and Accurate RNA Secondary Structure Prediction with Deep Learning
 """
 
-from flask import Blueprint, request, jsonify, send_file
-import tempfile
+from flask import Blueprint, request, jsonify, Response
+import io
 import os
 import logging
 from pathlib import Path
 
 from app.utils.wrappers import UFoldWrapper
+from app.utils.wrappers._singleton import get_or_create
 from app.utils.input import validate_rna_sequence, parse_fasta_file
+from app.utils.predict_cache import prediction_cache
+from app.utils.cache import ttl_cache, with_etag, conditional_json
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 ufold_bp = Blueprint('ufold', __name__, url_prefix='/api/ufold')
 
-# UFold wrapper instance
-ufold_wrapper = None
-
 def get_ufold_wrapper():
     """Get or create UFold wrapper instance"""
-    global ufold_wrapper
-    if ufold_wrapper is None:
-        ufold_wrapper = UFoldWrapper()
-    return ufold_wrapper
+    return get_or_create("ufold", UFoldWrapper)
+
+def _predict_cached(sequences, predict_nc):
+    """
+    Predict sequences in one UFold run, reusing cached per-sequence results
+    
+    Returns:
+        The wrapper's result dict, with results for every sequence in input order
+    """
+    predict_nc = bool(predict_nc)
+    payloads = [{"sequence": seq, "predict_nc": predict_nc} for seq in sequences]
+    results = [prediction_cache.get("ufold", payload) for payload in payloads]
+    
+    # Only cache misses go to UFold, all in a single run
+    misses = [i for i, result in enumerate(results) if result is None]
+    if not misses:
+        return {"success": True, "results": results, "stdout": "", "stderr": ""}
+    
+    result = get_ufold_wrapper().predict([sequences[i] for i in misses], predict_nc)
+    if not result["success"]:
+        return result
+    
+    for i, prediction in zip(misses, result["results"]):
+        results[i] = prediction
+        prediction_cache.set("ufold", payloads[i], prediction)
+    result["results"] = results
+    return result
+
+@ttl_cache(ttl=30.0)
+def _cached_model_info():
+    """Get cached UFold model information and its ETag"""
+    return with_etag(get_ufold_wrapper().get_model_info())
 
 @ufold_bp.route('/status', methods=['GET'])
 def get_status():
     """Get UFold model status"""
     try:
-        wrapper = get_ufold_wrapper()
-        model_info = wrapper.get_model_info()
+        model_info, etag = _cached_model_info()
         
-        return jsonify({
+        return conditional_json({
             "success": True,
             "model_info": model_info,
             "status": "ready" if model_info["available"] else "not_available"
-        })
+        }, etag)
     except Exception as e:
         logger.error(f"Failed to get UFold status: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
@@ -57,26 +84,17 @@ def predict_sequences():
         if not sequences:
             return jsonify({"success": False, "error": "No sequences provided"}), 400
         
-        # Validate sequences
-        validated_sequences = []
-        for i, seq in enumerate(sequences):
-            try:
-                if validate_rna_sequence(seq):
-                    validated_sequences.append(seq)
-                else:
-                    return jsonify({
-                        "success": False, 
-                        "error": f"Invalid sequence at index {i}: contains non-RNA characters"
-                    }), 400
-            except Exception as e:
-                return jsonify({
-                    "success": False, 
-                    "error": f"Invalid sequence at index {i}: {str(e)}"
-                }), 400
+        # Validate sequences, reporting the first invalid index
+        invalid_index = next((i for i, seq in enumerate(sequences) if not validate_rna_sequence(seq)), None)
+        if invalid_index is not None:
+            return jsonify({
+                "success": False, 
+                "error": f"Invalid sequence at index {invalid_index}: contains non-RNA characters"
+            }), 400
+        validated_sequences = list(sequences)
         
         # Get wrapper and predict
-        wrapper = get_ufold_wrapper()
-        result = wrapper.predict(validated_sequences, predict_nc)
+        result = _predict_cached(validated_sequences, predict_nc)
         
         if result["success"]:
             return jsonify(result)
@@ -111,8 +129,7 @@ def predict_from_file():
             return jsonify({"success": False, "error": "No valid sequences found in file"}), 400
         
         # Get wrapper and predict
-        wrapper = get_ufold_wrapper()
-        result = wrapper.predict(sequences, predict_nc)
+        result = _predict_cached(sequences, predict_nc)
         
         if result["success"]:
             return jsonify(result)
@@ -126,6 +143,11 @@ def predict_from_file():
 @ufold_bp.route('/download/<format>', methods=['POST'])
 def download_results(format):
     """Download prediction results in specified format"""
+    # Reject unknown formats before touching the request body
+    writer = _DOWNLOAD_WRITERS.get(format)
+    if writer is None:
+        return jsonify({"success": False, "error": f"Unsupported format: {format}"}), 400
+    
     try:
         data = request.get_json()
         if not data or 'results' not in data:
@@ -135,68 +157,67 @@ def download_results(format):
         if not results:
             return jsonify({"success": False, "error": "No results to download"}), 400
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix=f'.{format}', delete=False) as tmp_file:
-            if format == 'ct':
-                _write_ct_format(tmp_file, results)
-            elif format == 'bpseq':
-                _write_bpseq_format(tmp_file, results)
-            elif format == 'fasta':
-                _write_fasta_format(tmp_file, results)
-            else:
-                return jsonify({"success": False, "error": f"Unsupported format: {format}"}), 400
-            
-            tmp_file.flush()
-            
-            return send_file(
-                tmp_file.name,
-                as_attachment=True,
-                download_name=f'ufold_results.{format}',
-                mimetype='text/plain'
-            )
+        # Render in memory; the files are small text and never need to touch disk
+        buffer = io.StringIO()
+        writer(buffer, results)
+        
+        return Response(
+            buffer.getvalue(),
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename=ufold_results.{format}'}
+        )
             
     except Exception as e:
         logger.error(f"Download failed: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+def _parse_pair_table(blob, pair_column, min_fields):
+    """Parse CT/BPSEQ data once into a position -> paired position mapping"""
+    pairs = {}
+    for line in blob.strip().split('\n')[1:]:  # Skip header
+        parts = line.split()
+        if len(parts) >= min_fields:
+            try:
+                # First entry for a position wins
+                pairs.setdefault(int(parts[0]), int(parts[pair_column]))
+            except ValueError:
+                continue
+    return pairs
+
 def _write_ct_format(file, results):
     """Write results in CT format"""
+    chunks = []
     for i, result in enumerate(results):
-        file.write(f"{len(result['sequence'])} sequence_{i+1}\n")
+        chunks.append(f"{len(result['sequence'])} sequence_{i+1}\n")
+        pairs = _parse_pair_table(result['ct_data'], 4, 6) if 'ct_data' in result else {}
         # CT format: position, base, prev, next, pair, position
-        for j, base in enumerate(result['sequence']):
-            pair = 0  # Default no pair
-            if 'ct_data' in result:
-                # Parse CT data to find pairs
-                lines = result['ct_data'].strip().split('\n')
-                for line in lines[1:]:  # Skip header
-                    parts = line.split()
-                    if len(parts) >= 6 and int(parts[0]) == j + 1:
-                        pair = int(parts[4])
-                        break
-            
-            file.write(f"{j+1} {base} {j} {j+2} {pair} {j+1}\n")
+        chunks.extend(
+            f"{j+1} {base} {j} {j+2} {pairs.get(j + 1, 0)} {j+1}\n"
+            for j, base in enumerate(result['sequence'])
+        )
+    file.write(''.join(chunks))
 
 def _write_bpseq_format(file, results):
     """Write results in BPSEQ format"""
+    chunks = []
     for i, result in enumerate(results):
-        file.write(f"# BPSEQ format for sequence_{i+1}\n")
+        chunks.append(f"# BPSEQ format for sequence_{i+1}\n")
+        pairs = _parse_pair_table(result['bpseq_data'], 2, 3) if 'bpseq_data' in result else {}
         # BPSEQ format: position, base, pair
-        for j, base in enumerate(result['sequence']):
-            pair = 0  # Default no pair
-            if 'bpseq_data' in result:
-                # Parse BPSEQ data to find pairs
-                lines = result['bpseq_data'].strip().split('\n')
-                for line in lines[1:]:  # Skip header
-                    parts = line.split()
-                    if len(parts) >= 3 and int(parts[0]) == j + 1:
-                        pair = int(parts[2])
-                        break
-            
-            file.write(f"{j+1} {base} {pair}\n")
+        chunks.extend(
+            f"{j+1} {base} {pairs.get(j + 1, 0)}\n"
+            for j, base in enumerate(result['sequence'])
+        )
+    file.write(''.join(chunks))
 
 def _write_fasta_format(file, results):
     """Write results in FASTA format"""
     for i, result in enumerate(results):
         file.write(f">sequence_{i+1}\n")
         file.write(f"{result['sequence']}\n")
+
+_DOWNLOAD_WRITERS = {
+    'ct': _write_ct_format,
+    'bpseq': _write_bpseq_format,
+    'fasta': _write_fasta_format,
+}
@@ -8,11 +8,12 @@ This package contains the core AI components including:
 - Prompt templates and management
 """
 
-from .copilot import RNADesignAssistant
-from .rag import RNADesignRAGSystem
+import importlib
+
 from .prompts import (
     RNA_DESIGN_SYSTEM_PROMPT,
     GENERAL_BIOINFO_SYSTEM_PROMPT,
+    SYSTEM_CONTEXT_TEMPLATE,
     QUERY_CLASSIFICATION_PROMPT,
     OFF_TOPIC_REDIRECTION,
     RESPONSE_TEMPLATES,
@@ -22,11 +23,33 @@ from .prompts import (
     LITERATURE_REFERENCE_REQUIRED
 )
 
+# The assistant and RAG system pull in langchain, chromadb, torch and CLIP, so
+# they are imported on first attribute access instead of with the package
+_LAZY_ATTRS = {
+    'RNADesignAssistant': '.copilot',
+    'RNADesignRAGSystem': '.rag',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
 __all__ = [
     'RNADesignAssistant',
     'RNADesignRAGSystem',
     'RNA_DESIGN_SYSTEM_PROMPT',
     'GENERAL_BIOINFO_SYSTEM_PROMPT',
+    'SYSTEM_CONTEXT_TEMPLATE',
     'QUERY_CLASSIFICATION_PROMPT',
     'OFF_TOPIC_REDIRECTION',
     'RESPONSE_TEMPLATES',
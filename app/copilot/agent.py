@@ -5,15 +5,302 @@ This module provides an intelligent agent that can call platform tools
 to perform RNA analysis tasks based on user requests.
 """
 
+import re
 import json
 import logging
 import requests
-from typing import Dict, Any, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Upper bound on tool calls made concurrently for one analysis plan
+MAX_PARALLEL_TOOLS = 8
+
+# Sequence patterns for _extract_sequences_from_text, compiled once. Each is a
+# single alternation: the optional label groups record how a sequence was
+# introduced, and the last group is the sequence itself.
+_RNA_SEQUENCE_PATTERN = re.compile(
+    r'(?:(RNA[:\s]+)'  # "RNA: AGUCGAUGCAUGUCAGUAGCUCAGCUAGUACUGCGUAGCUA"
+    r'|(RNA sequence[:\s]+)'  # "RNA sequence: AGUCGAUGCAUGUCAGUAGCUCAGCUAGUACUGCGUAGCUA"
+    r'|(["\']))?'  # "AGUCGAUGCAUGUCAGUAGCUCAGCUAGUACUGCGUAGCUA"
+    r'([AUCG]{10,})(?(3)["\'])',  # Any sequence of 10+ RNA bases
+    re.IGNORECASE
+)
+_PROTEIN_SEQUENCE_PATTERN = re.compile(
+    r'(?:(protein sequence[:\s]+)'  # "protein sequence: MKTVRQERLKSIVRILERSKEPVSGAQLAEELSVSRQVIVQDIAYLRSLGYNIVATPRGYVLAGG"
+    r'|(protein[:\s]+))?'  # "protein: MKTVRQERLKSIVRILERSKEPVSGAQLAEELSVSRQVIVQDIAYLRSLGYNIVATPRGYVLAGG"
+    r'([A-Z]{20,})',  # Any sequence of 20+ amino acids
+    re.IGNORECASE
+)
+
+# Request keyword groups for _create_analysis_plan. Each group is one alternation
+# matched case-insensitively as a substring, like the keyword lists it replaces.
+_PDB_DESIGN_RE = re.compile(r'design|generate|create|sequence|rna', re.IGNORECASE)
+_STRUCTURE_RE = re.compile(r'structure|fold|secondary|base pair|helix', re.IGNORECASE)
+_ADDITIONAL_RE = re.compile(r'also|additionally|and|plus', re.IGNORECASE)
+_INTERACTION_RE = re.compile(r'interaction|binding|protein|ligand|affinity', re.IGNORECASE)
+_REFORMER_HINT_RE = re.compile(r'rbp|rna-binding protein|u2af2|hepg2|cell line|specific protein', re.IGNORECASE)
+_DESIGN_RE = re.compile(r'design|generate|create|aptamer|backbone', re.IGNORECASE)
+_PROTEIN_CONDITIONED_RE = re.compile(r'protein|conditioned', re.IGNORECASE)
+_BACKBONE_DESIGN_RE = re.compile(r'3d|backbone|structure', re.IGNORECASE)
+
+# Every planner keyword in one alternation: requests without any skip the per-group checks
+_ANY_KEYWORD_RE = re.compile('|'.join(pattern.pattern for pattern in (
+    _PDB_DESIGN_RE, _STRUCTURE_RE, _ADDITIONAL_RE, _INTERACTION_RE,
+    _REFORMER_HINT_RE, _DESIGN_RE, _PROTEIN_CONDITIONED_RE, _BACKBONE_DESIGN_RE
+)), re.IGNORECASE)
+
+# Deletion tables for bytes.translate: every byte outside the named alphabet
+_ALL_BYTES = bytes(range(256))
+_NON_NUCLEOTIDE_BYTES = _ALL_BYTES.translate(None, b'ACGTUacgtu')
+_NON_RNA_BYTES = _ALL_BYTES.translate(None, b'ACGU')
+_NON_AMINO_ACID_BYTES = _ALL_BYTES.translate(None, b'ACDEFGHIKLMNPQRSTVWY')
+
+
+def _keep_alphabet(text: str, non_alphabet: bytes) -> str:
+    """Drop every character of text outside an ASCII alphabet in one C-level pass"""
+    return text.encode('ascii', 'ignore').translate(None, non_alphabet).decode('ascii')
+
+_DNA_BASES = frozenset('ATCG')
+_RNA_BASES = frozenset('AUCG')
+
+
+@lru_cache(maxsize=1024)
+def _classify_sequence(seq: str) -> str:
+    """Classify a sequence as DNA, RNA or Mixed from a single pass over its characters"""
+    chars = set(seq.upper())
+    if chars <= _DNA_BASES:
+        return 'DNA'
+    if chars <= _RNA_BASES:
+        return 'RNA'
+    return 'Mixed'
+
+
+def _collect_sequences(pattern: re.Pattern, text: str, non_alphabet: bytes, min_length: int) -> List[str]:
+    """
+    Extract unique sequences from text in one scan
+
+    Labelled sequences come first, in label-group order, followed by bare
+    sequences in text order.
+
+    Args:
+        pattern: Compiled pattern whose last group is the sequence
+        text: Text to search
+        non_alphabet: Deletion table applied to the uppercased match
+        min_length: Minimum cleaned sequence length
+
+    Returns:
+        Cleaned, deduplicated sequences
+    """
+    sequence_group = pattern.groups
+    buckets = [[] for _ in range(sequence_group)]
+    for match in pattern.finditer(text):
+        label = next((i for i in range(1, sequence_group) if match.group(i) is not None), sequence_group)
+        buckets[label - 1].append(match.group(sequence_group))
+    
+    sequences = []
+    seen = set()
+    for bucket in buckets:
+        for match in bucket:
+            clean_seq = _keep_alphabet(match.upper(), non_alphabet)
+            if len(clean_seq) >= min_length and clean_seq not in seen:
+                seen.add(clean_seq)
+                sequences.append(clean_seq)
+    return sequences
+
+# Protein used by interaction and protein-conditioned tools when the request has none
+_DEFAULT_PROTEIN_SEQUENCE = "MKTVRQERLKSIVRILERSKEPVSGAQLAEELSVSRQVIVQDIAYLRSLGYNIVATPRGYVLAGG"
+
+# Fixed parts of tool requests; copied per call and patched with the dynamic fields
+_REFORMER_REQUEST_TEMPLATE = {"sequence": "", "rbp_name": "U2AF2", "cell_line": "HepG2"}
+_MOL2APTAMER_REQUEST_TEMPLATE = {"smiles": "", "num_sequences": 5}
+_RNAFLOW_REQUEST_TEMPLATE = {"protein_sequence": _DEFAULT_PROTEIN_SEQUENCE, "rna_length": 50}
+_RNAFRAMEFLOW_REQUEST_TEMPLATE = {"structure_length": 30, "num_structures": 3}
+
+
+def _pick_sequences(sequences: List[str], detailed_sequences: Optional[Dict[str, List[str]]]) -> Tuple[str, str]:
+    """
+    Choose the RNA and protein sequence to send to a tool
+
+    Sequences extracted from the request text win; otherwise the first combined
+    sequence and the default protein are used. Empty lists fall back too.
+
+    Args:
+        sequences: Combined sequences from uploaded files and request text
+        detailed_sequences: Request-text sequences split into 'rna' and 'protein'
+
+    Returns:
+        Tuple of (rna_sequence, protein_sequence)
+    """
+    detailed = detailed_sequences or {}
+    rna_sequence = next(iter(detailed.get('rna') or sequences), "")
+    protein_sequence = next(iter(detailed.get('protein') or ()), _DEFAULT_PROTEIN_SEQUENCE)
+    return rna_sequence, protein_sequence
+
+
+def _dumps(data: Any) -> bytes:
+    """Encode a tool request body as compact JSON, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def _loads(content: bytes) -> Any:
+    """Decode a tool response body, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# Platform tools the agent can call, keyed by tool ID. Shared by every agent
+# instance and never mutated, so it and its derived views are built once at import.
+_TOOLS: Dict[str, Dict[str, Any]] = {
+    "bpfold": {
+        "name": "BPFold",
+        "description": "Deep learning model for RNA secondary structure prediction",
+        "endpoint": "/api/bpfold/predict",
+        "input_types": ["fasta", "text"],
+        "output_types": ["secondary_structure", "base_pairs", "confidence"],
+        "category": "structure_prediction"
+    },
+    "ufold": {
+        "name": "UFold", 
+        "description": "Deep learning-based RNA secondary structure prediction using FCNs",
+        "endpoint": "/api/ufold/predict",
+        "input_types": ["fasta", "text"],
+        "output_types": ["secondary_structure", "ct_format", "bpseq_format"],
+        "category": "structure_prediction"
+    },
+    "mxfold2": {
+        "name": "MXFold2",
+        "description": "Deep learning-based RNA secondary structure prediction with thermodynamic integration",
+        "endpoint": "/api/mxfold2/predict", 
+        "input_types": ["fasta", "text"],
+        "output_types": ["secondary_structure", "dot_bracket", "energy"],
+        "category": "structure_prediction"
+    },
+    "rnaformer": {
+        "name": "RNAformer",
+        "description": "Deep learning model using 2D latent space and axial attention",
+        "endpoint": "/api/rnaformer/predict",
+        "input_types": ["fasta", "text"], 
+        "output_types": ["secondary_structure", "dot_bracket", "ct_format"],
+        "category": "structure_prediction"
+    },
+    "rnamigos2": {
+        "name": "RNAmigos2",
+        "description": "Virtual screening tool for RNA-ligand interaction prediction",
+        "endpoint": "/api/rnamigos2/predict",
+        "input_types": ["mmcif", "smiles"],
+        "output_types": ["interaction_scores", "binding_affinity"],
+        "category": "interaction_prediction"
+    },
+    "reformer": {
+        "name": "Reformer",
+        "description": "Protein-RNA binding affinity prediction at single-base resolution. REQUIRES: RNA sequence, RBP (RNA-binding protein) name, and cell line. Only use when all three parameters are available.",
+        "endpoint": "/api/reformer/predict",
+        "input_types": ["rna_sequence", "rbp_name", "cell_line"],
+        "output_types": ["binding_scores", "affinity_prediction"],
+        "category": "interaction_prediction",
+        "required_params": ["rna_sequence", "rbp_name", "cell_line"]
+    },
+    "copra": {
+        "name": "CoPRA",
+        "description": "Protein-RNA binding affinity prediction using language models",
+        "endpoint": "/api/copra/predict",
+        "input_types": ["protein_sequence", "rna_sequence"],
+        "output_types": ["binding_affinity", "confidence_score"],
+        "category": "interaction_prediction"
+    },
+    "deeprpi": {
+        "name": "DeepRPI",
+        "description": "Deep learning-based RNA-protein interaction prediction",
+        "endpoint": "/api/deeprpi/predict",
+        "input_types": ["protein_sequence", "rna_sequence"],
+        "output_types": ["interaction_prediction", "probability", "attention_maps"],
+        "category": "interaction_prediction"
+    },
+    "mol2aptamer": {
+        "name": "Mol2Aptamer",
+        "description": "Generate RNA aptamers from small molecule SMILES",
+        "endpoint": "/api/mol2aptamer/predict",
+        "input_types": ["smiles"],
+        "output_types": ["rna_sequences", "aptamer_candidates"],
+        "category": "de_novo_design"
+    },
+    "rnaflow": {
+        "name": "RNAFlow",
+        "description": "Protein-conditioned RNA sequence-structure design",
+        "endpoint": "/api/rnaflow/predict",
+        "input_types": ["protein_sequence", "protein_coordinates", "rna_length"],
+        "output_types": ["rna_sequences", "rna_structures"],
+        "category": "de_novo_design"
+    },
+    "rnaframeflow": {
+        "name": "RNA-FrameFlow",
+        "description": "3D RNA backbone structure design using SE(3) flow matching",
+        "endpoint": "/api/rnaframeflow/predict",
+        "input_types": ["structure_length", "num_structures"],
+        "output_types": ["rna_structures", "3d_coordinates", "pdb_files"],
+        "category": "de_novo_design"
+    },
+    "ribodiffusion": {
+        "name": "RiboDiffusion",
+        "description": "RNA inverse folding from protein structures using diffusion",
+        "endpoint": "/api/ribodiffusion/inverse_fold",
+        "input_types": ["pdb"],
+        "output_types": ["rna_sequences", "fasta_files"],
+        "category": "de_novo_design"
+    },
+    "rnampnn": {
+        "name": "RNAMPNN",
+        "description": "RNA sequence recovery from 3D structure using graph neural networks",
+        "endpoint": "/api/rnampnn/predict",
+        "input_types": ["pdb"],
+        "output_types": ["rna_sequence", "confidence_scores"],
+        "category": "de_novo_design"
+    }
+}
+
+
+def _describe_tools(tools: Dict[str, Dict[str, Any]]) -> str:
+    """Format tool descriptions for the LLM"""
+    return "\n".join(
+        f"- {tool_info['name']} ({tool_id}): {tool_info['description']}"
+        f"\n  Input types: {', '.join(tool_info['input_types'])}"
+        f"\n  Output types: {', '.join(tool_info['output_types'])}"
+        f"\n  Category: {tool_info['category']}"
+        for tool_id, tool_info in tools.items()
+    )
+
+
+def _index_tool_categories(tools: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Group tool IDs by category in a single pass over the tool registry"""
+    categories = {
+        "structure_prediction": [],
+        "interaction_prediction": [],
+        "de_novo_design": []
+    }
+    for tool_id, tool_info in tools.items():
+        if tool_info["category"] in categories:
+            categories[tool_info["category"]].append(tool_id)
+    return categories
+
+
+_TOOL_DESCRIPTIONS = _describe_tools(_TOOLS)
+_TOOL_CATEGORIES = _index_tool_categories(_TOOLS)
+
 
 class RNAAnalysisAgent:
     """Intelligent agent for RNA analysis using platform tools"""
@@ -21,129 +308,23 @@ class RNAAnalysisAgent:
     def __init__(self, base_url: str = "http://localhost:5000"):
         """Initialize the RNA Analysis Agent"""
         self.base_url = base_url.rstrip('/')
-        self.available_tools = self._initialize_tools()
-        self.tool_descriptions = self._get_tool_descriptions()
-        
-    def _initialize_tools(self) -> Dict[str, Dict[str, Any]]:
-        """Initialize available analysis tools"""
-        return {
-            "bpfold": {
-                "name": "BPFold",
-                "description": "Deep learning model for RNA secondary structure prediction",
-                "endpoint": "/api/bpfold/predict",
-                "input_types": ["fasta", "text"],
-                "output_types": ["secondary_structure", "base_pairs", "confidence"],
-                "category": "structure_prediction"
-            },
-            "ufold": {
-                "name": "UFold", 
-                "description": "Deep learning-based RNA secondary structure prediction using FCNs",
-                "endpoint": "/api/ufold/predict",
-                "input_types": ["fasta", "text"],
-                "output_types": ["secondary_structure", "ct_format", "bpseq_format"],
-                "category": "structure_prediction"
-            },
-            "mxfold2": {
-                "name": "MXFold2",
-                "description": "Deep learning-based RNA secondary structure prediction with thermodynamic integration",
-                "endpoint": "/api/mxfold2/predict", 
-                "input_types": ["fasta", "text"],
-                "output_types": ["secondary_structure", "dot_bracket", "energy"],
-                "category": "structure_prediction"
-            },
-            "rnaformer": {
-                "name": "RNAformer",
-                "description": "Deep learning model using 2D latent space and axial attention",
-                "endpoint": "/api/rnaformer/predict",
-                "input_types": ["fasta", "text"], 
-                "output_types": ["secondary_structure", "dot_bracket", "ct_format"],
-                "category": "structure_prediction"
-            },
-            "rnamigos2": {
-                "name": "RNAmigos2",
-                "description": "Virtual screening tool for RNA-ligand interaction prediction",
-                "endpoint": "/api/rnamigos2/predict",
-                "input_types": ["mmcif", "smiles"],
-                "output_types": ["interaction_scores", "binding_affinity"],
-                "category": "interaction_prediction"
-            },
-            "reformer": {
-                "name": "Reformer",
-                "description": "Protein-RNA binding affinity prediction at single-base resolution. REQUIRES: RNA sequence, RBP (RNA-binding protein) name, and cell line. Only use when all three parameters are available.",
-                "endpoint": "/api/reformer/predict",
-                "input_types": ["rna_sequence", "rbp_name", "cell_line"],
-                "output_types": ["binding_scores", "affinity_prediction"],
-                "category": "interaction_prediction",
-                "required_params": ["rna_sequence", "rbp_name", "cell_line"]
-            },
-            "copra": {
-                "name": "CoPRA",
-                "description": "Protein-RNA binding affinity prediction using language models",
-                "endpoint": "/api/copra/predict",
-                "input_types": ["protein_sequence", "rna_sequence"],
-                "output_types": ["binding_affinity", "confidence_score"],
-                "category": "interaction_prediction"
-            },
-            "deeprpi": {
-                "name": "DeepRPI",
-                "description": "Deep learning-based RNA-protein interaction prediction",
-                "endpoint": "/api/deeprpi/predict",
-                "input_types": ["protein_sequence", "rna_sequence"],
-                "output_types": ["interaction_prediction", "probability", "attention_maps"],
-                "category": "interaction_prediction"
-            },
-            "mol2aptamer": {
-                "name": "Mol2Aptamer",
-                "description": "Generate RNA aptamers from small molecule SMILES",
-                "endpoint": "/api/mol2aptamer/predict",
-                "input_types": ["smiles"],
-                "output_types": ["rna_sequences", "aptamer_candidates"],
-                "category": "de_novo_design"
-            },
-            "rnaflow": {
-                "name": "RNAFlow",
-                "description": "Protein-conditioned RNA sequence-structure design",
-                "endpoint": "/api/rnaflow/predict",
-                "input_types": ["protein_sequence", "protein_coordinates", "rna_length"],
-                "output_types": ["rna_sequences", "rna_structures"],
-                "category": "de_novo_design"
-            },
-            "rnaframeflow": {
-                "name": "RNA-FrameFlow",
-                "description": "3D RNA backbone structure design using SE(3) flow matching",
-                "endpoint": "/api/rnaframeflow/predict",
-                "input_types": ["structure_length", "num_structures"],
-                "output_types": ["rna_structures", "3d_coordinates", "pdb_files"],
-                "category": "de_novo_design"
-            },
-            "ribodiffusion": {
-                "name": "RiboDiffusion",
-                "description": "RNA inverse folding from protein structures using diffusion",
-                "endpoint": "/api/ribodiffusion/inverse_fold",
-                "input_types": ["pdb"],
-                "output_types": ["rna_sequences", "fasta_files"],
-                "category": "de_novo_design"
-            },
-            "rnampnn": {
-                "name": "RNAMPNN",
-                "description": "RNA sequence recovery from 3D structure using graph neural networks",
-                "endpoint": "/api/rnampnn/predict",
-                "input_types": ["pdb"],
-                "output_types": ["rna_sequence", "confidence_scores"],
-                "category": "de_novo_design"
-            }
-        }
-    
-    def _get_tool_descriptions(self) -> str:
-        """Get formatted tool descriptions for LLM"""
-        descriptions = []
-        for tool_id, tool_info in self.available_tools.items():
-            desc = f"- {tool_info['name']} ({tool_id}): {tool_info['description']}"
-            desc += f"\n  Input types: {', '.join(tool_info['input_types'])}"
-            desc += f"\n  Output types: {', '.join(tool_info['output_types'])}"
-            desc += f"\n  Category: {tool_info['category']}"
-            descriptions.append(desc)
-        return "\n".join(descriptions)
+        self._session = self._create_session()
+        self.available_tools = _TOOLS
+        self.tool_descriptions = _TOOL_DESCRIPTIONS
+        self._tool_categories = _TOOL_CATEGORIES
+        
+    def _create_session(self) -> requests.Session:
+        """Create a pooled HTTP session so tool calls reuse keep-alive connections"""
+        session = requests.Session()
+        # Retries cover connection failures only; POSTs are never replayed after being sent
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
     
     def analyze_request(self, user_request: str, uploaded_files: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze user request and determine appropriate tools to use"""
@@ -158,7 +339,8 @@ class RNAAnalysisAgent:
             all_sequences = sequences_from_files + sequences_from_text.get('rna', [])
             
             # Determine analysis type based on request and available data
-            analysis_plan = self._create_analysis_plan(user_request, all_sequences, uploaded_files)
+            file_counts = self._classify_files(uploaded_files or [])
+            analysis_plan = self._create_analysis_plan(user_request, all_sequences, uploaded_files, file_counts)
             
             return {
                 "success": True,
@@ -201,17 +383,21 @@ class RNAAnalysisAgent:
             if file_info.get("type") == "text/plain" or file_info.get("name", "").endswith(('.txt', '.fasta', '.fa')):
                 # Extract sequences from FASTA format
                 if content.startswith('>'):
-                    lines = content.split('\n')
-                    sequence = ""
-                    for line in lines:
-                        if not line.startswith('>') and line.strip():
-                            sequence += line.strip()
-                    if sequence:
-                        sequences.append(sequence)
-                        logger.info(f"Extracted FASTA sequence: {sequence[:50]}...")
+                    # One sequence per record; lines are collected and joined once
+                    records = []
+                    for line in content.splitlines():
+                        if line.startswith('>'):
+                            records.append([])
+                        elif line.strip():
+                            records[-1].append(line.strip())
+                    for parts in records:
+                        sequence = ''.join(parts)
+                        if sequence:
+                            sequences.append(sequence)
+                            logger.info(f"Extracted FASTA sequence: {sequence[:50]}...")
                 else:
                     # Treat as plain text sequence
-                    cleaned = ''.join(c for c in content if c.upper() in 'ATCGU')
+                    cleaned = _keep_alphabet(content, _NON_NUCLEOTIDE_BYTES)
                     if cleaned:
                         sequences.append(cleaned)
                         logger.info(f"Extracted plain text sequence: {cleaned[:50]}...")
@@ -221,105 +407,80 @@ class RNAAnalysisAgent:
     
     def _extract_sequences_from_text(self, text: str) -> Dict[str, List[str]]:
         """Extract protein and RNA sequences from user request text"""
-        import re
-        sequences = {
-            'rna': [],
-            'protein': []
+        return {
+            'rna': _collect_sequences(_RNA_SEQUENCE_PATTERN, text, _NON_RNA_BYTES, 10),
+            'protein': _collect_sequences(_PROTEIN_SEQUENCE_PATTERN, text, _NON_AMINO_ACID_BYTES, 20)
         }
-        
-        # Look for RNA sequences
-        rna_patterns = [
-            r'RNA[:\s]+([AUCG]+)',  # "RNA: AGUCGAUGCAUGUCAGUAGCUCAGCUAGUACUGCGUAGCUA"
-            r'RNA sequence[:\s]+([AUCG]+)',  # "RNA sequence: AGUCGAUGCAUGUCAGUAGCUCAGCUAGUACUGCGUAGCUA"
-            r'["\']([AUCG]+)["\']',  # "AGUCGAUGCAUGUCAGUAGCUCAGCUAGUACUGCGUAGCUA"
-            r'([AUCG]{10,})',  # Any sequence of 10+ RNA bases
-        ]
-        
-        for pattern in rna_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Clean the sequence (remove any non-RNA characters)
-                clean_seq = ''.join(c.upper() for c in match if c.upper() in 'AUCG')
-                if len(clean_seq) >= 10:  # Only consider sequences of 10+ bases
-                    sequences['rna'].append(clean_seq)
-        
-        # Look for protein sequences
-        protein_patterns = [
-            r'protein sequence[:\s]+([A-Z]+)',  # "protein sequence: MKTVRQERLKSIVRILERSKEPVSGAQLAEELSVSRQVIVQDIAYLRSLGYNIVATPRGYVLAGG"
-            r'protein[:\s]+([A-Z]{20,})',  # "protein: MKTVRQERLKSIVRILERSKEPVSGAQLAEELSVSRQVIVQDIAYLRSLGYNIVATPRGYVLAGG"
-            r'([A-Z]{20,})',  # Any sequence of 20+ amino acids
-        ]
-        
-        for pattern in protein_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Clean the sequence (remove any non-amino acid characters)
-                clean_seq = ''.join(c.upper() for c in match if c.upper() in 'ACDEFGHIKLMNPQRSTVWY')
-                if len(clean_seq) >= 20:  # Only consider sequences of 20+ amino acids
-                    sequences['protein'].append(clean_seq)
-        
-        # Remove duplicates while preserving order
-        for seq_type in sequences:
-            seen = set()
-            unique_sequences = []
-            for seq in sequences[seq_type]:
-                if seq not in seen:
-                    seen.add(seq)
-                    unique_sequences.append(seq)
-            sequences[seq_type] = unique_sequences
-        
-        return sequences
     
-    def _create_analysis_plan(self, request: str, sequences: List[str], files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _classify_files(self, files: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Count uploaded files of each kind the planner cares about, in a single pass"""
+        counts = {"pdb": 0, "fasta": 0, "cif": 0, "smiles": 0}
+        for f in files:
+            name = f.get("name", "")
+            if name.endswith('.pdb'):
+                counts["pdb"] += 1
+            if name.endswith(('.fasta', '.fa')):
+                counts["fasta"] += 1
+            if name.endswith('.cif'):
+                counts["cif"] += 1
+            if 'smiles' in name.lower():
+                counts["smiles"] += 1
+        return counts
+    
+    def _create_analysis_plan(self, request: str, sequences: List[str], files: List[Dict[str, Any]], file_counts: Dict[str, int]) -> Dict[str, Any]:
         """Create analysis plan based on user request and available data"""
-        request_lower = request.lower()
         tools = []
         reasoning = []
         
         # Analyze uploaded files first
-        file_types = [f.get("name", "").lower() for f in files or []]
-        pdb_files = [f for f in files or [] if f.get("name", "").endswith('.pdb')]
-        fasta_files = [f for f in files or [] if f.get("name", "").endswith(('.fasta', '.fa'))]
-        cif_files = [f for f in files or [] if f.get("name", "").endswith('.cif')]
-        smiles_files = [f for f in files or [] if 'smiles' in f.get("name", "").lower()]
+        pdb_count = file_counts["pdb"]
+        fasta_count = file_counts["fasta"]
+        cif_count = file_counts["cif"]
+        smiles_count = file_counts["smiles"]
         
-        logger.info(f"File analysis - PDB: {len(pdb_files)}, FASTA: {len(fasta_files)}, CIF: {len(cif_files)}, SMILES: {len(smiles_files)}")
+        logger.info(f"File analysis - PDB: {pdb_count}, FASTA: {fasta_count}, CIF: {cif_count}, SMILES: {smiles_count}")
+        
+        # One scan decides whether any keyword group can match at all
+        has_keywords = _ANY_KEYWORD_RE.search(request) is not None
+        
+        # Used by both the file-based and text-based checks below
+        wants_structure = has_keywords and _STRUCTURE_RE.search(request) is not None
         
         # Priority 1: File-based analysis (files take precedence over text sequences)
-        if pdb_files:
+        if pdb_count:
             # PDB files for RNA design
-            if any(keyword in request_lower for keyword in ['design', 'generate', 'create', 'sequence', 'rna']):
+            if has_keywords and _PDB_DESIGN_RE.search(request):
                 tools.extend(['ribodiffusion', 'rnampnn'])
-                reasoning.append(f"PDB structure file detected for RNA design ({len(pdb_files)} files)")
+                reasoning.append(f"PDB structure file detected for RNA design ({pdb_count} files)")
             else:
                 # Default to RNA design if PDB files are present
                 tools.extend(['ribodiffusion', 'rnampnn'])
-                reasoning.append(f"PDB structure file detected - defaulting to RNA design ({len(pdb_files)} files)")
+                reasoning.append(f"PDB structure file detected - defaulting to RNA design ({pdb_count} files)")
         
-        elif fasta_files:
+        elif fasta_count:
             # FASTA files for structure prediction
-            if any(keyword in request_lower for keyword in ['structure', 'fold', 'secondary', 'base pair', 'helix']):
+            if wants_structure:
                 tools.extend(['bpfold', 'ufold', 'mxfold2', 'rnaformer'])
-                reasoning.append(f"FASTA sequence file detected for structure prediction ({len(fasta_files)} files)")
+                reasoning.append(f"FASTA sequence file detected for structure prediction ({fasta_count} files)")
             else:
                 # Default to structure prediction if FASTA files are present
                 tools.extend(['bpfold', 'ufold', 'mxfold2', 'rnaformer'])
-                reasoning.append(f"FASTA sequence file detected - defaulting to structure prediction ({len(fasta_files)} files)")
+                reasoning.append(f"FASTA sequence file detected - defaulting to structure prediction ({fasta_count} files)")
         
-        elif cif_files:
+        elif cif_count:
             # CIF files for ligand interaction
             tools.append('rnamigos2')
-            reasoning.append(f"mmCIF structure file detected for ligand interaction analysis ({len(cif_files)} files)")
+            reasoning.append(f"mmCIF structure file detected for ligand interaction analysis ({cif_count} files)")
         
-        elif smiles_files:
+        elif smiles_count:
             # SMILES files for aptamer generation
             tools.append('mol2aptamer')
-            reasoning.append(f"SMILES file detected for aptamer generation ({len(smiles_files)} files)")
+            reasoning.append(f"SMILES file detected for aptamer generation ({smiles_count} files)")
         
         # Priority 2: Text-based analysis (if no files or additional analysis needed)
-        if not files or any(keyword in request_lower for keyword in ['also', 'additionally', 'and', 'plus']):
+        if has_keywords and (not files or _ADDITIONAL_RE.search(request)):
             # Check for structure prediction requests
-            if any(keyword in request_lower for keyword in ['structure', 'fold', 'secondary', 'base pair', 'helix']):
+            if wants_structure:
                 if sequences:
                     tools.extend(['bpfold', 'ufold', 'mxfold2', 'rnaformer'])
                     reasoning.append("RNA sequences detected for structure prediction")
@@ -327,22 +488,22 @@ class RNAAnalysisAgent:
                     reasoning.append("Structure prediction requested but no sequences provided")
             
             # Check for interaction prediction requests
-            if any(keyword in request_lower for keyword in ['interaction', 'binding', 'protein', 'ligand', 'affinity']):
+            if _INTERACTION_RE.search(request):
                 if sequences:
                     tools.extend(['copra', 'deeprpi'])
                     reasoning.append("Sequences available for protein-RNA interaction analysis")
                     
                     # Check if we have specific RBP and cell line information for Reformer
-                    if any(keyword in request_lower for keyword in ['rbp', 'rna-binding protein', 'u2af2', 'hepg2', 'cell line', 'specific protein']):
+                    if _REFORMER_HINT_RE.search(request):
                         tools.append('reformer')
                         reasoning.append("RBP and cell line information detected for Reformer analysis")
             
             # Check for design requests
-            if any(keyword in request_lower for keyword in ['design', 'generate', 'create', 'aptamer', 'backbone']):
-                if any(keyword in request_lower for keyword in ['protein', 'conditioned']):
+            if _DESIGN_RE.search(request):
+                if _PROTEIN_CONDITIONED_RE.search(request):
                     tools.append('rnaflow')
                     reasoning.append("Protein-conditioned RNA design requested")
-                if any(keyword in request_lower for keyword in ['3d', 'backbone', 'structure']):
+                if _BACKBONE_DESIGN_RE.search(request):
                     tools.append('rnaframeflow')
                     reasoning.append("3D structure design requested")
         
@@ -365,21 +526,13 @@ class RNAAnalysisAgent:
             "data_available": {
                 "sequences": len(sequences),
                 "files": len(files or []),
-                "sequence_types": list(set(self._get_sequence_types(sequences)))
+                "sequence_types": sorted(self._get_sequence_types(sequences))
             }
         }
     
-    def _get_sequence_types(self, sequences: List[str]) -> List[str]:
-        """Determine types of sequences"""
-        types = []
-        for seq in sequences:
-            if all(c.upper() in 'ATCG' for c in seq):
-                types.append('DNA')
-            elif all(c.upper() in 'AUCG' for c in seq):
-                types.append('RNA')
-            else:
-                types.append('Mixed')
-        return types
+    def _get_sequence_types(self, sequences: List[str]) -> Set[str]:
+        """Determine the distinct types of sequences"""
+        return {_classify_sequence(seq) for seq in sequences}
     
     def execute_analysis(self, analysis_plan: Dict[str, Any], sequences: List[str], files: List[Dict[str, Any]] = None, detailed_sequences: Dict[str, List[str]] = None) -> Dict[str, Any]:
         """Execute the analysis plan using appropriate tools"""
@@ -400,12 +553,21 @@ class RNAAnalysisAgent:
                     "summary": "No analysis tools could be determined from the request"
                 }
             
-            # Execute each tool
-            for tool_id in tools_to_use:
-                if tool_id in self.available_tools:
+            # Tool calls are independent HTTP requests, so run them concurrently;
+            # total latency becomes the slowest tool rather than the sum of all
+            tool_ids = [tool_id for tool_id in tools_to_use if tool_id in self.available_tools]
+            if tool_ids:
+                with ThreadPoolExecutor(max_workers=min(len(tool_ids), MAX_PARALLEL_TOOLS),
+                                        thread_name_prefix='agent-tool') as executor:
+                    futures = {
+                        tool_id: executor.submit(self._call_tool, tool_id, sequences, files or [], detailed_sequences)
+                        for tool_id in tool_ids
+                    }
+                
+                # Collect in plan order so results and errors stay deterministic
+                for tool_id, future in futures.items():
                     try:
-                        tool_result = self._call_tool(tool_id, sequences, files or [], detailed_sequences)
-                        results["tool_results"][tool_id] = tool_result
+                        results["tool_results"][tool_id] = future.result()
                     except Exception as e:
                         error_msg = f"Tool {tool_id} failed: {str(e)}"
                         results["errors"].append(error_msg)
@@ -438,16 +600,17 @@ class RNAAnalysisAgent:
         request_data = self._prepare_tool_request(tool_id, sequences, files, detailed_sequences)
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 endpoint,
-                json=request_data,
+                data=_dumps(request_data),
+                headers={"Content-Type": "application/json"},
                 timeout=300  # 5 minute timeout
             )
             
             if response.status_code == 200:
                 return {
                     "success": True,
-                    "data": response.json(),
+                    "data": _loads(response.content),
                     "tool_name": tool_info["name"],
                     "category": tool_info["category"]
                 }
@@ -517,7 +680,7 @@ class RNAAnalysisAgent:
                         'temperature': 0.1
                     }
                 
-                response = requests.post(
+                response = self._session.post(
                     endpoint,
                     files=files_data,
                     data=data,
@@ -527,7 +690,7 @@ class RNAAnalysisAgent:
             if response.status_code == 200:
                 return {
                     "success": True,
-                    "data": response.json(),
+                    "data": _loads(response.content),
                     "tool_name": tool_info["name"],
                     "category": tool_info["category"]
                 }
@@ -553,114 +716,137 @@ class RNAAnalysisAgent:
     
     def _prepare_tool_request(self, tool_id: str, sequences: List[str], files: List[Dict[str, Any]], detailed_sequences: Dict[str, List[str]] = None) -> Dict[str, Any]:
         """Prepare request data for specific tool"""
-        request_data = {}
-        
-        if tool_id in ['bpfold', 'ufold', 'mxfold2', 'rnaformer']:
-            # Structure prediction tools
-            if sequences:
-                request_data = {
-                    "sequences": sequences,
-                    "input_type": "text"
-                }
-                # Specify output format for BPFold to get dot-bracket notation
-                if tool_id == 'bpfold':
-                    request_data["output_format"] = "dbn"
-            else:
-                # Use file data if available - read from temp folder
-                for file_info in files:
-                    if file_info.get("type") == "text/plain":
-                        content = self._read_file_from_temp(file_info)
-                        if content:
-                            request_data = {
-                                "sequences": [content],
-                                "input_type": "text"
-                            }
-                            break
-        
-        elif tool_id == 'rnamigos2':
-            # RNA-ligand interaction tool
-            for file_info in files:
-                if file_info.get("name", "").endswith('.cif'):
-                    content = self._read_file_from_temp(file_info)
-                    if content:
-                        request_data = {
-                            "structure_file": content,
-                            "ligands": ["C1=CC=CC=C1"]  # Default benzene for testing
-                        }
-                        break
-        
-        elif tool_id == 'reformer':
-            # Reformer tool - needs DNA sequence
-            if sequences:
-                # Use detailed sequences if available, otherwise fall back to basic extraction
-                if detailed_sequences:
-                    rna_sequence = detailed_sequences.get('rna', [sequences[0] if sequences else ""])[0]
-                else:
-                    rna_sequence = sequences[0] if sequences else ""
-                
-                # Convert RNA to DNA for Reformer
-                dna_sequence = rna_sequence.replace('U', 'T')
-                request_data = {
-                    "sequence": dna_sequence,
-                    "rbp_name": "U2AF2",
-                    "cell_line": "HepG2"
-                }
-        
-        elif tool_id in ['copra', 'deeprpi']:
-            # CoPRA and DeepRPI tools - need both protein and RNA sequences
-            if sequences:
-                # Use detailed sequences if available, otherwise fall back to basic extraction
-                if detailed_sequences:
-                    rna_sequence = detailed_sequences.get('rna', [sequences[0] if sequences else ""])[0]
-                    protein_sequence = detailed_sequences.get('protein', ["MKTVRQERLKSIVRILERSKEPVSGAQLAEELSVSRQVIVQDIAYLRSLGYNIVATPRGYVLAGG"])[0]
-                else:
-                    rna_sequence = sequences[0] if sequences else ""
-                    protein_sequence = "MKTVRQERLKSIVRILERSKEPVSGAQLAEELSVSRQVIVQDIAYLRSLGYNIVATPRGYVLAGG"
-                
-                request_data = {
-                    "rna_sequence": rna_sequence,
-                    "protein_sequence": protein_sequence
-                }
-        
-        elif tool_id == 'mol2aptamer':
-            # Aptamer generation
-            for file_info in files:
-                if 'smiles' in file_info.get("name", "").lower():
-                    content = self._read_file_from_temp(file_info)
-                    if content:
-                        request_data = {
-                            "smiles": content,
-                            "num_sequences": 5
-                        }
-                        break
-        
-        elif tool_id == 'rnaflow':
-            # Protein-conditioned RNA design
-            request_data = {
-                "protein_sequence": "MKTVRQERLKSIVRILERSKEPVSGAQLAEELSVSRQVIVQDIAYLRSLGYNIVATPRGYVLAGG",
-                "rna_length": 50
-            }
-        
-        elif tool_id == 'rnaframeflow':
-            # 3D structure design
+        preparer = self._REQUEST_PREPARERS.get(tool_id)
+        if preparer is None:
+            return {}
+        return preparer(self, tool_id, sequences, files, detailed_sequences)
+    
+    def _prepare_structure_request(self, tool_id, sequences, files, detailed_sequences):
+        """Structure prediction tools"""
+        if sequences:
             request_data = {
-                "structure_length": 30,
-                "num_structures": 3
+                "sequences": sequences,
+                "input_type": "text"
             }
+            # Specify output format for BPFold to get dot-bracket notation
+            if tool_id == 'bpfold':
+                request_data["output_format"] = "dbn"
+            return request_data
         
-        elif tool_id in ['ribodiffusion', 'rnampnn']:
-            # Structure-based design
-            for file_info in files:
-                if file_info.get("name", "").endswith('.pdb'):
-                    content = self._read_file_from_temp(file_info)
-                    if content:
-                        request_data = {
-                            "pdb_content": content
-                        }
-                        break
-        
+        # Use file data if available - read from temp folder
+        for file_info in files:
+            if file_info.get("type") == "text/plain":
+                content = self._read_file_from_temp(file_info)
+                if content:
+                    return {
+                        "sequences": [content],
+                        "input_type": "text"
+                    }
+        return {}
+    
+    def _prepare_rnamigos2_request(self, tool_id, sequences, files, detailed_sequences):
+        """RNA-ligand interaction tool"""
+        for file_info in files:
+            if file_info.get("name", "").endswith('.cif'):
+                # Upload the raw file instead of escaping it into the JSON body
+                token = self._upload_structure(file_info, "/api/rnamigos2/upload")
+                if token:
+                    return {
+                        "cif_token": token,
+                        "ligands": ["C1=CC=CC=C1"]  # Default benzene for testing
+                    }
+        return {}
+    
+    def _prepare_reformer_request(self, tool_id, sequences, files, detailed_sequences):
+        """Reformer tool - needs DNA sequence"""
+        if not sequences:
+            return {}
+        rna_sequence, _ = _pick_sequences(sequences, detailed_sequences)
+        
+        # Convert RNA to DNA for Reformer
+        request_data = _REFORMER_REQUEST_TEMPLATE.copy()
+        request_data["sequence"] = rna_sequence.replace('U', 'T')
         return request_data
     
+    def _prepare_interaction_request(self, tool_id, sequences, files, detailed_sequences):
+        """CoPRA and DeepRPI tools - need both protein and RNA sequences"""
+        if not sequences:
+            return {}
+        rna_sequence, protein_sequence = _pick_sequences(sequences, detailed_sequences)
+        return {
+            "rna_sequence": rna_sequence,
+            "protein_sequence": protein_sequence
+        }
+    
+    def _prepare_mol2aptamer_request(self, tool_id, sequences, files, detailed_sequences):
+        """Aptamer generation"""
+        for file_info in files:
+            if 'smiles' in file_info.get("name", "").lower():
+                content = self._read_file_from_temp(file_info)
+                if content:
+                    request_data = _MOL2APTAMER_REQUEST_TEMPLATE.copy()
+                    request_data["smiles"] = content
+                    return request_data
+        return {}
+    
+    def _prepare_rnaflow_request(self, tool_id, sequences, files, detailed_sequences):
+        """Protein-conditioned RNA design"""
+        return _RNAFLOW_REQUEST_TEMPLATE.copy()
+    
+    def _prepare_rnaframeflow_request(self, tool_id, sequences, files, detailed_sequences):
+        """3D structure design"""
+        return _RNAFRAMEFLOW_REQUEST_TEMPLATE.copy()
+    
+    def _prepare_pdb_request(self, tool_id, sequences, files, detailed_sequences):
+        """Structure-based design"""
+        for file_info in files:
+            if file_info.get("name", "").endswith('.pdb'):
+                content = self._read_file_from_temp(file_info)
+                if content:
+                    return {
+                        "pdb_content": content
+                    }
+        return {}
+    
+    # Tool ID -> request builder, looked up once per call instead of an if/elif chain
+    _REQUEST_PREPARERS = {
+        'bpfold': _prepare_structure_request,
+        'ufold': _prepare_structure_request,
+        'mxfold2': _prepare_structure_request,
+        'rnaformer': _prepare_structure_request,
+        'rnamigos2': _prepare_rnamigos2_request,
+        'reformer': _prepare_reformer_request,
+        'copra': _prepare_interaction_request,
+        'deeprpi': _prepare_interaction_request,
+        'mol2aptamer': _prepare_mol2aptamer_request,
+        'rnaflow': _prepare_rnaflow_request,
+        'rnaframeflow': _prepare_rnaframeflow_request,
+        'ribodiffusion': _prepare_pdb_request,
+        'rnampnn': _prepare_pdb_request,
+    }
+    
+    def _upload_structure(self, file_info: Dict[str, Any], upload_endpoint: str) -> Optional[str]:
+        """Stream a structure file from the temp folder to an upload endpoint and return its token"""
+        temp_path = file_info.get("temp_path")
+        if not temp_path or not os.path.exists(temp_path):
+            logger.warning(f"File not found in temp folder: {temp_path}")
+            return None
+        
+        try:
+            with open(temp_path, 'rb') as f:
+                response = self._session.post(
+                    f"{self.base_url}{upload_endpoint}",
+                    files={'file': (file_info.get("name", "structure.cif"), f, 'chemical/x-mmcif')},
+                    timeout=300
+                )
+            if response.status_code != 200:
+                logger.warning(f"Structure upload failed: HTTP {response.status_code}: {response.text}")
+                return None
+            return _loads(response.content).get("token")
+        except Exception as e:
+            logger.error(f"Structure upload failed: {e}")
+            return None
+    
     def _read_file_from_temp(self, file_info: Dict[str, Any]) -> str:
         """Read file content from temp folder"""
         temp_path = file_info.get("temp_path")
@@ -707,12 +893,6 @@ class RNAAnalysisAgent:
         return {
             "tools": self.available_tools,
             "descriptions": self.tool_descriptions,
-            "categories": {
-                "structure_prediction": [tool for tool, info in self.available_tools.items() 
-                                       if info["category"] == "structure_prediction"],
-                "interaction_prediction": [tool for tool, info in self.available_tools.items() 
-                                         if info["category"] == "interaction_prediction"],
-                "de_novo_design": [tool for tool, info in self.available_tools.items() 
-                                  if info["category"] == "de_novo_design"]
-            }
+            # Built once at import; the tool registry never changes
+            "categories": self._tool_categories
         }
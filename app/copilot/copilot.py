@@ -4,12 +4,24 @@ LangGraph-based RNA Design Assistant
 AI assistant using LangGraph for RNA design tasks with multimodal RAG support.
 """
 
+import re
 import json
 import logging
-from typing import Dict, Any, List, TypedDict, Annotated
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, TypedDict, Annotated, Callable
 from operator import add
 from datetime import datetime
 
+import httpx
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
@@ -19,8 +31,10 @@ from langgraph.graph.message import add_messages
 from .prompts import (
     RNA_DESIGN_SYSTEM_PROMPT,
     GENERAL_BIOINFO_SYSTEM_PROMPT,
+    SYSTEM_CONTEXT_TEMPLATE,
     QUERY_CLASSIFICATION_PROMPT,
     OFF_TOPIC_REDIRECTION,
+    LITERATURE_REFERENCE_REQUIRED,
     RESPONSE_TEMPLATES,
     CAPABILITIES,
     RESPONSE_TYPES,
@@ -31,6 +45,74 @@ from .agent import RNAAnalysisAgent
 
 logger = logging.getLogger(__name__)
 
+# Unambiguous RNA terms; a match classifies the query as rna_design without any model call
+_RNA_KEYWORD_RE = re.compile(
+    r"\b(?:(?:m|t|r|si|mi|sh|sg|cr|sn|sno|pi|lnc|nc)?rnas?|aptamers?|ribozymes?|riboswitch(?:es)?"
+    r"|secondary structures?|tertiary structures?|base[- ]pair(?:s|ing)?|pseudoknots?|rnafold"
+    r"|copra|rnaformer|rnaflow|rnaframeflow|rnampnn|rnamigos2?|ribodiffusion|ufold|reformer|mol2aptamer)\b",
+    re.IGNORECASE,
+)
+
+# Words suggesting a message wants platform tools; matched anywhere, so 'fold' also hits 'folding'
+_TOOL_KEYWORD_RE = re.compile(
+    r"analyze|predict|structure|fold|interaction|binding|design|generate|create|aptamer"
+    r"|backbone|sequence|protein|ligand|affinity|smiles|pdb|cif",
+    re.IGNORECASE,
+)
+
+# Representative phrases per category; their mean embedding is the category prototype
+_CATEGORY_PROTOTYPES = {
+    "rna_design": [
+        "design an RNA sequence that folds into a target secondary structure",
+        "predict the structure of this RNA sequence",
+        "optimize an mRNA sequence for stability and expression",
+        "design an aptamer that binds a small molecule",
+        "predict protein-RNA binding affinity",
+    ],
+    "general_bioinfo": [
+        "how does sequence alignment work in bioinformatics",
+        "explain gene expression and transcription regulation",
+        "what tools are used for protein structure prediction",
+        "how do I analyze next-generation sequencing data",
+        "explain the basics of molecular biology",
+    ],
+    "off_topic": [
+        "what is a good recipe for dinner tonight",
+        "who won the football match yesterday",
+        "recommend a movie to watch this weekend",
+        "what do you think about the upcoming election",
+        "how do I fix my car engine",
+    ],
+}
+
+# Keep-alive pool shared by all LLM clients, so calls after the first skip TCP/TLS setup
+_LLM_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=8, max_connections=16, keepalive_expiry=60.0)
+_LLM_HTTP_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+
+# Categories the classifier may answer with
+_CATEGORY_NAMES = tuple(_CATEGORY_PROTOTYPES)
+
+# Below this prototype similarity the query is ambiguous and goes to the LLM
+_PROTOTYPE_MIN_SIMILARITY = 0.35
+
+# Prompt templates pre-split around their single placeholder, filled by concatenation
+_CONTEXT_HEAD, _CONTEXT_TAIL = SYSTEM_CONTEXT_TEMPLATE.split("{context}")
+_CLASSIFICATION_HEAD, _CLASSIFICATION_TAIL = QUERY_CLASSIFICATION_PROMPT.split("{query}")
+_OFF_TOPIC_HEAD, _OFF_TOPIC_TAIL = OFF_TOPIC_REDIRECTION.split("{query}")
+_LITERATURE_REQUIRED_HEAD, _LITERATURE_REQUIRED_TAIL = LITERATURE_REFERENCE_REQUIRED.split("{query}")
+
+
+def _sse_frame(payload: Dict[str, Any]) -> str:
+    """Encode a stream event as an SSE data frame, using orjson when installed"""
+    if orjson is not None:
+        return "data: " + orjson.dumps(payload).decode() + "\n\n"
+    return "data: " + json.dumps(payload) + "\n\n"
+
+
+# Fixed SSE frames, and the size of the pieces canned messages are streamed in
+_COMPLETE_FRAME = _sse_frame({'type': 'complete'})
+_STREAM_CHUNK_CHARS = 64
+
 
 class AssistantState(TypedDict):
     """State for the RNA Design Assistant"""
@@ -39,25 +121,217 @@ class AssistantState(TypedDict):
     confidence: float
     tools_used: Annotated[List[str], add]
     rag_context: str  # RAG context from documents
+    rag_usable: bool  # Whether rag_context holds retrieved literature
     citations: Annotated[List[Dict[str, Any]], add]  # Citations and references
     uploaded_files: List[Dict[str, Any]]  # Uploaded files for analysis
     agent_analysis: Dict[str, Any]  # Agent analysis results
 
 
+# Immutable starting values of AssistantState; chat() adds the messages and fresh containers
+_INITIAL_STATE_DEFAULTS = {
+    "response_type": "",
+    "confidence": 0.0,
+    "rag_context": "",
+    "rag_usable": False,
+}
+
+
+def _embed_unit(embed: Callable[[str], Any], text: str) -> Optional[np.ndarray]:
+    """Embed text as a unit float32 vector, or return None if embedding fails"""
+    try:
+        vector = np.asarray(embed(text), dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector
+    except Exception as e:
+        logger.warning(f"Query embedding failed: {e}")
+        return None
+
+
+class _SemanticCache:
+    """
+    Two-tier cache of per-query results
+
+    Exact repeats are found by normalized message text. Other queries are
+    embedded and compared against every cached embedding in a single
+    matrix-vector product; a close enough match reuses its value. Both tiers
+    evict oldest-first once maxsize entries are stored. Cached values are
+    shared between requests and must be treated as read-only.
+    """
+    
+    def __init__(self, embed: Callable[[str], Any], maxsize: int = 1024, threshold: float = 0.95):
+        """
+        Initialize the cache
+        
+        Args:
+            embed: Callable returning an embedding vector for a text
+            maxsize: Maximum number of cached values per tier
+            threshold: Minimum cosine similarity for a semantic hit
+        """
+        self._embed = embed
+        self._maxsize = maxsize
+        self._threshold = threshold
+        self._exact: "OrderedDict[str, Any]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None  # (maxsize, dim) ring buffer of unit vectors
+        self._values: List[Any] = [None] * maxsize
+        self._count = 0
+        self._next = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(message: str) -> str:
+        return " ".join(message.lower().split())
+    
+    def lookup(self, message: str, vector: Optional[np.ndarray] = None) -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """
+        Find a cached value for message
+        
+        Args:
+            message: Query text
+            vector: Unit embedding of message, if the caller already has one
+        
+        Returns:
+            Tuple of (value or None, unit query embedding or None); pass the
+            embedding back to store() on a miss to avoid recomputing it
+        """
+        key = self._normalize(message)
+        with self._lock:
+            value = self._exact.get(key)
+        if value is not None:
+            return value, vector
+        
+        if vector is None:
+            vector = _embed_unit(self._embed, message)
+            if vector is None:
+                return None, None
+        
+        with self._lock:
+            if self._count:
+                similarities = self._vectors[:self._count] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self._threshold:
+                    return self._values[best], vector
+        return None, vector
+    
+    def store(self, message: str, vector: Optional[np.ndarray], value: Any) -> None:
+        """Cache the value for message and, if given, its embedding"""
+        with self._lock:
+            self._exact[self._normalize(message)] = value
+            while len(self._exact) > self._maxsize:
+                self._exact.popitem(last=False)
+            
+            if vector is None:
+                return
+            if self._vectors is None:
+                self._vectors = np.zeros((self._maxsize, vector.shape[0]), dtype=np.float32)
+            self._vectors[self._next] = vector
+            self._values[self._next] = value
+            self._next = (self._next + 1) % self._maxsize
+            self._count = min(self._count + 1, self._maxsize)
+
+
+def _preview(value: Any, limit: int = 200) -> str:
+    """
+    Render a tool result value for the prompt, truncated to about limit characters
+    
+    Containers are serialized with orjson when available, which is much cheaper
+    than repr() on large nested results; strings and anything orjson rejects
+    fall back to str().
+    """
+    if orjson is not None and not isinstance(value, str):
+        try:
+            encoded = orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            encoded = None
+        if encoded is not None:
+            if len(encoded) <= limit:
+                return encoded.decode()
+            # Byte truncation may split a multi-byte character; drop the fragment
+            return encoded[:limit].decode(errors="ignore") + "..."
+    text = str(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _format_structure_result(tool_name: str, data: Dict[str, Any], parts: List[str]) -> None:
+    """Append the first predicted secondary structure of a folding tool's result"""
+    if not data.get("results"):
+        return
+    structure_result = data["results"][0]
+    sequence = structure_result.get("sequence", "")
+    
+    # Extract dot-bracket notation if available
+    dot_bracket = None
+    if "structure" in structure_result:
+        dot_bracket = structure_result["structure"]
+    elif "dot_bracket" in structure_result:
+        dot_bracket = structure_result["dot_bracket"]
+    elif "data" in structure_result and not structure_result["data"].startswith("1 "):
+        # Only use data field if it's not CT format (which starts with "1 ")
+        dot_bracket = structure_result["data"]
+    
+    if dot_bracket:
+        parts.append(f"Secondary Structure (dot-bracket): {dot_bracket}\n")
+    elif tool_name == 'bpfold' and "data" in structure_result and structure_result["data"].startswith("1 "):
+        # BPFold returns CT format, indicate this
+        parts.append("Secondary Structure: CT format data provided (not dot-bracket)\n")
+    
+    # Extract CT data if available
+    if "ct_data" in structure_result:
+        parts.append(f"CT Format Data:\n{structure_result['ct_data']}\n")
+    
+    # Extract energy information if available
+    if "energy" in structure_result:
+        parts.append(f"Free Energy: {structure_result['energy']} kcal/mol\n")
+    
+    parts.append(f"Sequence: {sequence}\n")
+    parts.append(f"Length: {len(sequence)} nucleotides\n")
+
+
+def _format_tool_data(tool_name: str, data: Dict[str, Any], parts: List[str]) -> None:
+    """Append binding scores, a prediction or a data preview from any other tool's result"""
+    # Handle protein-RNA interaction tools
+    if "binding_scores" in data:
+        scores = data["binding_scores"]
+        parts.append(f"Binding Scores: {scores[:10]}{'...' if len(scores) > 10 else ''}\n")
+        parts.append(f"Max Score: {data.get('max_score', 'N/A')}\n")
+        parts.append(f"Mean Score: {data.get('mean_score', 'N/A')}\n")
+    elif "prediction" in data:
+        pred = data["prediction"]
+        if isinstance(pred, dict) and "binding_affinity" in pred:
+            parts.append(f"Binding Affinity: {pred['binding_affinity']}\n")
+        else:
+            parts.append(f"Prediction: {_preview(pred)}\n")
+    else:
+        parts.append(f"Data: {_preview(data)}\n")
+
+
+# Agent result formatters by tool ID; tools not listed use _format_tool_data
+_TOOL_RESULT_FORMATTERS = {
+    'bpfold': _format_structure_result,
+    'ufold': _format_structure_result,
+    'mxfold2': _format_structure_result,
+    'rnaformer': _format_structure_result,
+}
+
+
 class RNADesignAssistant:
     """LangGraph-based RNA Design Assistant"""
     
     def __init__(self, api_key: str, api_base: str = "https://api.deepseek.com", 
-                 data_directory: str = "data", multimodal: bool = True):
+                 data_directory: str = "data", multimodal: bool = True, use_gpu: bool = False):
         """Initialize the RNA Design Assistant"""
         self.api_key = api_key
         self.api_base = api_base
+        self._http_client = httpx.Client(limits=_LLM_HTTP_LIMITS, timeout=_LLM_HTTP_TIMEOUT)
         self.llm = self._initialize_llm()
+        self.classifier_llm = self._initialize_classifier_llm()
         self.multimodal = multimodal
         
         # Initialize conversation memory
-        self.conversation_memory = []
         self.max_memory_length = 10  # Keep last 10 exchanges
+        self.conversation_memory = deque(maxlen=self.max_memory_length)
+        self._recent_exchanges = deque(maxlen=3)  # Last 3 exchanges, pre-rendered for the LLM context
         
         # Initialize streaming control
         self.streaming_active = False
@@ -65,7 +339,7 @@ class RNADesignAssistant:
         
         # Initialize RAG system - automatically load documents from data directory
         try:
-            self.rag_system = RNADesignRAGSystem(data_directory=data_directory)
+            self.rag_system = RNADesignRAGSystem(data_directory=data_directory, use_gpu=use_gpu)
             # Automatically process all PDF and Markdown files in the data directory
             processed_count = self.rag_system.add_documents_from_directory()
             # Initialized RAG system
@@ -73,6 +347,11 @@ class RNADesignAssistant:
             logger.error(f"Failed to initialize RAG system: {e}")
             raise
         
+        # Query classifications and retrievals are reused for repeated and near-duplicate messages
+        self._classify_cache = _SemanticCache(self.rag_system.text_embedder.encode)
+        self._rag_cache = _SemanticCache(self.rag_system.text_embedder.encode, maxsize=256, threshold=0.97)
+        self._category_names, self._category_prototypes = self._build_category_prototypes()
+        
         # Initialize RNA Analysis Agent
         try:
             self.analysis_agent = RNAAnalysisAgent()
@@ -96,26 +375,18 @@ class RNADesignAssistant:
             "assistant": ai_response,
             "timestamp": datetime.now().isoformat()
         })
-        
-        # Keep only the last max_memory_length exchanges
-        if len(self.conversation_memory) > self.max_memory_length:
-            self.conversation_memory = self.conversation_memory[-self.max_memory_length:]
+        self._recent_exchanges.append(f"User: {user_message}\nAssistant: {ai_response}")
     
     def _get_conversation_context(self) -> str:
         """Get recent conversation context for the LLM"""
-        if not self.conversation_memory:
+        if not self._recent_exchanges:
             return ""
-        
-        context_parts = ["Recent conversation:"]
-        for exchange in self.conversation_memory[-3:]:  # Last 3 exchanges
-            context_parts.append(f"User: {exchange['user']}")
-            context_parts.append(f"Assistant: {exchange['assistant']}")
-        
-        return "\n".join(context_parts)
+        return "Recent conversation:\n" + "\n".join(self._recent_exchanges)
     
     def clear_memory(self):
         """Clear conversation memory"""
-        self.conversation_memory = []
+        self.conversation_memory.clear()
+        self._recent_exchanges.clear()
         # Conversation memory cleared
     
     def stop_current_stream(self):
@@ -132,7 +403,19 @@ class RNADesignAssistant:
             model="deepseek-chat",
             temperature=0.7,
             max_tokens=2000,
-            streaming=True
+            streaming=True,
+            http_client=self._http_client
+        )
+    
+    def _initialize_classifier_llm(self) -> BaseChatModel:
+        """Initialize a DeepSeek LLM for query classification, capped at a few output tokens"""
+        return ChatOpenAI(
+            api_key=self.api_key,
+            base_url=f"{self.api_base}/v1",
+            model="deepseek-chat",
+            temperature=0,
+            max_tokens=8,
+            http_client=self._http_client
         )
     
     def _build_graph(self) -> StateGraph:
@@ -140,18 +423,15 @@ class RNADesignAssistant:
         workflow = StateGraph(AssistantState)
         
         # Add nodes
-        workflow.add_node("classify_query", self._classify_query)
-        workflow.add_node("retrieve_context", self._retrieve_context)
+        workflow.add_node("classify_and_retrieve", self._classify_and_retrieve)
         workflow.add_node("agent_analysis", self._agent_analysis)
         workflow.add_node("rna_design_expert", self._rna_design_expert)
         workflow.add_node("general_bioinfo", self._general_bioinfo)
         workflow.add_node("off_topic_handler", self._off_topic_handler)
-        workflow.add_node("response_formatter", self._format_response)
         
         # Add edges with conditional routing
-        workflow.add_edge("classify_query", "retrieve_context")
         workflow.add_conditional_edges(
-            "retrieve_context",
+            "classify_and_retrieve",
             self._route_query,
             {
                 "rna_design": "agent_analysis",
@@ -168,100 +448,224 @@ class RNADesignAssistant:
                 "off_topic": "off_topic_handler",
             },
         )
-        workflow.add_edge("rna_design_expert", "response_formatter")
-        workflow.add_edge("general_bioinfo", "response_formatter")
-        workflow.add_edge("off_topic_handler", "response_formatter")
-        workflow.add_edge("response_formatter", END)
+        # Responses need no post-processing (see _format_response), so experts finish the run
+        workflow.add_edge("rna_design_expert", END)
+        workflow.add_edge("general_bioinfo", END)
+        workflow.add_edge("off_topic_handler", END)
         
         # Set entry point
-        workflow.set_entry_point("classify_query")
+        workflow.set_entry_point("classify_and_retrieve")
         
         return workflow.compile()
     
-    def _classify_query(self, state: AssistantState) -> AssistantState:
-        """Classify the user query to determine response type"""
-        messages = state["messages"]
-        last_message = messages[-1].content if messages else ""
+    def _build_category_prototypes(self) -> Tuple[List[str], Optional[np.ndarray]]:
+        """
+        Embed the category prototype phrases
         
+        Returns:
+            Tuple of (category names, (n_categories, dim) matrix of unit prototype
+            vectors); the matrix is None if embedding fails
+        """
+        names = list(_CATEGORY_PROTOTYPES)
+        try:
+            prototypes = []
+            for name in names:
+                vectors = np.asarray(self.rag_system.text_embedder.encode(_CATEGORY_PROTOTYPES[name]), dtype=np.float32)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                prototypes.append(vectors.mean(axis=0))
+            matrix = np.stack(prototypes)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            return names, matrix
+        except Exception as e:
+            logger.warning(f"Failed to build query classification prototypes: {e}")
+            return names, None
+    
+    def _embed_query(self, message: str) -> Optional[np.ndarray]:
+        """Embed a user message once for the caches, classifier and document search"""
+        return _embed_unit(self.rag_system.text_embedder.encode, message)
+    
+    def _classify_locally(self, message: str,
+                          query_vector: Optional[np.ndarray] = None) -> Tuple[Optional[Tuple[str, float]], Optional[np.ndarray]]:
+        """
+        Classify a user message without calling the LLM, if it is unambiguous
+        
+        Args:
+            message: User message
+            query_vector: Unit embedding of message from _embed_query, if already computed
+        
+        Returns:
+            Tuple of ((category, confidence) or None if the LLM is needed, query embedding or None)
+        """
+        # Obvious RNA queries need no model call at all
+        if _RNA_KEYWORD_RE.search(message):
+            return ("rna_design", 0.9), query_vector
+        
+        # Skip the LLM round trip for queries classified before
+        cached, query_vector = self._classify_cache.lookup(message, query_vector)
+        if cached is not None:
+            return cached, query_vector
+        
+        # Nearest category prototype; only ambiguous queries fall through to the LLM
+        if query_vector is not None and self._category_prototypes is not None:
+            similarities = self._category_prototypes @ query_vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= _PROTOTYPE_MIN_SIMILARITY:
+                return (self._category_names[best], float(similarities[best])), query_vector
+        
+        return None, query_vector
+    
+    def _classify_with_llm(self, message: str, query_vector: Optional[np.ndarray] = None) -> Tuple[str, float]:
+        """
+        Classify a user message with the LLM and cache the result
+        
+        Returns:
+            Tuple of (category, confidence)
+        """
         # Use the classification prompt from prompts.py
-        classification_prompt = QUERY_CLASSIFICATION_PROMPT.format(query=last_message)
+        classification_prompt = _CLASSIFICATION_HEAD + message + _CLASSIFICATION_TAIL
         
         try:
-            response = self.llm.invoke([HumanMessage(content=classification_prompt)])
-            category = response.content.strip().lower()
+            response = self.classifier_llm.invoke([HumanMessage(content=classification_prompt)])
+            answer = response.content.strip().strip('"\'`').lower()
             
-            # Validate category
-            if category not in ["rna_design", "general_bioinfo", "off_topic"]:
-                category = "off_topic"
+            # Validate category; the reply may be cut off or followed by punctuation
+            category = next((name for name in _CATEGORY_NAMES if answer.startswith(name)), "off_topic")
                 
-            state["response_type"] = category
-            state["confidence"] = 0.9 if category == "rna_design" else 0.7
+            confidence = 0.9 if category == "rna_design" else 0.7
+            self._classify_cache.store(message, query_vector, (category, confidence))
+            return category, confidence
             
         except Exception as e:
             logger.error(f"Query classification failed: {e}")
-            state["response_type"] = "off_topic"
-            state["confidence"] = 0.5
-            
-        return state
+            return "off_topic", 0.5
     
-    def _retrieve_context(self, state: AssistantState) -> AssistantState:
-        """Retrieve relevant context from documents using RAG"""
+    def _classify_text(self, message: str, query_vector: Optional[np.ndarray] = None) -> Tuple[str, float]:
+        """
+        Classify a user message to determine response type
+        
+        Args:
+            message: User message
+            query_vector: Unit embedding of message from _embed_query, if already computed
+        
+        Returns:
+            Tuple of (category, confidence)
+        """
+        label, query_vector = self._classify_locally(message, query_vector)
+        if label is not None:
+            return label
+        return self._classify_with_llm(message, query_vector)
+    
+    def _classify_query(self, state: AssistantState) -> AssistantState:
+        """Classify the user query to determine response type"""
         messages = state["messages"]
         last_message = messages[-1].content if messages else ""
+        state["response_type"], state["confidence"] = self._classify_text(last_message)
+        return state
+    
+    def _retrieve_text(self, message: str, query_vector: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Retrieve relevant context for a user message from documents using RAG
+        
+        Args:
+            message: User message
+            query_vector: Unit embedding of message from _embed_query, if already computed
+        
+        Returns:
+            State fields: rag_context, rag_usable, citations and has_literature
+        """
+        # Near-identical follow-ups reuse an earlier retrieval
+        cached, query_vector = self._rag_cache.lookup(message, query_vector)
+        if cached is not None:
+            rag_context, citations, has_literature = cached
+            return {
+                "rag_context": rag_context,
+                "rag_usable": bool(citations),
+                "citations": list(citations),
+                "has_literature": has_literature
+            }
         
         try:
             # Get RAG context and citations - automatically use documents from data directory
             if self.multimodal and hasattr(self.rag_system, 'get_multimodal_context'):
                 rag_context, citations = self.rag_system.get_multimodal_context(
-                    last_message, max_text_chunks=15, max_images=5
+                    message, max_text_chunks=15, max_images=5, query_embedding=query_vector
                 )
             else:
-                rag_context, citations = self.rag_system.get_rag_context(last_message, max_chunks=15)
-            
-            # RAG retrieval completed
-            
-            # Check if we have meaningful context
-            # Very permissive threshold - accept any citations with reasonable scores
-            has_literature = (
-                len(citations) > 0 and
-                any(citation.get("score", 0) > -0.5 for citation in citations)  # Accept even negative similarities
-            )
-            
-            # Additional check: if we have any context at all, consider it literature
-            if not has_literature and rag_context and rag_context != "No relevant documents found.":
-                has_literature = True
-                # RAG context found but no citations - still considering as literature
+                rag_context, citations = self.rag_system.get_rag_context(
+                    message, max_chunks=15, query_embedding=query_vector
+                )
             
-            # Final fallback: if we have any citations at all, consider it literature
-            if not has_literature and len(citations) > 0:
-                has_literature = True
-                # Found citations with low scores - still considering as literature
+            # Any citation, whatever its score, counts as literature; without one the
+            # context is only the RAG system's "nothing found" message
+            rag_usable = bool(citations)
+            has_literature = rag_usable
             
-            # Update state with RAG context
-            state["rag_context"] = rag_context
-            state["citations"] = citations
-            state["has_literature"] = has_literature
+            if citations:
+                # Empty results may come from a swallowed search error, so only hits are cached
+                self._rag_cache.store(message, query_vector, (rag_context, list(citations), has_literature))
             
-            # Final RAG decision made
+            return {
+                "rag_context": rag_context,
+                "rag_usable": rag_usable,
+                "citations": citations,
+                "has_literature": has_literature
+            }
             
         except Exception as e:
             logger.error(f"RAG context retrieval failed: {e}")
-            state["rag_context"] = "No relevant documents found."
-            state["citations"] = []
-            state["has_literature"] = False
+            return {
+                "rag_context": "No relevant documents found.",
+                "rag_usable": False,
+                "citations": [],
+                "has_literature": False
+            }
+    
+    def _retrieve_context(self, state: AssistantState) -> AssistantState:
+        """Retrieve relevant context from documents using RAG"""
+        messages = state["messages"]
+        last_message = messages[-1].content if messages else ""
+        state.update(self._retrieve_text(last_message))
+        return state
+    
+    def _classify_and_retrieve(self, state: AssistantState) -> AssistantState:
+        """
+        Classify the query and retrieve its context
         
+        Off-topic queries get a static redirection, so retrieval is skipped for
+        them. When classification needs the LLM, retrieval runs speculatively
+        alongside it rather than waiting for the category.
+        """
+        messages = state["messages"]
+        last_message = messages[-1].content if messages else ""
+        
+        # Embedded once here and shared by both caches, the classifier and the search
+        query_vector = self._embed_query(last_message)
+        
+        label, query_vector = self._classify_locally(last_message, query_vector)
+        if label is not None:
+            state["response_type"], state["confidence"] = label
+            if label[0] != "off_topic":
+                state.update(self._retrieve_text(last_message, query_vector))
+            return state
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="copilot-rag") as executor:
+            retrieval = executor.submit(self._retrieve_text, last_message, query_vector)
+            state["response_type"], state["confidence"] = self._classify_with_llm(last_message, query_vector)
+            retrieved = retrieval.result()
+        if state["response_type"] != "off_topic":
+            state.update(retrieved)
         return state
     
     def _route_query(self, state: AssistantState) -> str:
         """Route the query based on classification"""
         response_type = state.get("response_type", "off_topic")
-        logger.info(f"Routing query to: {response_type}")
+        logger.info("Routing query to: %s", response_type)
         return response_type
     
     def _route_after_agent(self, state: AssistantState) -> str:
         """Route after agent analysis based on original classification"""
         response_type = state.get("response_type", "off_topic")
-        logger.info(f"Routing after agent analysis to: {response_type}")
+        logger.info("Routing after agent analysis to: %s", response_type)
         return response_type
     
     def _agent_analysis(self, state: AssistantState) -> AssistantState:
@@ -272,9 +676,9 @@ class RNADesignAssistant:
         
         # Check if we have uploaded files or if the request suggests tool usage
         should_use_agent = self._should_use_agent(last_message)
-        logger.info(f"Agent analysis check - uploaded_files: {len(uploaded_files)}, should_use_agent: {should_use_agent}")
-        if uploaded_files:
-            logger.info(f"Uploaded files details: {[f.get('name', 'Unknown') for f in uploaded_files]}")
+        logger.info("Agent analysis check - uploaded_files: %d, should_use_agent: %s", len(uploaded_files), should_use_agent)
+        if uploaded_files and logger.isEnabledFor(logging.INFO):
+            logger.info("Uploaded files details: %s", [f.get('name', 'Unknown') for f in uploaded_files])
         
         if not uploaded_files and not should_use_agent:
             # No files and no clear tool usage request, skip agent analysis
@@ -324,15 +728,11 @@ class RNADesignAssistant:
     
     def _should_use_agent(self, message: str) -> bool:
         """Determine if the message suggests using agent tools"""
-        message_lower = message.lower()
-        tool_keywords = [
-            'analyze', 'predict', 'structure', 'fold', 'interaction', 'binding',
-            'design', 'generate', 'create', 'aptamer', 'backbone', 'sequence',
-            'protein', 'ligand', 'affinity', 'smiles', 'pdb', 'cif'
-        ]
-        found_keywords = [keyword for keyword in tool_keywords if keyword in message_lower]
-        logger.info(f"Agent detection - Message: '{message_lower}', Found keywords: {found_keywords}")
-        return len(found_keywords) > 0
+        if logger.isEnabledFor(logging.INFO):
+            found_keywords = sorted({keyword.lower() for keyword in _TOOL_KEYWORD_RE.findall(message)})
+            logger.info("Agent detection - Message: '%s', Found keywords: %s", message.lower(), found_keywords)
+            return len(found_keywords) > 0
+        return _TOOL_KEYWORD_RE.search(message) is not None
     
     def _rna_design_expert(self, state: AssistantState) -> AssistantState:
         """Handle RNA design specific queries with expert knowledge"""
@@ -347,98 +747,16 @@ class RNADesignAssistant:
         
         if not has_literature and not agent_analysis.get("success", False):
             # Use the literature reference required message
-            from .prompts import LITERATURE_REFERENCE_REQUIRED
-            response_content = LITERATURE_REFERENCE_REQUIRED.format(query=last_message)
+            response_content = _LITERATURE_REQUIRED_HEAD + last_message + _LITERATURE_REQUIRED_TAIL
             state["messages"].append(AIMessage(content=response_content))
             state["tools_used"].append("rna_design_expert")
             return state
         
         # Build context including RAG context and agent analysis
-        context = self._build_rna_context(state)
-        rag_context = state.get("rag_context", "")
-        
-        # Add agent analysis results to context
-        if agent_analysis.get("success", False):
-            execution_result = agent_analysis.get("execution_result", {})
-            if execution_result.get("success", False):
-                context += f"\n\nAGENT ANALYSIS RESULTS:\n"
-                context += f"Tools used: {', '.join(agent_analysis.get('tools_used', []))}\n"
-                context += f"Analysis summary: {execution_result.get('summary', 'No summary available')}\n"
-                
-                # Add specific tool results
-                tool_results = execution_result.get("tool_results", {})
-                for tool_name, result in tool_results.items():
-                    if result.get("success", False):
-                        context += f"\n{tool_name.upper()} RESULTS:\n"
-                        context += f"Status: Success\n"
-                        context += f"Category: {result.get('category', 'Unknown')}\n"
-                        
-                        # Add specific data from the tool
-                        data = result.get("data", {})
-                        if isinstance(data, dict):
-                            # Handle RNA secondary structure prediction tools
-                            if tool_name in ['bpfold', 'ufold', 'mxfold2', 'rnaformer']:
-                                if "results" in data and data["results"]:
-                                    structure_result = data["results"][0]
-                                    sequence = structure_result.get("sequence", "")
-                                    
-                                    # Extract dot-bracket notation if available
-                                    dot_bracket = None
-                                    if "structure" in structure_result:
-                                        dot_bracket = structure_result["structure"]
-                                    elif "dot_bracket" in structure_result:
-                                        dot_bracket = structure_result["dot_bracket"]
-                                    elif "data" in structure_result and not structure_result["data"].startswith("1 "):
-                                        # Only use data field if it's not CT format (which starts with "1 ")
-                                        dot_bracket = structure_result["data"]
-                                    
-                                    if dot_bracket:
-                                        context += f"Secondary Structure (dot-bracket): {dot_bracket}\n"
-                                    
-                                    # Extract CT data if available
-                                    if "ct_data" in structure_result:
-                                        ct_data = structure_result["ct_data"]
-                                        context += f"CT Format Data:\n{ct_data}\n"
-                                    
-                                    # Extract energy information if available
-                                    if "energy" in structure_result:
-                                        energy = structure_result["energy"]
-                                        context += f"Free Energy: {energy} kcal/mol\n"
-                                    
-                                    context += f"Sequence: {sequence}\n"
-                                    context += f"Length: {len(sequence)} nucleotides\n"
-                                    
-                            # Handle protein-RNA interaction tools
-                            elif "binding_scores" in data:
-                                scores = data["binding_scores"]
-                                context += f"Binding Scores: {scores[:10]}{'...' if len(scores) > 10 else ''}\n"
-                                context += f"Max Score: {data.get('max_score', 'N/A')}\n"
-                                context += f"Mean Score: {data.get('mean_score', 'N/A')}\n"
-                            elif "prediction" in data:
-                                pred = data["prediction"]
-                                if isinstance(pred, dict) and "binding_affinity" in pred:
-                                    context += f"Binding Affinity: {pred['binding_affinity']}\n"
-                                else:
-                                    context += f"Prediction: {str(pred)[:200]}{'...' if len(str(pred)) > 200 else ''}\n"
-                            else:
-                                context += f"Data: {str(data)[:200]}{'...' if len(str(data)) > 200 else ''}\n"
-                    else:
-                        context += f"\n{tool_name.upper()} RESULTS:\n"
-                        context += f"Status: Failed - {result.get('error', 'Unknown error')}\n"
-        
-        # Enhance context with RAG information
-        if rag_context and rag_context != "No relevant documents found.":
-            # Add RAG context with clear instructions
-            context += f"\n\nCRITICAL: You have access to relevant literature. Use the following information to answer the user's question. DO NOT say 'no relevant literature found' - use the provided literature:\n\n{rag_context}"
-        
-        # Use the RNA design system prompt from prompts.py
-        system_prompt = RNA_DESIGN_SYSTEM_PROMPT.format(context=context)
+        prompt = self._build_expert_messages(state, self._build_rna_context(state), RNA_DESIGN_SYSTEM_PROMPT)
         
         try:
-            response = self.llm.invoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=last_message)
-            ])
+            response = self.llm.invoke(prompt)
             
             state["messages"].append(AIMessage(content=response.content))
             state["tools_used"].append("rna_design_expert")
@@ -462,98 +780,16 @@ class RNADesignAssistant:
         
         if not has_literature and not agent_analysis.get("success", False):
             # Use the literature reference required message
-            from .prompts import LITERATURE_REFERENCE_REQUIRED
-            response_content = LITERATURE_REFERENCE_REQUIRED.format(query=last_message)
+            response_content = _LITERATURE_REQUIRED_HEAD + last_message + _LITERATURE_REQUIRED_TAIL
             state["messages"].append(AIMessage(content=response_content))
             state["tools_used"].append("general_bioinfo")
             return state
         
         # Build context including RAG context and agent analysis
-        context = self._build_general_context(state)
-        rag_context = state.get("rag_context", "")
-        
-        # Add agent analysis results to context
-        if agent_analysis.get("success", False):
-            execution_result = agent_analysis.get("execution_result", {})
-            if execution_result.get("success", False):
-                context += f"\n\nAGENT ANALYSIS RESULTS:\n"
-                context += f"Tools used: {', '.join(agent_analysis.get('tools_used', []))}\n"
-                context += f"Analysis summary: {execution_result.get('summary', 'No summary available')}\n"
-                
-                # Add specific tool results
-                tool_results = execution_result.get("tool_results", {})
-                for tool_name, result in tool_results.items():
-                    if result.get("success", False):
-                        context += f"\n{tool_name.upper()} RESULTS:\n"
-                        context += f"Status: Success\n"
-                        context += f"Category: {result.get('category', 'Unknown')}\n"
-                        
-                        # Add specific data from the tool
-                        data = result.get("data", {})
-                        if isinstance(data, dict):
-                            # Handle RNA secondary structure prediction tools
-                            if tool_name in ['bpfold', 'ufold', 'mxfold2', 'rnaformer']:
-                                if "results" in data and data["results"]:
-                                    structure_result = data["results"][0]
-                                    sequence = structure_result.get("sequence", "")
-                                    
-                                    # Extract dot-bracket notation if available
-                                    dot_bracket = None
-                                    if "structure" in structure_result:
-                                        dot_bracket = structure_result["structure"]
-                                    elif "dot_bracket" in structure_result:
-                                        dot_bracket = structure_result["dot_bracket"]
-                                    elif "data" in structure_result and not structure_result["data"].startswith("1 "):
-                                        # Only use data field if it's not CT format (which starts with "1 ")
-                                        dot_bracket = structure_result["data"]
-                                    
-                                    if dot_bracket:
-                                        context += f"Secondary Structure (dot-bracket): {dot_bracket}\n"
-                                    
-                                    # Extract CT data if available
-                                    if "ct_data" in structure_result:
-                                        ct_data = structure_result["ct_data"]
-                                        context += f"CT Format Data:\n{ct_data}\n"
-                                    
-                                    # Extract energy information if available
-                                    if "energy" in structure_result:
-                                        energy = structure_result["energy"]
-                                        context += f"Free Energy: {energy} kcal/mol\n"
-                                    
-                                    context += f"Sequence: {sequence}\n"
-                                    context += f"Length: {len(sequence)} nucleotides\n"
-                                    
-                            # Handle protein-RNA interaction tools
-                            elif "binding_scores" in data:
-                                scores = data["binding_scores"]
-                                context += f"Binding Scores: {scores[:10]}{'...' if len(scores) > 10 else ''}\n"
-                                context += f"Max Score: {data.get('max_score', 'N/A')}\n"
-                                context += f"Mean Score: {data.get('mean_score', 'N/A')}\n"
-                            elif "prediction" in data:
-                                pred = data["prediction"]
-                                if isinstance(pred, dict) and "binding_affinity" in pred:
-                                    context += f"Binding Affinity: {pred['binding_affinity']}\n"
-                                else:
-                                    context += f"Prediction: {str(pred)[:200]}{'...' if len(str(pred)) > 200 else ''}\n"
-                            else:
-                                context += f"Data: {str(data)[:200]}{'...' if len(str(data)) > 200 else ''}\n"
-                    else:
-                        context += f"\n{tool_name.upper()} RESULTS:\n"
-                        context += f"Status: Failed - {result.get('error', 'Unknown error')}\n"
-        
-        # Enhance context with RAG information
-        if rag_context and rag_context != "No relevant documents found.":
-            # Add RAG context with clear instructions
-            context += f"\n\nCRITICAL: You have access to relevant literature. Use the following information to answer the user's question. DO NOT say 'no relevant literature found' - use the provided literature:\n\n{rag_context}"
-        
-        # Use the general bioinfo system prompt from prompts.py
-        system_prompt = GENERAL_BIOINFO_SYSTEM_PROMPT.format(context=context)
+        prompt = self._build_expert_messages(state, self._build_general_context(state), GENERAL_BIOINFO_SYSTEM_PROMPT)
         
         try:
-            response = self.llm.invoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=last_message)
-            ])
+            response = self.llm.invoke(prompt)
             
             state["messages"].append(AIMessage(content=response.content))
             state["tools_used"].append("general_bioinfo")
@@ -564,13 +800,96 @@ class RNADesignAssistant:
             
         return state
     
+    def _build_expert_messages(self, state: AssistantState, context: str, system_prompt: str) -> List[Any]:
+        """
+        Build the expert LLM prompt from base context, agent results and literature
+        
+        The static system prompt always comes first, followed by the agent results
+        (identical across follow-up turns on the same sequence, since predictions
+        are cached) and then the per-request context, so the provider's prefix
+        cache can reuse as much of the prompt as possible.
+        
+        Args:
+            state: Current assistant state
+            context: Base context from _build_rna_context or _build_general_context
+            system_prompt: Static expert system prompt
+        
+        Returns:
+            System, agent results, context and human messages for the LLM
+        """
+        messages = state["messages"]
+        last_message = messages[-1].content if messages else ""
+        
+        prompt = [SystemMessage(content=system_prompt)]
+        
+        # Agent analysis results go in their own message ahead of the per-query context
+        agent_results = self._format_agent_results(state.get("agent_analysis", {}))
+        if agent_results:
+            prompt.append(SystemMessage(content=agent_results.lstrip("\n")))
+        
+        # Enhance context with RAG information
+        if state.get("rag_usable", False):
+            # Add RAG context with clear instructions
+            context += f"\n\nCRITICAL: You have access to relevant literature. Use the following information to answer the user's question. DO NOT say 'no relevant literature found' - use the provided literature:\n\n{state['rag_context']}"
+        
+        prompt.append(SystemMessage(content=_CONTEXT_HEAD + context + _CONTEXT_TAIL))
+        prompt.append(HumanMessage(content=last_message))
+        return prompt
+    
+    def _build_stream_messages(self, state: AssistantState, response_type: str) -> List[Any]:
+        """Build the streaming LLM prompt, matching the non-streaming expert nodes"""
+        if response_type == "rna_design":
+            return self._build_expert_messages(state, self._build_rna_context(state), RNA_DESIGN_SYSTEM_PROMPT)
+        if response_type == "general_bioinfo":
+            return self._build_expert_messages(state, self._build_general_context(state), GENERAL_BIOINFO_SYSTEM_PROMPT)
+        
+        messages = state["messages"]
+        last_message = messages[-1].content if messages else ""
+        return [
+            SystemMessage(content="You are a specialized RNA design assistant. Politely redirect off-topic questions to RNA design topics."),
+            HumanMessage(content=last_message)
+        ]
+    
+    def _format_agent_results(self, agent_analysis: Dict[str, Any]) -> str:
+        """Render successful agent analysis results as prompt context"""
+        if not agent_analysis.get("success", False):
+            return ""
+        execution_result = agent_analysis.get("execution_result", {})
+        if not execution_result.get("success", False):
+            return ""
+        
+        parts = [
+            "\n\nAGENT ANALYSIS RESULTS:\n",
+            f"Tools used: {', '.join(agent_analysis.get('tools_used', []))}\n",
+            f"Analysis summary: {execution_result.get('summary', 'No summary available')}\n",
+        ]
+        
+        # Add specific tool results
+        tool_results = execution_result.get("tool_results", {})
+        for tool_name, result in tool_results.items():
+            parts.append(f"\n{tool_name.upper()} RESULTS:\n")
+            if not result.get("success", False):
+                parts.append(f"Status: Failed - {result.get('error', 'Unknown error')}\n")
+                continue
+            
+            parts.append("Status: Success\n")
+            parts.append(f"Category: {result.get('category', 'Unknown')}\n")
+            
+            # Add specific data from the tool
+            data = result.get("data", {})
+            if isinstance(data, dict):
+                formatter = _TOOL_RESULT_FORMATTERS.get(tool_name, _format_tool_data)
+                formatter(tool_name, data, parts)
+        
+        return "".join(parts)
+    
     def _off_topic_handler(self, state: AssistantState) -> AssistantState:
         """Handle off-topic queries by redirecting to RNA design"""
         messages = state["messages"]
         last_message = messages[-1].content if messages else ""
         
         # Use the off-topic redirection message from prompts.py
-        redirection_message = OFF_TOPIC_REDIRECTION.format(query=last_message)
+        redirection_message = _OFF_TOPIC_HEAD + last_message + _OFF_TOPIC_TAIL
         
         state["messages"].append(AIMessage(content=redirection_message))
         state["tools_used"].append("off_topic_handler")
@@ -578,7 +897,12 @@ class RNADesignAssistant:
         return state
     
     def _format_response(self, state: AssistantState) -> AssistantState:
-        """Format the final response with citations"""
+        """
+        Format the final response with citations
+        
+        Currently a no-op and not part of the graph; register it again if
+        citations or metadata are added back to responses.
+        """
         messages = state["messages"]
         if messages:
             last_message = messages[-1]
@@ -662,11 +986,9 @@ class RNADesignAssistant:
             messages.append(HumanMessage(content=message))
             
             initial_state = {
+                **_INITIAL_STATE_DEFAULTS,
                 "messages": messages,
-                "response_type": "",
-                "confidence": 0.0,
                 "tools_used": [],
-                "rag_context": "",
                 "citations": [],
                 "uploaded_files": uploaded_files or [],
                 "agent_analysis": {}
@@ -727,12 +1049,9 @@ class RNADesignAssistant:
     def _stream_chat(self, state: AssistantState, user_message: str) -> Dict[str, Any]:
         """Handle streaming chat"""
         try:
-            # First, retrieve RAG context (same as non-streaming)
-            state = self._retrieve_context(state)
-            
-            # Determine which expert to use based on classification
-            classification_result = self._classify_query(state.copy())
-            response_type = classification_result["response_type"]
+            # Classify and retrieve RAG context (same as non-streaming)
+            state = self._classify_and_retrieve(state)
+            response_type = state["response_type"]
             
             # Perform agent analysis if needed (same as non-streaming)
             if response_type in ["rna_design", "general_bioinfo"]:
@@ -741,31 +1060,8 @@ class RNADesignAssistant:
                 uploaded_files = state.get("uploaded_files", [])
                 
                 if uploaded_files or should_use_agent:
-                    # Send tool calling status to frontend
-                    def generate_tool_status_stream():
-                        yield f"data: {json.dumps({'type': 'tool_status', 'status': 'analyzing', 'message': 'Analyzing sequences and calling tools...'})}\n\n"
-                        
-                        # Perform agent analysis
-                        state_with_agent = self._agent_analysis(state)
-                        
-                        # Update state with agent results
-                        state.update(state_with_agent)
-                        
-                        # Send completion status only if tools were actually used
-                        agent_analysis = state.get("agent_analysis", {})
-                        if agent_analysis.get("success", False):
-                            tools_used = agent_analysis.get("tools_used", [])
-                            if tools_used:  # Only show status if tools were actually used
-                                yield f"data: {json.dumps({'type': 'tool_status', 'status': 'completed', 'message': f'Analysis completed using {len(tools_used)} tools: {", ".join(tools_used)}'})}\n\n"
-                        
-                        return state
-                    
                     # Create a combined stream that shows tool status and then AI response
                     def generate_combined_stream():
-                        # Check if agent analysis should be performed
-                        should_use_agent = self._should_use_agent(user_message)
-                        uploaded_files = state.get("uploaded_files", [])
-                        
                         if uploaded_files or should_use_agent:
                             # Analyze the request first
                             analysis_result = self.analysis_agent.analyze_request(user_message, uploaded_files)
@@ -777,11 +1073,7 @@ class RNADesignAssistant:
                                 execution_results = {}
                                 for tool_name in tools_used:
                                     # Send calling status
-                                    yield f"data: {json.dumps({'type': 'tool_status', 'status': 'calling', 'tool': tool_name, 'message': f'Calling {tool_name}...'})}\n\n"
-                                    
-                                    # Small delay to ensure status is sent before tool execution
-                                    import time
-                                    time.sleep(0.2)
+                                    yield _sse_frame({'type': 'tool_status', 'status': 'calling', 'tool': tool_name, 'message': f'Calling {tool_name}...'})
                                     
                                     # Execute the tool
                                     try:
@@ -794,7 +1086,7 @@ class RNADesignAssistant:
                                         execution_results[tool_name] = tool_result
                                         
                                         # Send completion status
-                                        yield f"data: {json.dumps({'type': 'tool_status', 'status': 'completed', 'tool': tool_name, 'message': f'{tool_name} completed'})}\n\n"
+                                        yield _sse_frame({'type': 'tool_status', 'status': 'completed', 'tool': tool_name, 'message': f'{tool_name} completed'})
                                         
                                     except Exception as e:
                                         execution_results[tool_name] = {
@@ -804,7 +1096,7 @@ class RNADesignAssistant:
                                         }
                                         
                                         # Send error status
-                                        yield f"data: {json.dumps({'type': 'tool_status', 'status': 'error', 'tool': tool_name, 'message': f'{tool_name} failed'})}\n\n"
+                                        yield _sse_frame({'type': 'tool_status', 'status': 'error', 'tool': tool_name, 'message': f'{tool_name} failed'})
                                 
                                 # Update state with results
                                 state["agent_analysis"] = {
@@ -830,198 +1122,17 @@ class RNADesignAssistant:
                             # No agent analysis needed
                             state["agent_analysis"] = {"skipped": True, "reason": "No files or tool usage detected"}
                         
-                        # Now continue with AI response generation
-                        # Build context with agent analysis results
-                        if response_type == "rna_design":
-                            context = self._build_rna_context(state)
-                            rag_context = state.get("rag_context", "")
-                            
-                            # Add agent analysis results to context
-                            agent_analysis = state.get("agent_analysis", {})
-                            if agent_analysis.get("success", False):
-                                execution_result = agent_analysis.get("execution_result", {})
-                                if execution_result.get("success", False):
-                                    context += f"\n\nAGENT ANALYSIS RESULTS:\n"
-                                    context += f"Tools used: {', '.join(agent_analysis.get('tools_used', []))}\n"
-                                    context += f"Analysis summary: {execution_result.get('summary', 'No summary available')}\n"
-                                    
-                                    # Add specific tool results
-                                    tool_results = execution_result.get("tool_results", {})
-                                    for tool_name, result in tool_results.items():
-                                        if result.get("success", False):
-                                            context += f"\n{tool_name.upper()} RESULTS:\n"
-                                            context += f"Status: Success\n"
-                                            context += f"Category: {result.get('category', 'Unknown')}\n"
-                                            
-                                            # Add specific data from the tool
-                                            data = result.get("data", {})
-                                            if isinstance(data, dict):
-                                                # Handle RNA secondary structure prediction tools
-                                                if tool_name in ['bpfold', 'ufold', 'mxfold2', 'rnaformer']:
-                                                    if "results" in data and data["results"]:
-                                                        structure_result = data["results"][0]
-                                                        sequence = structure_result.get("sequence", "")
-                                                        
-                                                        # Extract dot-bracket notation if available
-                                                        dot_bracket = None
-                                                        if "structure" in structure_result:
-                                                            dot_bracket = structure_result["structure"]
-                                                        elif "dot_bracket" in structure_result:
-                                                            dot_bracket = structure_result["dot_bracket"]
-                                                        elif "data" in structure_result and not structure_result["data"].startswith("1 "):
-                                                            # Only use data field if it's not CT format (which starts with "1 ")
-                                                            dot_bracket = structure_result["data"]
-                                                        
-                                                        
-                                                        if dot_bracket:
-                                                            context += f"Secondary Structure (dot-bracket): {dot_bracket}\n"
-                                                        elif tool_name == 'bpfold' and "data" in structure_result and structure_result["data"].startswith("1 "):
-                                                            # BPFold returns CT format, indicate this
-                                                            context += f"Secondary Structure: CT format data provided (not dot-bracket)\n"
-                                                        
-                                                        # Extract CT data if available
-                                                        if "ct_data" in structure_result:
-                                                            ct_data = structure_result["ct_data"]
-                                                            context += f"CT Format Data:\n{ct_data}\n"
-                                                        
-                                                        # Extract energy information if available
-                                                        if "energy" in structure_result:
-                                                            energy = structure_result["energy"]
-                                                            context += f"Free Energy: {energy} kcal/mol\n"
-                                                        
-                                                        context += f"Sequence: {sequence}\n"
-                                                        context += f"Length: {len(sequence)} nucleotides\n"
-                                                        
-                                                # Handle protein-RNA interaction tools
-                                                elif "binding_scores" in data:
-                                                    scores = data["binding_scores"]
-                                                    context += f"Binding Scores: {scores[:10]}{'...' if len(scores) > 10 else ''}\n"
-                                                    context += f"Max Score: {data.get('max_score', 'N/A')}\n"
-                                                    context += f"Mean Score: {data.get('mean_score', 'N/A')}\n"
-                                                elif "prediction" in data:
-                                                    pred = data["prediction"]
-                                                    if isinstance(pred, dict) and "binding_affinity" in pred:
-                                                        context += f"Binding Affinity: {pred['binding_affinity']}\n"
-                                                    else:
-                                                        context += f"Prediction: {str(pred)[:200]}{'...' if len(str(pred)) > 200 else ''}\n"
-                                                else:
-                                                    context += f"Data: {str(data)[:200]}{'...' if len(str(data)) > 200 else ''}\n"
-                                        else:
-                                            context += f"\n{tool_name.upper()} RESULTS:\n"
-                                            context += f"Status: Failed - {result.get('error', 'Unknown error')}\n"
-                            
-                            # Enhance context with RAG information
-                            if rag_context and rag_context != "No relevant documents found.":
-                                context += f"\n\nRELEVANT LITERATURE CONTEXT:\n{rag_context}"
-                            
-                            system_prompt = f"""
-                            You are an expert RNA design assistant. Provide detailed, accurate advice for RNA design tasks.
-                            Current context: {context}
-                            """
-                        elif response_type == "general_bioinfo":
-                            context = self._build_general_context(state)
-                            rag_context = state.get("rag_context", "")
-                            
-                            # Add agent analysis results to context
-                            agent_analysis = state.get("agent_analysis", {})
-                            if agent_analysis.get("success", False):
-                                execution_result = agent_analysis.get("execution_result", {})
-                                if execution_result.get("success", False):
-                                    context += f"\n\nAGENT ANALYSIS RESULTS:\n"
-                                    context += f"Tools used: {', '.join(agent_analysis.get('tools_used', []))}\n"
-                                    context += f"Analysis summary: {execution_result.get('summary', 'No summary available')}\n"
-                                    
-                                    # Add specific tool results
-                                    tool_results = execution_result.get("tool_results", {})
-                                    for tool_name, result in tool_results.items():
-                                        if result.get("success", False):
-                                            context += f"\n{tool_name.upper()} RESULTS:\n"
-                                            context += f"Status: Success\n"
-                                            context += f"Category: {result.get('category', 'Unknown')}\n"
-                                            
-                                            # Add specific data from the tool
-                                            data = result.get("data", {})
-                                            if isinstance(data, dict):
-                                                # Handle RNA secondary structure prediction tools
-                                                if tool_name in ['bpfold', 'ufold', 'mxfold2', 'rnaformer']:
-                                                    if "results" in data and data["results"]:
-                                                        structure_result = data["results"][0]
-                                                        sequence = structure_result.get("sequence", "")
-                                                        
-                                                        # Extract dot-bracket notation if available
-                                                        dot_bracket = None
-                                                        if "structure" in structure_result:
-                                                            dot_bracket = structure_result["structure"]
-                                                        elif "dot_bracket" in structure_result:
-                                                            dot_bracket = structure_result["dot_bracket"]
-                                                        elif "data" in structure_result and not structure_result["data"].startswith("1 "):
-                                                            # Only use data field if it's not CT format (which starts with "1 ")
-                                                            dot_bracket = structure_result["data"]
-                                                        
-                                                        
-                                                        if dot_bracket:
-                                                            context += f"Secondary Structure (dot-bracket): {dot_bracket}\n"
-                                                        elif tool_name == 'bpfold' and "data" in structure_result and structure_result["data"].startswith("1 "):
-                                                            # BPFold returns CT format, indicate this
-                                                            context += f"Secondary Structure: CT format data provided (not dot-bracket)\n"
-                                                        
-                                                        # Extract CT data if available
-                                                        if "ct_data" in structure_result:
-                                                            ct_data = structure_result["ct_data"]
-                                                            context += f"CT Format Data:\n{ct_data}\n"
-                                                        
-                                                        # Extract energy information if available
-                                                        if "energy" in structure_result:
-                                                            energy = structure_result["energy"]
-                                                            context += f"Free Energy: {energy} kcal/mol\n"
-                                                        
-                                                        context += f"Sequence: {sequence}\n"
-                                                        context += f"Length: {len(sequence)} nucleotides\n"
-                                                        
-                                                # Handle protein-RNA interaction tools
-                                                elif "binding_scores" in data:
-                                                    scores = data["binding_scores"]
-                                                    context += f"Binding Scores: {scores[:10]}{'...' if len(scores) > 10 else ''}\n"
-                                                    context += f"Max Score: {data.get('max_score', 'N/A')}\n"
-                                                    context += f"Mean Score: {data.get('mean_score', 'N/A')}\n"
-                                                elif "prediction" in data:
-                                                    pred = data["prediction"]
-                                                    if isinstance(pred, dict) and "binding_affinity" in pred:
-                                                        context += f"Binding Affinity: {pred['binding_affinity']}\n"
-                                                    else:
-                                                        context += f"Prediction: {str(pred)[:200]}{'...' if len(str(pred)) > 200 else ''}\n"
-                                                else:
-                                                    context += f"Data: {str(data)[:200]}{'...' if len(str(data)) > 200 else ''}\n"
-                                        else:
-                                            context += f"\n{tool_name.upper()} RESULTS:\n"
-                                            context += f"Status: Failed - {result.get('error', 'Unknown error')}\n"
-                            
-                            # Enhance context with RAG information
-                            if rag_context and rag_context != "No relevant documents found.":
-                                context += f"\n\nRELEVANT LITERATURE CONTEXT:\n{rag_context}"
-                            
-                            system_prompt = f"""
-                            You are a bioinformatics assistant. Answer the question while relating to RNA biology when possible.
-                            Current context: {context}
-                            """
-                        else:
-                            system_prompt = """
-                            You are a specialized RNA design assistant. Politely redirect off-topic questions to RNA design topics.
-                            """
+                        # Now continue with AI response generation, with agent analysis results
+                        prompt = self._build_stream_messages(state, response_type)
                         
                         # Generate AI response
                         try:
                             self.streaming_active = True
                             self.stop_streaming = False
                             
-                            messages = state["messages"]
-                            last_message = messages[-1].content if messages else ""
                             full_response = ""
                             
-                            for chunk in self.llm.stream([
-                                SystemMessage(content=system_prompt),
-                                HumanMessage(content=last_message)
-                            ]):
+                            for chunk in self.llm.stream(prompt):
                                 # Check if streaming should be stopped
                                 if self.stop_streaming:
                                     logger.info("Streaming stopped by user request")
@@ -1031,7 +1142,7 @@ class RNADesignAssistant:
                                 try:
                                     if hasattr(chunk, 'content') and chunk.content:
                                         full_response += chunk.content
-                                        yield f"data: {json.dumps({'type': 'token', 'content': chunk.content})}\n\n"
+                                        yield _sse_frame({'type': 'token', 'content': chunk.content})
                                 except Exception as e:
                                     logger.error(f"Error processing chunk: {e}")
                                     break
@@ -1040,17 +1151,17 @@ class RNADesignAssistant:
                             if not self.stop_streaming:
                                 self._add_to_memory(user_message, full_response)
                             
-                            yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+                            yield _COMPLETE_FRAME
                             
                         except Exception as e:
                             logger.error(f"Error in combined stream: {e}")
-                            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                            yield _sse_frame({'type': 'error', 'message': str(e)})
                     
                     return {
                         "success": True,
                         "stream_generator": generate_combined_stream,
                         "response_type": response_type,
-                        "confidence": classification_result.get("confidence", 0.0),
+                        "confidence": state.get("confidence", 0.0),
                         "rag_context": state.get("rag_context", ""),
                         "citations": state.get("citations", [])
                     }
@@ -1061,133 +1172,32 @@ class RNADesignAssistant:
             has_literature = state.get("has_literature", False)
             
             # Debug logging for streaming
-            logger.info(f"Streaming RAG check: has_literature={has_literature}, response_type={response_type}")
+            logger.info("Streaming RAG check: has_literature=%s, response_type=%s", has_literature, response_type)
             
             if response_type in ["rna_design", "general_bioinfo"] and not has_literature:
                 # Use the literature reference required message for streaming
-                from .prompts import LITERATURE_REFERENCE_REQUIRED
                 messages = state["messages"]
                 last_message = messages[-1].content if messages else ""
-                response_content = LITERATURE_REFERENCE_REQUIRED.format(query=last_message)
+                response_content = _LITERATURE_REQUIRED_HEAD + last_message + _LITERATURE_REQUIRED_TAIL
                 
                 def generate_stream():
-                    # Stream the literature required message character by character
-                    for char in response_content:
-                        yield f"data: {json.dumps({'type': 'token', 'content': char})}\n\n"
-                    yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+                    # Stream the literature required message in small pieces
+                    for i in range(0, len(response_content), _STREAM_CHUNK_CHARS):
+                        chunk = response_content[i:i + _STREAM_CHUNK_CHARS]
+                        yield _sse_frame({'type': 'token', 'content': chunk})
+                    yield _COMPLETE_FRAME
                 
                 return {
                     "success": True,
                     "stream_generator": generate_stream,
                     "response_type": response_type,
-                    "confidence": classification_result.get("confidence", 0.0),
+                    "confidence": state.get("confidence", 0.0),
                     "rag_context": state.get("rag_context", ""),
                     "citations": state.get("citations", [])
                 }
             
-            # Build context based on response type
-            if response_type == "rna_design":
-                context = self._build_rna_context(state)
-                rag_context = state.get("rag_context", "")
-                
-                # Add agent analysis results to context
-                agent_analysis = state.get("agent_analysis", {})
-                if agent_analysis.get("success", False):
-                    execution_result = agent_analysis.get("execution_result", {})
-                    if execution_result.get("success", False):
-                        context += f"\n\nAGENT ANALYSIS RESULTS:\n"
-                        context += f"Tools used: {', '.join(agent_analysis.get('tools_used', []))}\n"
-                        context += f"Analysis summary: {execution_result.get('summary', 'No summary available')}\n"
-                        
-                        # Add specific tool results
-                        tool_results = execution_result.get("tool_results", {})
-                        for tool_name, result in tool_results.items():
-                            if result.get("success", False):
-                                context += f"\n{tool_name.upper()} RESULTS:\n"
-                                context += f"Status: Success\n"
-                                context += f"Category: {result.get('category', 'Unknown')}\n"
-                                
-                                # Add specific data from the tool
-                                data = result.get("data", {})
-                                if isinstance(data, dict):
-                                    if "binding_scores" in data:
-                                        scores = data["binding_scores"]
-                                        context += f"Binding Scores: {scores[:10]}{'...' if len(scores) > 10 else ''}\n"
-                                        context += f"Max Score: {data.get('max_score', 'N/A')}\n"
-                                        context += f"Mean Score: {data.get('mean_score', 'N/A')}\n"
-                                    elif "prediction" in data:
-                                        pred = data["prediction"]
-                                        if isinstance(pred, dict) and "binding_affinity" in pred:
-                                            context += f"Binding Affinity: {pred['binding_affinity']}\n"
-                                        else:
-                                            context += f"Prediction: {str(pred)[:200]}{'...' if len(str(pred)) > 200 else ''}\n"
-                                    else:
-                                        context += f"Data: {str(data)[:200]}{'...' if len(str(data)) > 200 else ''}\n"
-                            else:
-                                context += f"\n{tool_name.upper()} RESULTS:\n"
-                                context += f"Status: Failed - {result.get('error', 'Unknown error')}\n"
-                
-                # Enhance context with RAG information
-                if rag_context and rag_context != "No relevant documents found.":
-                    context += f"\n\nRELEVANT LITERATURE CONTEXT:\n{rag_context}"
-                
-                system_prompt = f"""
-                You are an expert RNA design assistant. Provide detailed, accurate advice for RNA design tasks.
-                Current context: {context}
-                """
-            elif response_type == "general_bioinfo":
-                context = self._build_general_context(state)
-                rag_context = state.get("rag_context", "")
-                
-                # Add agent analysis results to context
-                agent_analysis = state.get("agent_analysis", {})
-                if agent_analysis.get("success", False):
-                    execution_result = agent_analysis.get("execution_result", {})
-                    if execution_result.get("success", False):
-                        context += f"\n\nAGENT ANALYSIS RESULTS:\n"
-                        context += f"Tools used: {', '.join(agent_analysis.get('tools_used', []))}\n"
-                        context += f"Analysis summary: {execution_result.get('summary', 'No summary available')}\n"
-                        
-                        # Add specific tool results
-                        tool_results = execution_result.get("tool_results", {})
-                        for tool_name, result in tool_results.items():
-                            if result.get("success", False):
-                                context += f"\n{tool_name.upper()} RESULTS:\n"
-                                context += f"Status: Success\n"
-                                context += f"Category: {result.get('category', 'Unknown')}\n"
-                                
-                                # Add specific data from the tool
-                                data = result.get("data", {})
-                                if isinstance(data, dict):
-                                    if "binding_scores" in data:
-                                        scores = data["binding_scores"]
-                                        context += f"Binding Scores: {scores[:10]}{'...' if len(scores) > 10 else ''}\n"
-                                        context += f"Max Score: {data.get('max_score', 'N/A')}\n"
-                                        context += f"Mean Score: {data.get('mean_score', 'N/A')}\n"
-                                    elif "prediction" in data:
-                                        pred = data["prediction"]
-                                        if isinstance(pred, dict) and "binding_affinity" in pred:
-                                            context += f"Binding Affinity: {pred['binding_affinity']}\n"
-                                        else:
-                                            context += f"Prediction: {str(pred)[:200]}{'...' if len(str(pred)) > 200 else ''}\n"
-                                    else:
-                                        context += f"Data: {str(data)[:200]}{'...' if len(str(data)) > 200 else ''}\n"
-                            else:
-                                context += f"\n{tool_name.upper()} RESULTS:\n"
-                                context += f"Status: Failed - {result.get('error', 'Unknown error')}\n"
-                
-                # Enhance context with RAG information
-                if rag_context and rag_context != "No relevant documents found.":
-                    context += f"\n\nRELEVANT LITERATURE CONTEXT:\n{rag_context}"
-                
-                system_prompt = f"""
-                You are a bioinformatics assistant. Answer the question while relating to RNA biology when possible.
-                Current context: {context}
-                """
-            else:
-                system_prompt = """
-                You are a specialized RNA design assistant. Politely redirect off-topic questions to RNA design topics.
-                """
+            # Build the prompt based on response type
+            prompt = self._build_stream_messages(state, response_type)
             
             # Create streaming response
             def generate_stream():
@@ -1200,16 +1210,11 @@ class RNADesignAssistant:
                     if agent_analysis.get("success", False):
                         tools_used = agent_analysis.get("tools_used", [])
                         if tools_used:  # Only show status if tools were actually used
-                            yield f"data: {json.dumps({'type': 'tool_status', 'status': 'completed', 'message': f'Analysis completed using {len(tools_used)} tools: {", ".join(tools_used)}'})}\n\n"
+                            yield _sse_frame({'type': 'tool_status', 'status': 'completed', 'message': f'Analysis completed using {len(tools_used)} tools: {", ".join(tools_used)}'})
                     
-                    messages = state["messages"]
-                    last_message = messages[-1].content if messages else ""
                     full_response = ""
                     
-                    for chunk in self.llm.stream([
-                        SystemMessage(content=system_prompt),
-                        HumanMessage(content=last_message)
-                    ]):
+                    for chunk in self.llm.stream(prompt):
                         # Check if streaming should be stopped
                         if self.stop_streaming:
                             logger.info("Streaming stopped by user request")
@@ -1219,7 +1224,7 @@ class RNADesignAssistant:
                         try:
                             if hasattr(chunk, 'content') and chunk.content:
                                 full_response += chunk.content
-                                yield f"data: {json.dumps({'type': 'token', 'content': chunk.content})}\n\n"
+                                yield _sse_frame({'type': 'token', 'content': chunk.content})
                         except Exception as e:
                             logger.error(f"Error processing chunk: {e}")
                             break
@@ -1230,11 +1235,11 @@ class RNADesignAssistant:
                     
                     # Citations removed as requested
                     
-                    yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+                    yield _COMPLETE_FRAME
                     
                 except Exception as e:
                     logger.error(f"Streaming failed: {e}")
-                    yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                    yield _sse_frame({'type': 'error', 'message': str(e)})
                 finally:
                     self.streaming_active = False
             
@@ -1242,7 +1247,7 @@ class RNADesignAssistant:
                 "success": True,
                 "stream_generator": generate_stream,
                 "response_type": response_type,
-                "confidence": classification_result.get("confidence", 0.0),
+                "confidence": state.get("confidence", 0.0),
                 "rag_context": state.get("rag_context", ""),
                 "citations": state.get("citations", [])
             }
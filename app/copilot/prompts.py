@@ -41,8 +41,6 @@ MOLECULAR BIOLOGY CONTEXT:
 - RNA modifications and their effects
 - RNA-protein complexes
 
-Current context: {context}
-
 FILE HANDLING INSTRUCTIONS:
 - **ALWAYS check for uploaded files in the context section**
 - **When files are uploaded, use them as input for appropriate tools**
@@ -101,7 +99,7 @@ INSTRUCTIONS:
 - **Maximum 200 words unless question explicitly requires more detail**
 
 **CRITICAL INSTRUCTION:**
-- **If literature context is provided above, you MUST use it to answer the question**
+- **If literature context is provided in the current context, you MUST use it to answer the question**
 - **DO NOT say "no relevant literature found" if context is provided**
 - **Extract and summarize information from the provided literature**
 - **Use specific details, numbers, and technical information from the context**
@@ -120,8 +118,6 @@ Your expertise includes:
 - Statistical analysis in biology
 - Data visualization and interpretation
 
-Current context: {context}
-
 INSTRUCTIONS:
 1. **ALWAYS format your responses in Markdown for optimal readability**
 2. **BE EXTREMELY CONCISE - Answer ONLY what is asked, nothing more**
@@ -155,6 +151,10 @@ INSTRUCTIONS:
 - **Maximum 200 words unless question explicitly requires more detail**
 """
 
+# Per-request context, sent as its own message after the static system prompt so
+# the provider's prefix cache can reuse the unchanged instructions across turns
+SYSTEM_CONTEXT_TEMPLATE = """Current context: {context}"""
+
 # Query Classification Prompt
 QUERY_CLASSIFICATION_PROMPT = """
 You are a query classifier for an RNA design assistant. Classify the following user query into one of these categories:
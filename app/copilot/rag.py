@@ -11,6 +11,7 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from PIL import Image
 import pytesseract
@@ -25,6 +26,15 @@ import markdown
 
 logger = logging.getLogger(__name__)
 
+# HNSW graph parameters for new collections: denser links and a wider build/search
+# beam than Chroma's defaults, for high recall at the 15-30 results fetched per query.
+# Existing collections keep the parameters they were created with until rebuilt.
+HNSW_SETTINGS = {
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
 
 class DocumentMetadata:
     """Metadata for document management"""
@@ -84,12 +94,21 @@ class RNADesignRAGSystem:
     Uses ChromaDB for vector storage and CLIP for multimodal embeddings.
     """
 
-    def __init__(self, data_directory: str = "data", chroma_db_path: str = "data/chroma_db"):
-        """Initialize the RAG system"""
+    def __init__(self, data_directory: str = "data", chroma_db_path: str = "data/chroma_db",
+                 use_gpu: bool = False):
+        """
+        Initialize the RAG system
+        
+        Args:
+            data_directory: Directory holding the source documents
+            chroma_db_path: Directory of the persistent ChromaDB store
+            use_gpu: Run the text and CLIP encoders on CUDA when a device is available
+        """
         self.data_directory = Path(data_directory)
         self.chroma_db_path = Path(chroma_db_path)
         self.images_directory = self.data_directory / "images"
         self.is_building = False
+        self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
         
         # Create directories
         self.data_directory.mkdir(exist_ok=True)
@@ -101,10 +120,10 @@ class RNADesignRAGSystem:
             # Try to load from local models directory first
             local_sentence_model_path = Path("models/all-MiniLM-L6-v2")
             if local_sentence_model_path.exists():
-                self.text_embedder = SentenceTransformer(str(local_sentence_model_path))
+                self.text_embedder = SentenceTransformer(str(local_sentence_model_path), device=self.device)
                 logger.info("Loaded SentenceTransformer from local models directory")
             else:
-                self.text_embedder = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+                self.text_embedder = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2', device=self.device)
                 logger.info("Loaded SentenceTransformer from Hugging Face (local not found)")
         except Exception as e:
             logger.error(f"Failed to load SentenceTransformer: {e}")
@@ -114,11 +133,11 @@ class RNADesignRAGSystem:
         try:
             local_clip_model_path = Path("models/clip-vit-base-patch32")
             if local_clip_model_path.exists():
-                self.clip_model = CLIPModel.from_pretrained(str(local_clip_model_path))
+                self.clip_model = CLIPModel.from_pretrained(str(local_clip_model_path)).to(self.device)
                 self.clip_processor = CLIPProcessor.from_pretrained(str(local_clip_model_path))
                 logger.info("Loaded CLIP model from local models directory")
             else:
-                self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
+                self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32").to(self.device)
                 self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
                 logger.info("Loaded CLIP model from Hugging Face (local not found)")
         except Exception as e:
@@ -136,12 +155,12 @@ class RNADesignRAGSystem:
         # Get or create collections
         self.text_collection = self.chroma_client.get_or_create_collection(
             name="pdf_texts",
-            metadata={"description": "PDF text chunks with embeddings"}
+            metadata={"description": "PDF text chunks with embeddings", **HNSW_SETTINGS}
         )
         
         self.image_collection = self.chroma_client.get_or_create_collection(
             name="pdf_images",
-            metadata={"description": "PDF images with CLIP embeddings"}
+            metadata={"description": "PDF images with CLIP embeddings", **HNSW_SETTINGS}
         )
         
         # Metadata storage
@@ -269,7 +288,7 @@ class RNADesignRAGSystem:
                 image = image.resize((512, 512), Image.Resampling.LANCZOS)
             
             # Generate description using CLIP
-            inputs = self.clip_processor(images=image, return_tensors="pt")
+            inputs = self.clip_processor(images=image, return_tensors="pt").to(self.device)
             
             with torch.no_grad():
                 image_features = self.clip_model.get_image_features(**inputs)
@@ -303,12 +322,12 @@ class RNADesignRAGSystem:
                 if image.size[0] > 512 or image.size[1] > 512:
                     image = image.resize((512, 512), Image.Resampling.LANCZOS)
                 
-                inputs = self.clip_processor(images=image, return_tensors="pt")
+                inputs = self.clip_processor(images=image, return_tensors="pt").to(self.device)
                 
                 with torch.no_grad():
                     image_features = self.clip_model.get_image_features(**inputs)
                     image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-                    embeddings.append(image_features.numpy().flatten())
+                    embeddings.append(image_features.cpu().numpy().flatten())
             
             return np.array(embeddings)
         except Exception as e:
@@ -534,78 +553,110 @@ class RNADesignRAGSystem:
         
         return added_count
 
-    def search_documents(self, query: str, k: int = 30, include_images: bool = True) -> List[Dict[str, Any]]:
-        """Search documents using multimodal retrieval"""
+    def _embed_query_for_images(self, query: str) -> np.ndarray:
+        """Embed a query with CLIP's text encoder so it is comparable to the image embeddings"""
+        inputs = self.clip_processor(text=[query], return_tensors="pt", padding=True, truncation=True).to(self.device)
+        with torch.no_grad():
+            text_features = self.clip_model.get_text_features(**inputs)
+            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+        return text_features.cpu().numpy().flatten()
+
+    def _search_images(self, query: str, k: int) -> Dict[str, Any]:
+        """Query the image collection, returning empty results on failure"""
         try:
-            results = []
-            
-            # Text search
-            query_embedding = self.text_embedder.encode([query])[0]
-            text_results = self.text_collection.query(
+            query_embedding = self._embed_query_for_images(query)
+            return self.image_collection.query(
                 query_embeddings=[query_embedding.tolist()],
                 n_results=k
             )
-            
-            for i, (doc, metadata, distance) in enumerate(zip(
-                text_results['documents'][0],
-                text_results['metadatas'][0],
-                text_results['distances'][0]
-            )):
-                # Calculate similarity score (higher is better)
-                similarity_score = 1 - distance
-                results.append({
-                    "type": "text",
-                    "content": doc,
-                    "metadata": metadata,
-                    "score": similarity_score,
-                    "rank": i + 1
-                })
-            
-            # Image search if requested and CLIP model is available
+        except Exception as e:
+            logger.warning(f"Image search failed: {e}")
+            return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+
+    @staticmethod
+    def _ranked_hits(result_type: str, query_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Turn one collection's query results into hits ranked by that collection's own similarity"""
+        hits = []
+        for doc, metadata, distance in zip(
+            query_results['documents'][0],
+            query_results['metadatas'][0],
+            query_results['distances'][0]
+        ):
+            # Calculate similarity score (higher is better)
+            hits.append({
+                "type": result_type,
+                "content": doc,
+                "metadata": metadata,
+                "score": 1 - distance
+            })
+        hits.sort(key=lambda x: x['score'], reverse=True)
+        for i, hit in enumerate(hits):
+            hit["rank"] = i + 1
+        return hits
+
+    def search_documents(self, query: str, k: int = 30, include_images: bool = True,
+                         query_embedding: Optional[np.ndarray] = None,
+                         image_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Search documents using multimodal retrieval
+        
+        Text and image hits are scored by different encoders (MiniLM and CLIP), so
+        their scores are not comparable. Each modality is ranked on its own and the
+        two lists are interleaved by rank, text first on ties.
+        
+        Args:
+            query: Search query
+            k: Maximum number of results, or of text results when image_k is given
+            include_images: Also search the image collection
+            query_embedding: Precomputed text embedding of query, if the caller has one
+            image_k: Maximum number of image results, capped separately from text
+        """
+        try:
+            # Image search runs alongside the text search; both encoders and
+            # collection queries release the GIL for most of their work
+            image_search = None
+            executor = None
             if include_images and self.clip_model is not None:
-                try:
-                    # Use text embedding for image search to avoid dimension mismatch
-                    image_results = self.image_collection.query(
-                        query_embeddings=[query_embedding.tolist()],
-                        n_results=k
-                    )
-                except Exception as e:
-                    logger.warning(f"Image search failed due to dimension mismatch: {e}")
-                    # Skip image search if there's a dimension mismatch
-                    image_results = {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
-            else:
-                # Skip image search if CLIP model is not available
-                image_results = {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-images")
+                image_search = executor.submit(self._search_images, query, k if image_k is None else image_k)
+            
+            try:
+                # Text search
+                if query_embedding is None:
+                    query_embedding = self.text_embedder.encode([query])[0]
+                text_results = self.text_collection.query(
+                    query_embeddings=[query_embedding.tolist()],
+                    n_results=k
+                )
                 
-                for i, (doc, metadata, distance) in enumerate(zip(
-                    image_results['documents'][0],
-                    image_results['metadatas'][0],
-                    image_results['distances'][0]
-                )):
-                    similarity_score = 1 - distance
-                    results.append({
-                        "type": "image",
-                        "content": doc,
-                        "metadata": metadata,
-                        "score": similarity_score,
-                        "rank": i + 1
-                    })
+                if image_search is not None:
+                    image_results = image_search.result()
+                else:
+                    image_results = {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+            finally:
+                if executor is not None:
+                    executor.shutdown(wait=False)
             
-            # Sort by score
-            results.sort(key=lambda x: x['score'], reverse=True)
+            results = self._ranked_hits("text", text_results) + self._ranked_hits("image", image_results)
+            results.sort(key=lambda x: (x['rank'], x['type'] != "text"))
             
             # Search completed
             
+            # Each query already returned at most its own cap
+            if image_k is not None:
+                return results
             return results[:k]
             
         except Exception as e:
             logger.error(f"Search failed: {e}")
             return []
 
-    def get_rag_context(self, query: str, max_chunks: int = 15) -> Tuple[str, List[Dict[str, Any]]]:
+    def get_rag_context(self, query: str, max_chunks: int = 15,
+                        query_embedding: Optional[np.ndarray] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Get RAG context for a query with citations (text-only for compatibility)"""
         try:
-            results = self.search_documents(query, k=max_chunks, include_images=False)
+            results = self.search_documents(query, k=max_chunks, include_images=False,
+                                            query_embedding=query_embedding)
             
             if not results:
                 return "No relevant documents found in the knowledge base.", []
@@ -659,10 +710,12 @@ IMPORTANT INSTRUCTIONS:
             logger.error(f"Failed to get RAG context: {e}")
             return "No relevant context found.", []
     def get_multimodal_context(self, query: str, max_text_chunks: int = 5, 
-                              max_images: int = 3) -> Tuple[str, List[Dict[str, Any]]]:
+                              max_images: int = 3,
+                              query_embedding: Optional[np.ndarray] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Get multimodal context including both text and images"""
         try:
-            results = self.search_documents(query, k=max_text_chunks + max_images, include_images=True)
+            results = self.search_documents(query, k=max_text_chunks, include_images=True,
+                                            query_embedding=query_embedding, image_k=max_images)
             
             text_contexts = []
             image_contexts = []
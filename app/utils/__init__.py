@@ -6,6 +6,7 @@ and other common functionality.
 """
 
 from .input import (
+    normalize_rna_sequence,
     validate_rna_sequence,
     validate_rna_sequences,
     parse_text_input,
@@ -22,6 +23,7 @@ from .input import (
 )
 
 __all__ = [
+    'normalize_rna_sequence',
     'validate_rna_sequence',
     'validate_rna_sequences',
     'parse_text_input',
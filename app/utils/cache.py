@@ -0,0 +1,89 @@
+"""
+Caching utilities for RNA-Factory API routes
+Provides time-based memoization and conditional responses for cheap-to-serve, expensive-to-compute results
+"""
+
+import json
+import time
+import hashlib
+import threading
+from functools import wraps
+from typing import Any, Tuple
+
+from flask import request, jsonify, Response
+
+
+def ttl_cache(ttl: float = 30.0):
+    """
+    Cache the result of a zero-argument function for a fixed time window
+
+    The decorated function gains a ``cache_clear()`` method that forces the
+    next call to recompute the value. Exceptions are not cached.
+
+    Args:
+        ttl: Number of seconds a computed value stays valid
+
+    Returns:
+        Decorator producing the cached function
+    """
+    def decorator(func):
+        lock = threading.Lock()
+        state = {"value": None, "expires": 0.0}
+
+        @wraps(func)
+        def wrapper():
+            if time.monotonic() < state["expires"]:
+                return state["value"]
+
+            with lock:
+                # Another thread may have refreshed the value while we waited
+                if time.monotonic() < state["expires"]:
+                    return state["value"]
+
+                value = func()
+                state["value"] = value
+                state["expires"] = time.monotonic() + ttl
+                return value
+
+        def cache_clear():
+            with lock:
+                state["value"] = None
+                state["expires"] = 0.0
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+def with_etag(value: Any) -> Tuple[Any, str]:
+    """
+    Pair a JSON-serializable value with a strong ETag of its contents
+
+    Args:
+        value: Value that will be served as JSON
+
+    Returns:
+        Tuple of (value, etag)
+    """
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode()
+    return value, hashlib.sha1(encoded).hexdigest()
+
+
+def conditional_json(payload: Any, etag: str) -> Response:
+    """
+    Serve payload as JSON tagged with etag, or an empty 304 if the client already has it
+
+    Args:
+        payload: Response body
+        etag: ETag computed from the data payload is built from
+
+    Returns:
+        Flask response
+    """
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    return response
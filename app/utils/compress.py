@@ -0,0 +1,51 @@
+"""
+Response compression for RNA-Factory
+Gzip-encodes large text/JSON responses for clients that accept it
+"""
+
+import gzip
+
+from flask import request
+
+
+def init_compression(app):
+    """
+    Register an after_request hook that gzip-compresses eligible responses
+
+    A response is compressed only when the client sends ``Accept-Encoding: gzip``,
+    its mimetype is listed in ``COMPRESS_MIMETYPES``, its body is at least
+    ``COMPRESS_MIN_SIZE`` bytes, and it is neither streamed nor a file response.
+    Responses that already carry a Content-Encoding are left untouched.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+
+    mimetypes = frozenset(app.config.get("COMPRESS_MIMETYPES", ()))
+    min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+    level = app.config.get("COMPRESS_LEVEL", 4)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in mimetypes
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if "gzip" not in request.headers.get("Accept-Encoding", "").lower():
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(gzip.compress(data, compresslevel=level))
+        response.headers["Content-Encoding"] = "gzip"
+        return response
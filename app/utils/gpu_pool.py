@@ -0,0 +1,68 @@
+"""
+Bounded execution pool for model inference jobs
+Caps concurrent GPU work per process and rejects requests once the queue is full
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Jobs running at once, and jobs allowed to wait behind them. Raise GPU_CONCURRENCY
+# only for wrappers whose scratch files are unique per call (RNAMPNN, RNAmigos2).
+GPU_CONCURRENCY = int(os.environ.get('GPU_CONCURRENCY', 1))
+GPU_QUEUE_LIMIT = int(os.environ.get('GPU_QUEUE_LIMIT', 32))
+
+# Seconds clients are asked to wait before retrying a rejected request
+RETRY_AFTER = 5
+
+_executor = ThreadPoolExecutor(max_workers=GPU_CONCURRENCY, thread_name_prefix='gpu-job')
+_inflight = 0
+_inflight_lock = threading.Lock()
+
+
+class GPUQueueFullError(RuntimeError):
+    """Raised when the inference queue is at capacity"""
+    pass
+
+
+def _release(_future) -> None:
+    """Free one admission slot once a job finishes"""
+    global _inflight
+    with _inflight_lock:
+        _inflight -= 1
+
+
+def run_gpu(fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Run an inference call on the bounded pool and wait for its result
+
+    A job keeps its admission slot until it actually finishes, even if the
+    caller stops waiting after a timeout.
+
+    Args:
+        fn: Inference callable, e.g. a wrapper's predict method
+        *args: Positional arguments for fn
+        timeout: Seconds to wait for the result (None waits indefinitely)
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        Whatever fn returns
+
+    Raises:
+        GPUQueueFullError: If GPU_CONCURRENCY + GPU_QUEUE_LIMIT jobs are already admitted
+        TimeoutError: If the result is not ready within timeout
+    """
+    global _inflight
+    with _inflight_lock:
+        if _inflight >= GPU_CONCURRENCY + GPU_QUEUE_LIMIT:
+            raise GPUQueueFullError("Inference queue is full, please retry later")
+        _inflight += 1
+
+    try:
+        future = _executor.submit(fn, *args, **kwargs)
+    except Exception:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+    return future.result(timeout=timeout)
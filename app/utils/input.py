@@ -27,6 +27,12 @@ FASTA_HEADER_PATTERN = re.compile(r'^>.*$')
 # RNA sequence pattern (only A, U, C, G characters, no whitespace)
 RNA_SEQUENCE_PATTERN = re.compile(r'^[AUCG]+$')
 
+# Valid RNA nucleotide bytes in both cases, deleted via bytes.translate during validation
+RNA_NUCLEOTIDE_BYTES = b'ACGUacgu'
+
+# Uppercasing table for sequences that passed validation
+RNA_UPPER_TABLE = str.maketrans('acgu', 'ACGU')
+
 # Protein sequence pattern (only standard amino acids, no whitespace)
 PROTEIN_SEQUENCE_PATTERN = re.compile(r'^[ARNDCQEGHILKMFPSTWYV]+$')
 
@@ -54,6 +60,26 @@ class ProteinSequenceError(InputValidationError):
     pass
 
 
+def normalize_rna_sequence(sequence: str) -> Optional[str]:
+    """
+    Uppercase an RNA sequence if it contains only valid RNA nucleotides.
+    
+    Args:
+        sequence: RNA sequence string to normalize
+        
+    Returns:
+        Optional[str]: The uppercased sequence, or None if the sequence is invalid
+    """
+    if not sequence or not isinstance(sequence, str) or not sequence.isascii():
+        return None
+    
+    # Deleting every valid nucleotide (either case) in C leaves nothing for a valid
+    # sequence; any remaining byte is whitespace or another invalid character
+    if sequence.encode('ascii').translate(None, RNA_NUCLEOTIDE_BYTES):
+        return None
+    return sequence.translate(RNA_UPPER_TABLE)
+
+
 def validate_rna_sequence(sequence: str) -> bool:
     """
     Validate if a string contains only valid RNA nucleotides.
@@ -65,19 +91,7 @@ def validate_rna_sequence(sequence: str) -> bool:
     Returns:
         bool: True if sequence is valid, False otherwise
     """
-    if not sequence or not isinstance(sequence, str):
-        return False
-    
-    # Convert to uppercase for validation
-    sequence = sequence.upper()
-    
-    # Check if sequence contains only valid nucleotides (no whitespace allowed)
-    # First check if it matches the pattern, then verify no whitespace
-    if not RNA_SEQUENCE_PATTERN.match(sequence):
-        return False
-    
-    # Additional check: ensure no whitespace characters
-    return not any(c.isspace() for c in sequence)
+    return normalize_rna_sequence(sequence) is not None
 
 
 def validate_rna_sequences(sequences: List[str]) -> Tuple[List[str], List[str]]:
@@ -721,7 +735,8 @@ def validate_rnamigos2_input(data: Dict) -> Dict[str, Union[bool, str]]:
     
     Args:
         data: Dictionary containing input data with keys:
-            - cif_content: mmCIF structure content (string)
+            - cif_content: mmCIF structure content (string), or
+            - cif_token: Token returned by the structure upload endpoint (string)
             - residue_list: List of binding site residue identifiers (list)
             - smiles_list: List of SMILES strings (list)
     
@@ -730,8 +745,8 @@ def validate_rnamigos2_input(data: Dict) -> Dict[str, Union[bool, str]]:
     """
     try:
         # Check required fields
-        if 'cif_content' not in data:
-            return {"valid": False, "error": "Missing cif_content field"}
+        if 'cif_content' not in data and 'cif_token' not in data:
+            return {"valid": False, "error": "Missing cif_content or cif_token field"}
         
         if 'residue_list' not in data:
             return {"valid": False, "error": "Missing residue_list field"}
@@ -739,14 +754,18 @@ def validate_rnamigos2_input(data: Dict) -> Dict[str, Union[bool, str]]:
         if 'smiles_list' not in data:
             return {"valid": False, "error": "Missing smiles_list field"}
         
-        # Validate CIF content
-        cif_content = data['cif_content']
-        if not isinstance(cif_content, str) or not cif_content.strip():
-            return {"valid": False, "error": "CIF content must be a non-empty string"}
-        
-        # Check for basic mmCIF structure
-        if 'data_' not in cif_content.lower():
-            return {"valid": False, "error": "Invalid mmCIF format: missing data_ block"}
+        if 'cif_content' in data:
+            # Validate CIF content
+            cif_content = data['cif_content']
+            if not isinstance(cif_content, str) or not cif_content.strip():
+                return {"valid": False, "error": "CIF content must be a non-empty string"}
+            
+            # Check for basic mmCIF structure
+            if 'data_' not in cif_content.lower():
+                return {"valid": False, "error": "Invalid mmCIF format: missing data_ block"}
+        elif not isinstance(data['cif_token'], str) or not data['cif_token']:
+            # Uploaded files are checked for a data_ block at upload time
+            return {"valid": False, "error": "cif_token must be a non-empty string"}
         
         # Validate residue list
         residue_list = data['residue_list']
@@ -788,6 +807,24 @@ def validate_rnamigos2_input(data: Dict) -> Dict[str, Union[bool, str]]:
         return {"valid": False, "error": f"Validation error: {str(e)}"}
 
 
+def validate_numeric_params(params: Dict, schema: Tuple[Tuple, ...]) -> Optional[str]:
+    """
+    Validate numeric request parameters against a declarative schema.
+    
+    Args:
+        params: Dictionary mapping parameter names to values
+        schema: Tuple of (name, allowed_types, min_value, max_value, error_message) entries
+        
+    Returns:
+        Error message of the first invalid parameter, or None if all are valid
+    """
+    for name, types, min_value, max_value, error_message in schema:
+        value = params.get(name)
+        if not isinstance(value, types) or value < min_value or value > max_value:
+            return error_message
+    return None
+
+
 def validate_smiles(smiles: str) -> bool:
     """
     Validate if a string is a valid SMILES notation.
@@ -0,0 +1,48 @@
+"""
+JSON provider for RNA-Factory
+Uses orjson for request/response JSON when it is installed
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson
+
+    Output is always compact. numpy arrays and scalars are serialized directly,
+    and anything orjson cannot handle falls back to Flask's default conversion.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def init_json_provider(app):
+    """
+    Install the orjson provider if orjson is available
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        True if the orjson provider was installed
+    """
+    if orjson is None:
+        return False
+
+    sort_keys = app.json.sort_keys
+    app.json = ORJSONProvider(app)
+    app.json.sort_keys = sort_keys
+    return True
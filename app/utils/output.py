@@ -5,7 +5,7 @@ Handles various output formats including CT file generation
 
 import os
 import tempfile
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Iterator
 import logging
 
 logger = logging.getLogger(__name__)
@@ -174,6 +174,83 @@ def generate_multiple_ct_files(results: List[Dict[str, Any]], base_filename: str
     return ct_files
 
 
+def generate_ct_entries(results: List[Dict[str, Any]], base_filename: str = "rnaformer_results") -> List[Tuple[str, str]]:
+    """
+    Generate in-memory CT entries from prediction results
+    
+    Uses the same naming and skipping rules as generate_multiple_ct_files,
+    without writing anything to disk.
+    
+    Args:
+        results: List of result dictionaries containing sequence and dot_bracket
+        base_filename: Base filename for the CT files
+        
+    Returns:
+        List of (filename, CT content) tuples
+    """
+    entries = []
+    
+    for i, result in enumerate(results):
+        sequence = result.get('sequence', '')
+        dot_bracket = result.get('dot_bracket', '')
+        
+        if not sequence or not dot_bracket:
+            logger.warning(f"Skipping result {i+1}: missing sequence or dot_bracket data")
+            continue
+        
+        try:
+            ct_content = generate_ct_content(sequence, dot_bracket, f"sequence {i+1}")
+            entries.append((f"{base_filename}_sequence_{i+1}_{len(sequence)}bp.ct", ct_content))
+        except Exception as e:
+            logger.error(f"Error generating CT content for sequence {i+1}: {str(e)}")
+            continue
+    
+    return entries
+
+
+class _ZipChunkBuffer:
+    """Write-only, unseekable sink that hands ZIP bytes back to a generator"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_ct_zip(entries: List[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive of CT entries chunk by chunk
+    
+    Entries are stored uncompressed; the archive is never written to disk and
+    each entry is yielded as soon as it has been added.
+    
+    Args:
+        entries: List of (filename, CT content) tuples
+        
+    Yields:
+        Consecutive byte chunks of the ZIP archive
+    """
+    import zipfile
+    
+    buffer = _ZipChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+        for arcname, content in entries:
+            zipf.writestr(arcname, content)
+            yield buffer.drain()
+    # Central directory is written on close
+    yield buffer.drain()
+
+
 def create_ct_zip_file(ct_files: List[str], zip_filename: str = "rnaformer_structures.zip") -> str:
     """
     Create a ZIP file containing multiple CT files
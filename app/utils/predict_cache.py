@@ -0,0 +1,140 @@
+"""
+Prediction result cache for RNA-Factory
+Skips model runs for inputs that were already predicted in this process
+"""
+
+import os
+import json
+import mmap
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+
+def payload_digest(payload: Any) -> str:
+    """
+    Hash a JSON-serializable payload independent of dict key order
+
+    Args:
+        payload: Normalized prediction input
+
+    Returns:
+        SHA-256 hex digest
+    """
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def data_digest(data) -> str:
+    """
+    Hash an in-memory buffer (bytes or a C-contiguous array) without copying it
+
+    Uses BLAKE3 when installed, otherwise SHA-256.
+
+    Args:
+        data: Object supporting the buffer protocol
+
+    Returns:
+        Hex digest
+    """
+    if blake3 is not None:
+        return blake3.blake3(data, max_threads=blake3.blake3.AUTO).hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """
+    Hash a file's contents without loading it into memory
+
+    With BLAKE3 installed the file is mmap'd and hashed on all cores;
+    otherwise it is streamed through SHA-256.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex digest
+    """
+    with open(path, 'rb') as f:
+        if blake3 is None:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return blake3.blake3().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return data_digest(mm)
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of prediction results keyed by (model, payload digest)
+
+    Cached results are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initialize the cache
+
+        Args:
+            maxsize: Maximum number of cached results; 0 disables caching
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[Hashable, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model: Hashable, payload: Any) -> Optional[Any]:
+        """Get the cached result for payload, or None on a miss"""
+        key = (model, payload_digest(payload))
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def set(self, model: Hashable, payload: Any, result: Any) -> None:
+        """Store a result, evicting the least recently used entries beyond maxsize"""
+        if self.maxsize <= 0:
+            return
+        key = (model, payload_digest(payload))
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+
+
+prediction_cache = PredictionCache(int(os.environ.get('PREDICT_CACHE_SIZE', 1024)))
+
+
+def cached_predict(model: Hashable, payload: Any, fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Return the cached result for payload, or run fn and cache it if successful
+
+    Args:
+        model: Model name, namespacing the cache key
+        payload: Normalized, JSON-serializable prediction input
+        fn: Zero-argument callable returning a result dict with a 'success' key
+
+    Returns:
+        Prediction result dictionary
+    """
+    result = prediction_cache.get(model, payload)
+    if result is not None:
+        return result
+
+    result = fn()
+    if result.get('success'):
+        prediction_cache.set(model, payload, result)
+    return result
@@ -0,0 +1,79 @@
+"""
+Per-process scratch space for RNA-Factory
+Hands out unique file paths in one directory per worker instead of a mkdtemp per request
+"""
+
+import os
+import atexit
+import shutil
+import tempfile
+import itertools
+import threading
+
+_scratch_dir = None
+_scratch_pid = None
+_scratch_lock = threading.Lock()
+_counter = itertools.count()
+
+
+def _scratch_base() -> str:
+    """Get the directory that holds per-process scratch directories"""
+    base = os.environ.get('RNA_SCRATCH')
+    if base:
+        return base
+    # Prefer tmpfs so scratch files never touch disk
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def scratch_dir() -> str:
+    """
+    Get this process's scratch directory, creating it on first use
+
+    The directory is keyed by PID so forked workers never share one, and it is
+    removed when the process exits.
+    """
+    global _scratch_dir, _scratch_pid
+    pid = os.getpid()
+    if _scratch_pid == pid:
+        return _scratch_dir
+
+    with _scratch_lock:
+        if _scratch_pid != pid:
+            path = os.path.join(_scratch_base(), f"rna-factory-{pid}")
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            atexit.register(shutil.rmtree, path, ignore_errors=True)
+            _scratch_dir, _scratch_pid = path, pid
+    return _scratch_dir
+
+
+def shared_dir(name: str) -> str:
+    """
+    Get a scratch directory shared by all worker processes, creating it if needed
+
+    Unlike scratch_dir() it is not removed at exit, since other workers may
+    still be using it; callers prune their own stale files.
+
+    Args:
+        name: Directory name, e.g. 'rnamigos2-uploads'
+
+    Returns:
+        Absolute directory path
+    """
+    path = os.path.join(_scratch_base(), f"rna-factory-{name}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def new_path(suffix: str = "") -> str:
+    """
+    Get a fresh, unused file path in the scratch directory
+
+    Args:
+        suffix: File suffix, e.g. '.cif'
+
+    Returns:
+        Absolute path; the caller creates and removes the file
+    """
+    return os.path.join(scratch_dir(), f"{next(_counter):08x}{suffix}")
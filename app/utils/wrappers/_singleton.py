@@ -0,0 +1,42 @@
+"""
+Process-wide wrapper singletons
+Guarantees one wrapper instance per key even when threads race on a cold cache
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable
+
+_INSTANCES: Dict[Hashable, Any] = {}
+_LOCKS = defaultdict(threading.Lock)
+# Guards creation of per-key locks in _LOCKS
+_LOCKS_GUARD = threading.Lock()
+
+
+def get_or_create(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """
+    Get the instance stored under key, creating it with factory on first use
+
+    Uses double-checked locking: the common path is a lock-free dict lookup,
+    and only the first callers for a key serialize on that key's lock.
+    Exceptions raised by factory propagate and nothing is cached.
+
+    Args:
+        key: Instance key, e.g. the model name
+        factory: Zero-argument callable building the instance
+
+    Returns:
+        The shared instance for key
+    """
+    instance = _INSTANCES.get(key)
+    if instance is not None:
+        return instance
+
+    with _LOCKS_GUARD:
+        lock = _LOCKS[key]
+
+    with lock:
+        instance = _INSTANCES.get(key)
+        if instance is None:
+            _INSTANCES[key] = instance = factory()
+        return instance
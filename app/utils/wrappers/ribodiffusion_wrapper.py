@@ -33,7 +33,6 @@ class RiboDiffusionWrapper:
         """
         self.model_path = model_path or get_model_path("RiboDiffusion")
         self.environment_path = environment_path or get_venv_path(".venv_ribodiffusion")
-        self.temp_dir = None
         
     def setup_environment(self) -> bool:
         """Setup RiboDiffusion environment using uv"""
@@ -66,7 +65,8 @@ class RiboDiffusionWrapper:
                      num_samples: int = 1,
                      sampling_steps: int = 50,
                      cond_scale: float = -1.0,
-                     dynamic_threshold: bool = False) -> Dict[str, Any]:
+                     dynamic_threshold: bool = False,
+                     work_dir: Optional[str] = None) -> Dict[str, Any]:
         """
         Perform RNA inverse folding using RiboDiffusion
         
@@ -76,10 +76,12 @@ class RiboDiffusionWrapper:
             sampling_steps: Number of sampling steps
             cond_scale: Conditional scaling weight
             dynamic_threshold: Whether to use dynamic thresholding
+            work_dir: Per-request directory under which outputs are written
             
         Returns:
             Dictionary containing generated RNA sequences and results
         """
+        temp_dir = None
         try:
             # Setup environment
             if not self.setup_environment():
@@ -88,8 +90,8 @@ class RiboDiffusionWrapper:
                     "error": "Failed to setup RiboDiffusion environment"
                 }
             
-            # Create temporary directory for output
-            self.temp_dir = tempfile.mkdtemp(prefix="ribodiffusion_")
+            # Create temporary directory for output (local, so concurrent calls never share it)
+            temp_dir = tempfile.mkdtemp(prefix="ribodiffusion_", dir=work_dir)
             
             # Prepare command components
             python_path = os.path.join(self.environment_path, "bin", "python")
@@ -103,7 +105,7 @@ class RiboDiffusionWrapper:
                 logger.info(f"Running RiboDiffusion inference {i+1}/{num_samples}")
                 
                 # Create individual output directory for each sample
-                output_dir = os.path.join(self.temp_dir, f"exp_inf_{i}")
+                output_dir = os.path.join(temp_dir, f"exp_inf_{i}")
                 
                 cmd = [
                     python_path,
@@ -176,7 +178,7 @@ class RiboDiffusionWrapper:
                 "sampling_steps": sampling_steps,
                 "cond_scale": cond_scale,
                 "dynamic_threshold": dynamic_threshold,
-                "output_dir": self.temp_dir
+                "output_dir": temp_dir
             }
             
         except subprocess.TimeoutExpired:
@@ -193,9 +195,9 @@ class RiboDiffusionWrapper:
             }
         finally:
             # Cleanup temporary directory
-            if self.temp_dir and os.path.exists(self.temp_dir):
+            if temp_dir and os.path.exists(temp_dir):
                 try:
-                    shutil.rmtree(self.temp_dir)
+                    shutil.rmtree(temp_dir)
                 except Exception as e:
                     logger.warning(f"Failed to cleanup temporary directory: {e}")
     
@@ -211,11 +213,3 @@ class RiboDiffusionWrapper:
             "environment_path": self.environment_path,
             "checkpoint_exists": os.path.exists(os.path.join(self.model_path, "ckpts", "exp_inf.pth")) if self.model_path else False
         }
-    
-    def cleanup(self):
-        """Cleanup resources"""
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            try:
-                shutil.rmtree(self.temp_dir)
-            except Exception as e:
-                logger.warning(f"Failed to cleanup temporary directory: {e}")
@@ -6,7 +6,6 @@ RNA secondary structure prediction using deep learning
 import os
 import sys
 import subprocess
-import tempfile
 import logging
 from typing import Dict, Any, List, Optional
 import shutil
@@ -49,102 +48,17 @@ class RNAformerWrapper:
             Dictionary containing prediction results
         """
         try:
-            results = []
+            # Set up environment once for all sequences
+            env = os.environ.copy()
+            env["PYTHONPATH"] = self.model_path
+            
+            # Use the virtual environment Python
+            python_path = os.path.join(self.environment_path, "bin", "python")
             
+            results = []
             for i, sequence in enumerate(sequences):
                 logger.info(f"Processing sequence {i+1}/{len(sequences)}: {sequence[:50]}...")
-                
-                # Create temporary input file
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_file:
-                    temp_file.write(sequence)
-                    temp_input = temp_file.name
-                
-                # Create temporary output file
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_file:
-                    temp_output = temp_file.name
-                
-                try:
-                    # Run RNAformer inference
-                    cmd = [
-                        "python", "infer_RNAformer.py",
-                        "-c", "6",  # Number of cycles
-                        "-s", sequence,
-                        "--state_dict", self.model_state_dict,
-                        "--config", self.model_config
-                    ]
-                    
-                    # Set up environment
-                    env = os.environ.copy()
-                    env["PYTHONPATH"] = self.model_path
-                    
-                    # Use the virtual environment Python
-                    python_path = os.path.join(self.environment_path, "bin", "python")
-                    cmd[0] = python_path
-                    
-                    # Run command in model directory
-                    result = subprocess.run(
-                        cmd,
-                        cwd=self.model_path,
-                        capture_output=True,
-                        text=True,
-                        env=env,
-                        timeout=300  # 5 minute timeout
-                    )
-                    
-                    if result.returncode != 0:
-                        logger.error(f"RNAformer inference failed: {result.stderr}")
-                        raise RuntimeError(f"RNAformer inference failed: {result.stderr}")
-                    
-                    # Parse output to extract pairing information
-                    output_lines = result.stdout.strip().split('\n')
-                    pairing_indices_1 = []
-                    pairing_indices_2 = []
-                    
-                    for line in output_lines:
-                        if "Pairing index 1:" in line:
-                            # Extract indices from line like "Pairing index 1: [0, 1, 2, ...]"
-                            indices_str = line.split("Pairing index 1:")[1].strip()
-                            if indices_str != "[]":
-                                try:
-                                    indices = eval(indices_str)
-                                    pairing_indices_1 = indices
-                                except:
-                                    pairing_indices_1 = []
-                        elif "Pairing index 2:" in line:
-                            # Extract indices from line like "Pairing index 2: [10, 11, 12, ...]"
-                            indices_str = line.split("Pairing index 2:")[1].strip()
-                            if indices_str != "[]":
-                                try:
-                                    indices = eval(indices_str)
-                                    pairing_indices_2 = indices
-                                except:
-                                    pairing_indices_2 = []
-                    
-                    # Combine pairing indices
-                    pairing_indices = []
-                    for i in range(min(len(pairing_indices_1), len(pairing_indices_2))):
-                        pairing_indices.extend([pairing_indices_1[i], pairing_indices_2[i]])
-                    
-                    # Convert pairing indices to dot-bracket notation
-                    dot_bracket = self._indices_to_dot_bracket(sequence, pairing_indices)
-                    
-                    # Generate CT format
-                    ct_content = self._generate_ct_format(sequence, pairing_indices)
-                    
-                    results.append({
-                        "sequence": sequence,
-                        "length": len(sequence),
-                        "dot_bracket": dot_bracket,
-                        "ct_content": ct_content,
-                        "pairing_indices": pairing_indices
-                    })
-                    
-                finally:
-                    # Clean up temporary files
-                    if os.path.exists(temp_input):
-                        os.unlink(temp_input)
-                    if os.path.exists(temp_output):
-                        os.unlink(temp_output)
+                results.append(self._predict_sequence(sequence, python_path, env))
             
             return {
                 "success": True,
@@ -161,6 +75,75 @@ class RNAformerWrapper:
                 "model": "RNAformer"
             }
     
+    def _predict_sequence(self, sequence: str, python_path: str, env: Dict[str, str]) -> Dict[str, Any]:
+        """Run RNAformer inference for a single sequence"""
+        # Run RNAformer inference
+        cmd = [
+            python_path, "infer_RNAformer.py",
+            "-c", "6",  # Number of cycles
+            "-s", sequence,
+            "--state_dict", self.model_state_dict,
+            "--config", self.model_config
+        ]
+        
+        # Run command in model directory
+        result = subprocess.run(
+            cmd,
+            cwd=self.model_path,
+            capture_output=True,
+            text=True,
+            env=env,
+            timeout=300  # 5 minute timeout
+        )
+        
+        if result.returncode != 0:
+            logger.error(f"RNAformer inference failed: {result.stderr}")
+            raise RuntimeError(f"RNAformer inference failed: {result.stderr}")
+        
+        # Parse output to extract pairing information
+        output_lines = result.stdout.strip().split('\n')
+        pairing_indices_1 = []
+        pairing_indices_2 = []
+        
+        for line in output_lines:
+            if "Pairing index 1:" in line:
+                # Extract indices from line like "Pairing index 1: [0, 1, 2, ...]"
+                indices_str = line.split("Pairing index 1:")[1].strip()
+                if indices_str != "[]":
+                    try:
+                        indices = eval(indices_str)
+                        pairing_indices_1 = indices
+                    except:
+                        pairing_indices_1 = []
+            elif "Pairing index 2:" in line:
+                # Extract indices from line like "Pairing index 2: [10, 11, 12, ...]"
+                indices_str = line.split("Pairing index 2:")[1].strip()
+                if indices_str != "[]":
+                    try:
+                        indices = eval(indices_str)
+                        pairing_indices_2 = indices
+                    except:
+                        pairing_indices_2 = []
+        
+        # Combine pairing indices
+        pairing_indices = []
+        for i in range(min(len(pairing_indices_1), len(pairing_indices_2))):
+            pairing_indices.extend([pairing_indices_1[i], pairing_indices_2[i]])
+        
+        # Convert pairing indices to dot-bracket notation
+        dot_bracket = self._indices_to_dot_bracket(sequence, pairing_indices)
+        
+        # Generate CT format
+        ct_content = self._generate_ct_format(sequence, pairing_indices)
+        
+        return {
+            "sequence": sequence,
+            "length": len(sequence),
+            "dot_bracket": dot_bracket,
+            "ct_content": ct_content,
+            "pairing_indices": pairing_indices
+        }
+    
     def _indices_to_dot_bracket(self, sequence: str, pairing_indices: List[int]) -> str:
         """Convert pairing indices to dot-bracket notation"""
         length = len(sequence)
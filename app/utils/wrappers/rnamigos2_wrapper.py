@@ -68,22 +68,24 @@ class RNAmigos2Wrapper:
         Returns:
             Dictionary containing prediction results
         """
+        # Scratch space is per call so concurrent predictions never share it
+        temp_dir = None
         try:
             if not self.setup_environment():
                 return {"success": False, "error": "Environment setup failed"}
             
             # Create temporary directory for processing
-            self.temp_dir = tempfile.mkdtemp()
+            temp_dir = tempfile.mkdtemp()
             
             # Create temporary SMILES file
-            smiles_file = os.path.join(self.temp_dir, "ligands.txt")
+            smiles_file = os.path.join(temp_dir, "ligands.txt")
             with open(smiles_file, 'w') as f:
                 for smiles in smiles_list:
                     f.write(f"{smiles}\n")
             
             # Create temporary output file
             if output_path is None:
-                output_path = os.path.join(self.temp_dir, "results.csv")
+                output_path = os.path.join(temp_dir, "results.csv")
             
             # Prepare residue list string
             residue_str = ",".join(residue_list)
@@ -97,10 +99,6 @@ class RNAmigos2Wrapper:
                 f"out_path={output_path}"
             ]
             
-            # Change to model directory and run inference
-            original_cwd = os.getcwd()
-            os.chdir(self.model_path)
-            
             # Set up environment variables
             env = os.environ.copy()
             env['PATH'] = f"{self.environment_path}/bin:{env['PATH']}"
@@ -108,16 +106,16 @@ class RNAmigos2Wrapper:
             
             logger.info(f"Running RNAmigos2 inference: {' '.join(cmd)}")
             
+            # Run inference from the model directory without changing the process cwd
             result = subprocess.run(
                 cmd,
+                cwd=self.model_path,
                 env=env,
                 capture_output=True,
                 text=True,
                 timeout=300  # 5 minute timeout
             )
             
-            os.chdir(original_cwd)
-            
             if result.returncode != 0:
                 logger.error(f"RNAmigos2 inference failed: {result.stderr}")
                 return {
@@ -142,8 +140,8 @@ class RNAmigos2Wrapper:
             return {"success": False, "error": str(e)}
         finally:
             # Cleanup temporary directory
-            if self.temp_dir and os.path.exists(self.temp_dir):
-                shutil.rmtree(self.temp_dir, ignore_errors=True)
+            if temp_dir and os.path.exists(temp_dir):
+                shutil.rmtree(temp_dir, ignore_errors=True)
     
     def _parse_results(self, output_path: str) -> Dict[str, Any]:
         """Parse RNAmigos2 output results"""
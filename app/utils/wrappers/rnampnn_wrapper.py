@@ -7,6 +7,7 @@ RNA Sequence Prediction from 3D Structure
 import os
 import sys
 import json
+import uuid
 import tempfile
 import subprocess
 import logging
@@ -51,6 +52,9 @@ class RNAMPNNWrapper:
         if not os.path.exists(self.checkpoint_path):
             raise FileNotFoundError(f"Model checkpoint not found at {self.checkpoint_path}")
         
+        # Resolve the reported device once rather than querying CUDA per request
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        
         logger.info(f"RNAMPNN wrapper initialized with model_path: {self.model_path}")
         logger.info(f"RNAMPNN wrapper initialized with environment_path: {self.environment_path}")
         logger.info(f"RNAMPNN wrapper using temp_dir: {self.temp_dir}")
@@ -67,13 +71,14 @@ class RNAMPNNWrapper:
             Dictionary containing the result
         """
         try:
-            # Create temporary input file
-            input_file = os.path.join(self.temp_dir, f"rnampnn_input_{os.getpid()}.json")
+            # Create temporary input file, unique per call so concurrent requests never collide
+            call_id = uuid.uuid4().hex
+            input_file = os.path.join(self.temp_dir, f"rnampnn_input_{call_id}.json")
             with open(input_file, 'w') as f:
                 json.dump(input_data, f)
             
             # Create temporary output file
-            output_file = os.path.join(self.temp_dir, f"rnampnn_output_{os.getpid()}.json")
+            output_file = os.path.join(self.temp_dir, f"rnampnn_output_{call_id}.json")
             
             # Prepare command
             python_path = os.path.join(self.environment_path, "bin", "python")
@@ -150,7 +155,7 @@ class RNAMPNNWrapper:
         """
         try:
             # Create temporary PDB file in model directory
-            temp_pdb = os.path.join(self.temp_dir, f"temp_{os.getpid()}.pdb")
+            temp_pdb = os.path.join(self.temp_dir, f"temp_{uuid.uuid4().hex}.pdb")
             with open(pdb_file_path, 'r') as src, open(temp_pdb, 'w') as dst:
                 dst.write(src.read())
             
@@ -187,22 +192,17 @@ class RNAMPNNWrapper:
         Returns:
             Tuple of (coordinates_array, mask_array)
         """
-        # Convert to torch tensor for processing
-        import torch
-        
-        coords_tensor = torch.tensor(coords, dtype=torch.float32)
+        # Inference runs in the model environment, so this stays in numpy; a
+        # torch round trip here only added two host copies per request
+        coords_array = np.asarray(coords, dtype=np.float32)
         
         # Add batch dimension
-        if coords_tensor.dim() == 3:
-            coords_tensor = coords_tensor.unsqueeze(0)
+        if coords_array.ndim == 3:
+            coords_array = coords_array[np.newaxis]
         
         # Create mask for valid coordinates (non-NaN)
-        mask = ~torch.isnan(coords_tensor).any(dim=-1)
-        mask = mask.all(dim=-1)  # All atoms must be valid for the residue to be valid
-        
-        # Convert back to numpy for JSON serialization
-        coords_array = coords_tensor.numpy()
-        mask_array = mask.numpy()
+        mask_array = ~np.isnan(coords_array).any(axis=-1)
+        mask_array = mask_array.all(axis=-1)  # All atoms must be valid for the residue to be valid
         
         logger.info(f"Preprocessed coordinates shape: {coords_array.shape}")
         logger.info(f"Preprocessed mask shape: {mask_array.shape}")
@@ -241,7 +241,7 @@ class RNAMPNNWrapper:
                     "model_info": {
                         "model_name": "RNAMPNN-X",
                         "model_type": "RNA sequence prediction from 3D structure",
-                        "device": "cuda" if torch.cuda.is_available() else "cpu"
+                        "device": self.device
                     }
                 })
                 
@@ -292,7 +292,7 @@ class RNAMPNNWrapper:
                     "model_info": {
                         "model_name": "RNAMPNN-X",
                         "model_type": "RNA sequence prediction from 3D structure",
-                        "device": "cuda" if torch.cuda.is_available() else "cpu"
+                        "device": self.device
                     }
                 })
                 
@@ -23,7 +23,27 @@ class Config:
     DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
     
     # Model Configuration
+    # Construct model wrappers at startup instead of on the first request. Off by default
+    # so scripts and the debug reloader stay light; gunicorn.conf.py turns it on
+    PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', 'false').lower() == 'true'
+    # Leave the warm-up to the server's per-worker hook (gunicorn.conf.py post_fork)
+    WARM_UP_AFTER_FORK = os.environ.get('WARM_UP_AFTER_FORK', 'false').lower() == 'true'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    # Uploads up to this size are kept in memory; larger ones spool to a temp file
+    MAX_SPOOLED_SIZE = int(os.environ.get('MAX_SPOOLED_SIZE', 500 * 1024))
+    
+    # File downloads: let the front-end server stream files from disk
+    # USE_X_SENDFILE emits X-Sendfile headers (Apache mod_xsendfile, lighttpd)
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+    # X_ACCEL_REDIRECT_PREFIX is an nginx internal location aliased to the temp folder,
+    # e.g. "/_internal_temp/" with "location /_internal_temp/ { internal; alias <TEMP_FOLDER>/; }"
+    X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
+    
+    # Response compression for large JSON/text payloads (sequences, structures)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIMETYPES = ['application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript']
+    COMPRESS_MIN_SIZE = 1024  # bytes
+    COMPRESS_LEVEL = 4
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
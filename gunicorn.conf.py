@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration for RNA-Factory
+Usage: gunicorn -c gunicorn.conf.py "app:create_app()"
+"""
+
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+
+# Import the app once in the master process and share the loaded modules after fork
+preload_app = True
+
+# Model wrappers are built in each worker after fork instead of in the master, so
+# no CUDA/torch state is inherited across fork; create_app skips its own warm-up.
+# Set PRELOAD_MODELS=false to build them lazily on the first request instead
+os.environ.setdefault("PRELOAD_MODELS", "true")
+os.environ.setdefault("WARM_UP_AFTER_FORK", "true")
+
+
+def post_fork(server, worker):
+    """Warm up model wrappers in a freshly forked worker"""
+    if os.environ["PRELOAD_MODELS"].lower() == "true":
+        from app import warm_up_wrappers
+        warm_up_wrappers()
+
+
+# Worker class; set GUNICORN_WORKER_CLASS to a worker with a C HTTP parser
+# (e.g. one built on picohttpparser) to cut header parsing cost on small requests
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+
+# Threads per worker. Several model wrappers keep per-call scratch state on the
+# shared wrapper instance (self.temp_dir) or chdir the whole process, so concurrent
+# predictions in one worker can clobber each other; keep 1 until they are reentrant.
+# With the sync worker class, threads > 1 switches gunicorn to its gthread worker.
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+# Predictions shell out to model environments and can run for minutes
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 600))